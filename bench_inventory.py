@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+# Time the construction of a JenkinsInventory from a synthetic Jenkins tree response
+# for a range of job counts and report the memory held by the resulting inventory.
+# The memory taken by the job objects of the inventory is also compared against what
+# unslotted job objects would take, with their own url string and a separate instance
+# for the job bucket, the folder and each view the job is listed in (the way the
+# inventory used to be).
+# No Jenkins server is needed.
+#
+#   usage:  python bench_inventory.py [job_count ...]
+#
+# The synthetic tree has 10 top level folders, each with 10 sub-folders
+# (each sub-folder having a view of a few of its jobs) and the jobs spread
+# evenly over the sub-folders.
+
+import sys
+import time
+import tracemalloc
+
+from bldeif.utils.klog import ActivityLogger
+from bldeif.jenkins_connection import JenkinsConnection
+
+FREESTYLE = 'hudson.model.FreeStyleProject'
+FOLDER    = 'com.cloudbees.hudson.plugins.folder.Folder'
+LISTVIEW  = 'hudson.model.ListView'
+
+DEFAULT_JOB_COUNTS = [1000, 10000, 30000, 60000, 100000]
+TOP_FOLDERS = 10
+SUB_FOLDERS = 10
+
+############################################################################################
+
+def synthesizeJenkinsInfo(job_count):
+    jobs_per_folder = max(1, job_count // (TOP_FOLDERS * SUB_FOLDERS))
+    top_level = []
+    for tf in range(TOP_FOLDERS):
+        sub_folders = []
+        for sf in range(SUB_FOLDERS):
+            jobs = [{'name': 'job-%d-%d-%d' % (tf, sf, jx), '_class': FREESTYLE} for jx in range(jobs_per_folder)]
+            views = [{'name': 'view-%d-%d' % (tf, sf), '_class': LISTVIEW, 'jobs': jobs[:5]}]
+            sub_folders.append({'name': 'sub-%d-%d' % (tf, sf), '_class': FOLDER, 'jobs': jobs, 'views': views})
+        top_level.append({'name': 'top-%d' % tf, '_class': FOLDER, 'jobs': sub_folders, 'views': []})
+    return {'jobs': top_level, 'views': []}
+
+
+class UnslottedJob(object):
+    def __init__(self, job):
+        self.container = job.container
+        self.name      = job.name
+        self._type     = job._type
+        self.last_build_number    = job.last_build_number
+        self.last_build_timestamp = job.last_build_timestamp
+        self._base_url = job._base_url
+        self.url       = "%s/job/%s" % (job.container, job.name)
+
+
+def jobObjectsBytes(inventory):
+    """
+        Return the bytes taken by the job objects of the inventory and the bytes unslotted
+        job objects would take for the same jobs.
+    """
+    listings = [inventory.jobs] + [folder.jobs for folder in inventory.folders.values()] + \
+               [view.jobs for view in inventory.views.values()]
+    jobs = [job for listing in listings for job in listing]
+    compact = sum(sys.getsizeof(job) for job in {id(job): job for job in jobs}.values())
+    unslotted = 0
+    for job in jobs:
+        copy = UnslottedJob(job)
+        unslotted += sys.getsizeof(copy) + sys.getsizeof(copy.__dict__) + sys.getsizeof(copy.url)
+    return compact, unslotted
+
+
+def benchInventory(job_count):
+    jc = JenkinsConnection.__new__(JenkinsConnection)  # no config or server needed to build an inventory
+    jc.base_url = 'http://jenkado.example.com:8080'
+    jc.log = ActivityLogger('log/bench_inventory.log')
+    jenkins_info = synthesizeJenkinsInfo(job_count)
+
+    started = time.perf_counter()
+    inventory = jc.buildInventory(jenkins_info)
+    elapsed = time.perf_counter() - started
+
+    # build it again under tracemalloc (which slows things down) to see what the inventory holds onto
+    inventory = None
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    inventory = jc.buildInventory(jenkins_info)
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    compact, unslotted = jobObjectsBytes(inventory)
+    return len(inventory.jobs), len(inventory.folders), len(inventory.views), elapsed, held, compact, unslotted
+
+############################################################################################
+
+def main(args):
+    job_counts = [int(arg) for arg in args] or DEFAULT_JOB_COUNTS
+    print("%10s  %8s  %8s  %12s  %14s  %12s  %14s  %14s  %14s" % \
+          ('jobs', 'folders', 'views', 'build secs', 'usecs per job', 'inventory MB', 'bytes per job',
+           'job objects MB', 'unslotted MB'))
+    for job_count in job_counts:
+        jobs, folders, views, elapsed, held, compact, unslotted = benchInventory(job_count)
+        print("%10d  %8d  %8d  %12.4f  %14.2f  %12.1f  %14d  %14.1f  %14.1f" % \
+              (jobs, folders, views, elapsed, elapsed * 1000000 / jobs, held / (1024 * 1024), held // jobs,
+               compact / (1024 * 1024), unslotted / (1024 * 1024)))
+
+############################################################################################
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
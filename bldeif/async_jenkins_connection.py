@@ -0,0 +1,248 @@
+import time
+import asyncio
+import calendar
+import json
+
+from bldeif.jenkins_connection import JenkinsConnection, parseBuildPage, INVENTORY_TIMEOUT
+from bldeif.utils.eif_exception import ConfigurationError
+from bldeif.utils.jenkins_http  import STREAM_CHUNK_SIZE
+from bldeif.utils.json_stream   import JsonArrayStream
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+############################################################################################
+
+__version__ = "1.0.0"
+
+DEFAULT_MAX_IN_FLIGHT = 100
+LIMITER_POLL_INTERVAL = 0.01  # seconds between attempts to get an in-flight slot from the AdaptiveLimiter
+
+############################################################################################
+
+class AsyncJenkinsConnection(JenkinsConnection):
+    """
+        A JenkinsConnection whose REST requests are issued from an asyncio event loop
+        with the aiohttp client instead of from one thread per request.
+        The inventory related requests are issued together when connecting and the
+        build history requests fan out with a semaphore sized by the Concurrency value
+        in the Jenkins config section (defaulting to 100 requests in flight).
+        With AdaptiveConcurrency the requests also go through the AdaptiveLimiter.
+        Select it in the Jenkins section of the config with:  Class : AsyncJenkinsConnection
+    """
+
+    DEFAULT_CONCURRENCY = DEFAULT_MAX_IN_FLIGHT  # so PoolSize and the AdaptiveLimiter are sized for it too
+
+    def __init__(self, config, logger):
+        if aiohttp is None:
+            raise ConfigurationError("The AsyncJenkinsConnection requires the aiohttp package, which is not installed")
+        super().__init__(config, logger)
+
+    def internalizeConfig(self, config):
+        super().internalizeConfig(config)
+        self.proxy_url = self.http_proxy.get(self.protocol, None)
+
+    def connect(self):
+        """
+            Same steps as JenkinsConnection.connect, but the version, _class and inventory
+            requests are all in flight at the same time (the inventory request is skipped
+            when the inventory cache provides a valid snapshot or a targeted crawl is configured).
+        """
+        self.log.info("Connecting to Jenkins")
+
+        cache_restored = self.restoreCachedInventory()
+        full_crawl = not cache_restored and not self.targeted_crawl
+        manage, root_info, jenkins_info = asyncio.run(self._connectRequests(full_crawl))
+        status_code, text, headers = manage
+        self.backend_version = self._extractJenkinsVersion(status_code, text, headers)
+        self.log.info("Connected to Jenkins server: %s running at version %s" % (self.server, self.backend_version))
+        self.log.info("Url: %s" % self.base_url)
+        self.job_class_exists = '_class' in root_info
+        if not self.job_class_exists:
+            msg = "The Jenkins REST API doesn't return a _class property in the response. Update to Jenkins 2.2 or greater to use this connector"
+            raise ConfigurationError(msg)
+        if not cache_restored:
+            self.inventory = self.crawlInventory(jenkins_info)
+        return True
+
+    async def _connectRequests(self, crawl_inventory):
+        manage_url = "%s/manage"   % self.base_url
+        api_url    = "%s/api/json" % self.base_url
+        self.log.debug(manage_url)
+        self.log.debug(api_url)
+        async with self._session() as session:
+            requests = [self._fetch(session, manage_url), self._fetchJSON(session, api_url)]
+            if crawl_inventory:
+                requests.append(self._fetchJSON(session, self.inventoryUrl(), timeout=aiohttp.ClientTimeout(total=INVENTORY_TIMEOUT)))
+            responses = await asyncio.gather(*requests)
+        return responses if crawl_inventory else responses + [None]
+
+    def _fetchBuildHistories(self, fetches, ref_time):
+        """
+            Run all the build history requests on an event loop, at most self.concurrency
+            of them in flight at any moment.  Results are returned in the same order as fetches
+            and, as with JenkinsConnection, failed fetches are dealt with by raiseFailedFetches.
+        """
+        if not fetches:
+            return []
+        self.log.debug("fetching build history for %d jobs with up to %d requests in flight" % (len(fetches), self.concurrency))
+        outcomes = asyncio.run(self._gatherBuildHistories(fetches, ref_time))
+        self.raiseFailedFetches(fetches, outcomes)
+        return outcomes
+
+    async def _gatherBuildHistories(self, fetches, ref_time):
+        in_flight = asyncio.Semaphore(self.concurrency)
+
+        ref_time_millis = calendar.timegm(ref_time) * 1000
+
+        async def parsed_history(session, builds_url, job, folder_name):
+            # as in JenkinsConnection.retrieveParsedBuildHistory, the event loop only issues the requests
+            loop = asyncio.get_running_loop()
+            after_number = self.watermarkFor(job)
+            builds = []
+            beyond_horizon = False
+            start = 0
+            async with in_flight:
+                while True:
+                    status_code, text, headers = await self._fetch(session, self.buildPageUrl(builds_url, start))
+                    page_builds, page_length, last_beyond = await loop.run_in_executor(
+                        self.parse_pool, parseBuildPage, text, job.name, folder_name, ref_time, after_number, not self.two_phase_fetch)
+                    if not beyond_horizon:
+                        builds.extend(page_builds)
+                        beyond_horizon = len(page_builds) < page_length
+                    if last_beyond or self.pageLimitReached(page_length, start):
+                        break
+                    start += self.buildPageSize()
+            return builds[::-1]
+
+        async def history(session, builds_url, job, folder_name):
+            if self.parse_pool:
+                return await parsed_history(session, builds_url, job, folder_name)
+            after_number = self.watermarkFor(job)
+            raw_builds = []
+            start = 0
+            async with in_flight:
+                while True:  # a page of builds at a time, as in JenkinsConnection.retrieveBuildHistory
+                    page_url = self.buildPageUrl(builds_url, start)
+                    if self.stream_build_history:
+                        page = await self._streamBuilds(session, page_url, job, ref_time, after_number)
+                    else:
+                        page = (await self._fetchJSON(session, page_url))['builds']
+                    raw_builds.extend(page)
+                    if not self.needsNextPage(page, start, ref_time, ref_time_millis, after_number):
+                        break
+                    start += self.buildPageSize()
+            return self.extractQualifyingBuilds(job.name, folder_name, ref_time, raw_builds,
+                                                after_number=after_number)
+
+        async with self._session() as session:
+            pending = [history(session, builds_url, job, folder_name)
+                       for key, job, label, builds_url, folder_name in fetches]
+            return await asyncio.gather(*pending, return_exceptions=True)
+
+    def _session(self):
+        auth = aiohttp.BasicAuth(*self.creds) if self.creds else None
+        return aiohttp.ClientSession(auth=auth,
+                                     connector=aiohttp.TCPConnector(limit=self.concurrency),
+                                     timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+    async def _request(self, session, url, consume, headers=None, **request_args):
+        """
+            Issue a GET for the url (with any extra request headers and any request_args for aiohttp,
+            such as a timeout other than the session's) and return what the consume coroutine function
+            makes of the response.
+            With an AdaptiveLimiter the request waits for an in-flight slot and a request that is
+            throttled (429/503) or times out is retried after a backoff, as JenkinsHttpClient does.
+        """
+        limiter = self.limiter
+        if limiter is None:
+            async with session.get(url, headers=headers, proxy=self.proxy_url, **request_args) as response:
+                return await consume(response)
+
+        attempt = 0
+        while True:
+            while not limiter.tryAcquire():
+                await asyncio.sleep(LIMITER_POLL_INTERVAL)
+            holding = True
+            started = time.monotonic()
+            try:
+                async with session.get(url, headers=headers, proxy=self.proxy_url, **request_args) as response:
+                    limiter.release()
+                    holding = False
+                    if not limiter.isThrottleStatus(response.status):
+                        limiter.recordSuccess(time.monotonic() - started)
+                        return await consume(response)
+                    limiter.recordThrottle()
+                    if attempt >= limiter.max_retries:
+                        return await consume(response)
+                    self.http.record(0)
+                    outcome = 'throttled (%d)' % response.status
+                    delay = limiter.backoffDelay(attempt, response.headers.get('Retry-After', None))
+            except asyncio.TimeoutError:
+                limiter.recordThrottle(timed_out=True)
+                if attempt >= limiter.max_retries:
+                    raise
+                self.http.record(0)
+                outcome = 'timed out'
+                delay = limiter.backoffDelay(attempt)
+            finally:
+                if holding:
+                    limiter.release()
+            self.log.debug("Jenkins request %s %s, retrying in %.1f seconds" % (url, outcome, delay))
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _fetch(self, session, url, **request_args):
+        """
+            Return the status, text and headers of the response for the url.  With an HttpCache
+            the request is conditional on a cached response and a 304 answer is served from the cache.
+        """
+        cache  = self.http.cache
+        cached = cache.lookup(url) if cache else None
+
+        async def consume(response):
+            body = await response.read()
+            self.http.record(len(body))
+            if cache and response.status == 304 and cached:
+                cache.hit(cached)
+                return 200, cached.content.decode('utf-8', 'replace'), response.headers
+            if cache and response.status == 200:
+                headers = response.headers
+                cache.store(url, headers.get('ETag', None), headers.get('Last-Modified', None),
+                            headers.get('Content-Type', None), body)
+            return response.status, body.decode('utf-8', 'replace'), response.headers
+
+        return await self._request(session, url, consume, headers=cached.validators() if cached else None, **request_args)
+
+    async def _streamBuilds(self, session, url, job, ref_time, after_number):
+        """
+            Read the builds of the response incrementally, the response is abandoned as soon as
+            a build that extractQualifyingBuilds would stop at has been decoded.
+        """
+        ref_time_millis = calendar.timegm(ref_time) * 1000
+
+        async def consume(response):
+            stream = JsonArrayStream('builds')
+            raw_builds = []
+            received = 0
+            try:
+                async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    received += len(chunk)
+                    raw_builds.extend(stream.feed(chunk))
+                    if stream.done:
+                        break
+                    if raw_builds and self.isBeyondHorizon(raw_builds[-1], ref_time, ref_time_millis, after_number):
+                        return raw_builds
+                stream.finish()
+            finally:
+                self.http.record(received)
+            return raw_builds
+
+        return await self._request(session, url, consume)
+
+    async def _fetchJSON(self, session, url, **request_args):
+        status_code, text, headers = await self._fetch(session, url, **request_args)
+        return json.loads(text)
+
@@ -39,6 +39,8 @@ class BLDConnector:
 
         self.agicen_conn = None
         self.bld_conn    = None
+        self.watermarks  = {}
+        self.pending_builds = {}
 
         self.bld_name   = [name for name in conn_sections if not name.startswith('AgileCentral')][0]
         self.log.info("Agile Central BLD Connector for %s, version %s" % (self.bld_name, __version__))
@@ -82,7 +84,8 @@ class BLDConnector:
         self.max_builds  = self.svc_conf.get('MaxBuilds', 20)
         default_project = self.agicen_conf['Project']
 
-        valid_config_items = ['Preview', 'LogLevel', 'MaxBuilds', 'ShowVCSData' ]
+        valid_config_items = ['Preview', 'LogLevel', 'MaxBuilds', 'ShowVCSData',
+                              'ListenAddress', 'ListenPort', 'EventBatchInterval', 'ReconcileInterval']
         svc_conf = config.topLevel('Service')
         invalid_config_items = [item for item in svc_conf.keys() if item not in valid_config_items]
         if invalid_config_items:
@@ -141,6 +144,15 @@ class BLDConnector:
         self.agicen_conn.connect()  # so we can use it in our X-Rally-Integrations header items here
 
 
+    def disconnect(self):
+        """
+            Let go of the connections to Agile Central and the build system
+        """
+        for conn in (self.agicen_conn, self.bld_conn):
+            if conn:
+                conn.disconnect()
+
+
     def validate(self):
         """
             This calls the validate method on both the Agile Central and the BLD connections
@@ -167,18 +179,41 @@ class BLDConnector:
         return True
 
 
-    def run(self, last_run, extension):
+    def run(self, last_run, extension, watermarks=None, pending=None):
         """
             The real beef is in the call to reflectBuildsInAgileCentral.
             The facility for extensions is not yet implemented for BLD connectors,
             so the pre and post batch calls are currently no-ops.
+            watermarks is a dict keyed by job fully qualified path of the most recent
+            build number (and timestamp) already reflected in Agile Central for that job.
+            pending is a dict keyed by job fully qualified path of the numbers of the builds
+            that were still running on a prior run, these are re-polled by number.
+            On return, self.watermarks holds those marks advanced by this run and
+            self.pending_builds the builds to be re-polled on the next run.
         """
+        self.watermarks = dict(watermarks or {})
+        self.pending_builds = dict(pending or {})
         self.preBatch(extension)
         status, builds = self.reflectBuildsInAgileCentral(last_run)
         self.postBatch(extension, status, builds)
         return status, builds
 
 
+    def runEvents(self, events, extension, watermarks=None):
+        """
+            The counterpart of run for the listen mode, where the builds to be reflected
+            are those announced by build notifications (events) rather than those found by
+            scanning the build history of every configured job.
+            The watermarks are consulted but not advanced, a notification may have gone astray
+            so only the reconciliation sweep (a regular run) can vouch for every earlier build.
+        """
+        self.watermarks = dict(watermarks or {})
+        self.preBatch(extension)
+        status, builds = self.reflectEventBuildsInAgileCentral(events)
+        self.postBatch(extension, status, builds)
+        return status, builds
+
+
     def preBatch(self, extension):
         """
         """
@@ -216,22 +251,65 @@ class BLDConnector:
 
 
         agicen_ref_time, bld_ref_time = self.getRefTimes(last_run)
+        bld.setWatermarks(self.watermarks)
+        bld.setMaxBuilds(self.max_builds)
         recent_agicen_builds = agicen.getRecentBuilds(agicen_ref_time, self.target_projects)
         recent_bld_builds    =    bld.getRecentBuilds(bld_ref_time)
         unrecorded_builds = self._identifyUnrecordedBuilds(recent_agicen_builds, recent_bld_builds)
+        if self.pending_builds:
+            pending_bld_builds = bld.getPendingBuilds(self.pending_builds)
+            unrecorded_builds  = self._addPendingBuilds(unrecorded_builds, recent_agicen_builds, pending_bld_builds)
         self.log.info("unrecorded Builds count: %d" % len(unrecorded_builds))
         self.log.info("no more than %d builds per job will be recorded on this run" % self.max_builds)
         if self.svc_conf.get('ShowVCSData', False):
             self.dumpChangesetInfo(unrecorded_builds)
 
+        status, recorded_builds, reflected = self._postUnrecordedBuilds(unrecorded_builds, preview_mode)
+
+        if not preview_mode:
+            self.pending_builds = self._identifyPendingBuilds(unrecorded_builds, reflected)
+            self._advanceWatermarks(recent_bld_builds, unrecorded_builds, reflected)
+
+        return status, recorded_builds
+
+    def reflectEventBuildsInAgileCentral(self, events):
+        """
+            Reflect the builds announced by the events in Agile Central.  Rather than obtaining
+            the recent builds of all target projects from Agile Central, the existence of each
+            announced build is checked as it is about to be posted.
+        """
+        preview_mode = self.svc_conf.get('Preview', False)
+        if preview_mode:
+            self.log.info('***** Preview Mode *****   (no Builds will be created in Agile Central)')
+
+        self.bld_conn.setWatermarks(self.watermarks)
+        event_bld_builds  = self.bld_conn.getEventBuilds(events)
+        unrecorded_builds = self._identifyUnrecordedBuilds({}, event_bld_builds)
+        self.log.info("announced Builds to be reflected: %d" % len(unrecorded_builds))
+        if self.svc_conf.get('ShowVCSData', False):
+            self.dumpChangesetInfo(unrecorded_builds)
+
+        status, recorded_builds, reflected = self._postUnrecordedBuilds(unrecorded_builds, preview_mode)
+        return status, recorded_builds
+
+    def _postUnrecordedBuilds(self, unrecorded_builds, preview_mode):
+        """
+            Post the unrecorded builds (oldest first) to Agile Central, no more than MaxBuilds per job.
+            Returns the status, an OrderedDict of the builds posted for each job and the set of
+            (job fully qualified path, build number) for the builds known to be in Agile Central.
+        """
+        status = False
+        agicen = self.agicen_conn
+        bld    = self.bld_conn
         recorded_builds = OrderedDict()
         builds_posted = {}
+        reflected = set()  # (job fully qualified path, build number) for builds known to be in Agile Central
         # sort the unrecorded_builds into build chrono order, oldest to most recent, then project and job
         unrecorded_builds.sort(key=lambda build_info: (build_info[1].timestamp, build_info[2], build_info[1]))
         self.log.debug("About to process %d unrecorded builds" % len(unrecorded_builds))
         for job, build, project, view in unrecorded_builds:
             if build.result == 'None':
-                self.log.warn("%s #%s job/build was not processed because is still running" % (job, build.number))
+                self.log.warn("%s #%s job/build was not processed because it is still running, it will be re-polled on the next run" % (job, build.number))
                 continue
             #self.log.debug("current job: %s  build: %s" % (job, build))
             if not job in builds_posted:
@@ -241,6 +319,12 @@ class BLDConnector:
             if preview_mode:
                 continue
 
+            try:
+                bld.completeBuild(job, build)
+            except Exception as msg:
+                self.log.error('OperationalException completing build %s #%s - %s' % (job, build.number, msg))
+                continue
+
             try:
                 changesets, build_definition = agicen.prepAgileCentralBuildPrerequisites(job, build, project)
             except Exception as msg:
@@ -253,6 +337,8 @@ class BLDConnector:
                 self.log.error('OperationalException postingACBuild - %s' % msg)
                 continue
 
+            if agicen_build:
+                reflected.add((job.fully_qualified_path(), build.number))
             if agicen_build and status == 'posted':
                 builds_posted[job] += 1
                 if job not in recorded_builds:
@@ -260,7 +346,7 @@ class BLDConnector:
                 recorded_builds[job].append(agicen_build)
             status = True
 
-        return status, recorded_builds
+        return status, recorded_builds, reflected
 
     def postBuildToAgileCentral(self, build_defn, build, changesets, job):
         desc = '%s %s #%s | %s | %s  not yet reflected in Agile Central'
@@ -309,7 +395,7 @@ class BLDConnector:
         ##
 
 
-    def _identifyUnrecordedBuilds(self, agicen_builds, bld_builds):
+    def _identifyUnrecordedBuilds(self, agicen_builds, bld_builds, heed_watermarks=True):
         """
             If there are items in the agicen_builds for which there is  a counterpart in 
             the bld_builds, the information has already been reflected in Agile Central.  --> NOOP
@@ -319,6 +405,8 @@ class BLDConnector:
 
             If there are items in the agicen_builds for which there is no counterpart in 
             the bld_builds, information has been lost,  dat would be some bad... --> ERROR
+
+            Builds at or below their job's watermark are taken as reflected unless heed_watermarks is False.
         """
         reflected_builds   = []
         unrecorded_builds  = []
@@ -326,7 +414,11 @@ class BLDConnector:
         for view_and_project, jobs in bld_builds.items():
             view, project = view_and_project.split('::', 1)
             for job, builds in jobs.items():
+                watermark = self.watermarks.get(job.fully_qualified_path(), {'number': 0})
                 for build in builds:
+                    if heed_watermarks and build.number <= watermark['number']:  # reflected on a prior run, no need to look in AC
+                        reflected_builds.append((job, build, project, view))
+                        continue
                     # look first for a matching project key in agicen_builds
                     if project in agicen_builds:
                         job_builds = agicen_builds[project]
@@ -342,8 +434,70 @@ class BLDConnector:
         return unrecorded_builds
 
 
+    def _addPendingBuilds(self, unrecorded_builds, agicen_builds, pending_bld_builds):
+        """
+            Add the re-polled pending builds that are not in Agile Central to the unrecorded builds,
+            unless the lookback window already turned them up.  The watermarks don't apply here,
+            a job's mark may have moved past a build while it was still running.
+        """
+        known = set((job.fully_qualified_path(), build.number) for job, build, project, view in unrecorded_builds)
+        for job, build, project, view in self._identifyUnrecordedBuilds(agicen_builds, pending_bld_builds, heed_watermarks=False):
+            if (job.fully_qualified_path(), build.number) not in known:
+                unrecorded_builds.append((job, build, project, view))
+        return unrecorded_builds
+
+
+    def _identifyPendingBuilds(self, unrecorded_builds, reflected):
+        """
+            Return the builds to be re-polled on the next run, keyed by job fully qualified path:
+            those still running and those already pending that could not be reflected on this run
+            (eg, over the MaxBuilds cap), as their job's watermark may have moved past them.
+        """
+        pending = {}
+        for job, build, project, view in unrecorded_builds:
+            job_fqp = job.fully_qualified_path()
+            if (job_fqp, build.number) in reflected:
+                continue
+            if build.result == 'None' or build.number in self.pending_builds.get(job_fqp, []):
+                pending.setdefault(job_fqp, set()).add(build.number)
+        if pending:
+            self.log.info("%d builds still running (or not yet reflected) will be re-polled on the next run" % \
+                          sum(len(numbers) for numbers in pending.values()))
+        return {job_fqp: sorted(numbers) for job_fqp, numbers in pending.items()}
+
+
+    def _advanceWatermarks(self, bld_builds, unrecorded_builds, reflected):
+        """
+            Move each job's watermark up to the most recent build such that it and every
+            earlier build seen on this run is in Agile Central.  A build that could not be
+            reflected (over the MaxBuilds cap, failed to post) holds the mark below it so that
+            the build gets considered again on the next run.  A pending build (eg, one still
+            running) doesn't hold the mark, it gets re-polled by number on the next run.
+        """
+        blocked = {}  # job fully qualified path -> lowest build number not reflected on this run
+        for job, build, project, view in unrecorded_builds:
+            job_fqp = job.fully_qualified_path()
+            if build.number in self.pending_builds.get(job_fqp, []):
+                continue
+            if (job_fqp, build.number) not in reflected:
+                blocked[job_fqp] = min(build.number, blocked.get(job_fqp, build.number))
+
+        for view_and_project, jobs in bld_builds.items():
+            for job, builds in jobs.items():
+                job_fqp = job.fully_qualified_path()
+                mark = self.watermarks.get(job_fqp, {'number': 0, 'timestamp': 0})
+                for build in sorted(builds, key=lambda build: build.number):
+                    if job_fqp in blocked and build.number >= blocked[job_fqp]:
+                        break
+                    if build.number > mark['number']:
+                        mark = {'number': build.number, 'timestamp': build.timestamp}
+                if mark['number']:
+                    self.watermarks[job_fqp] = mark
+
+
     def dumpChangesetInfo(self, builds):
         for job, build, project, view in builds:
+            self.bld_conn.completeBuild(job, build)
             if not build.changeSets:
                 continue
             self.log.debug(build)
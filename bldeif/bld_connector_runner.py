@@ -11,12 +11,16 @@ import sys, os
 import re
 import time
 import glob
+import signal
 from calendar import timegm
 
 from bldeif.utils.klog       import ActivityLogger
 from bldeif.utils.proctbl    import ProcTable
 from bldeif.utils.lock_file  import LockFile
 from bldeif.utils.time_file  import TimeFile
+from bldeif.utils.watermark_file import WatermarkFile
+from bldeif.utils.pending_builds_file import PendingBuildsFile
+from bldeif.utils.build_event_listener import BuildEventListener, DEFAULT_LISTEN_ADDRESS, DEFAULT_LISTEN_PORT
 from bldeif.utils.konfabulus import Konfabulator
 from bldeif.bld_connector    import BLDConnector
 #from bldeif.utils.auxloader  import ExtensionLoader
@@ -43,6 +47,10 @@ STD_TS_FMT = '%Y-%m-%d %H:%M:%S Z'
 
 THREE_DAYS = 3 * 86400
 
+DEFAULT_EVENT_BATCH_INTERVAL = 10   # seconds
+DEFAULT_RECONCILE_INTERVAL   = 60   # minutes
+LISTEN_POLL_INTERVAL         = 1.0  # seconds
+
 ############################################################################################################
 
 class BuildConnectorRunner(object):
@@ -73,7 +81,22 @@ class BuildConnectorRunner(object):
             self.default_log_file_name = False
             for spec in log_spec:
                 args = [arg for arg in args if arg != spec]
-        
+
+        # --listen  or  --listen=<port>  to run as a listener for build notifications (see listen)
+        self.listen_mode = False
+        self.listen_port_override = None
+        listen_spec = [arg for arg in args if arg == '--listen' or arg.startswith('--listen=')]
+        if listen_spec:
+            self.listen_mode = True
+            if '=' in listen_spec[0]:
+                try:
+                    self.listen_port_override = int(listen_spec[0].split('=', 1)[1])
+                except ValueError:
+                    raise ConfigurationError("Invalid --listen port specification: %s" % listen_spec[0])
+            args = [arg for arg in args if arg not in listen_spec]
+        if len(args) < 1:
+            raise ConfigurationError("Insufficient command line args, must be at least a config file name.")
+
         self.config_file_names = args
         if self.default_log_file_name:  # set it to first config file minus any '_config.yml' portion
             self.first_config = self.config_file_names[0]
@@ -148,6 +171,96 @@ class BuildConnectorRunner(object):
                 raise OperationalError("ERROR: unable to remove lock file '%s', %s" % (LOCK_FILE, msg))
         self.log.info('run completed')
 
+    def listen(self):
+        """
+            Run as a long lived process that reflects builds in Agile Central as Jenkins announces
+            them (via Notification plugin POSTs to ListenAddress:ListenPort) instead of on a cron schedule.
+            The announcements are coalesced for EventBatchInterval seconds and then reflected as a batch,
+            for which Jenkins is asked only for the announced builds.
+            A regular (polling) run is done at the start and then every ReconcileInterval minutes
+            as a reconciliation sweep for any builds whose announcement went astray; the sweep is
+            also what advances the time file and the build number watermarks.
+        """
+        if len(self.config_file_names) > 1:
+            raise ConfigurationError("Listen mode handles a single config file")
+        build_system_name = self.identifyBuildSystemName()
+        self.proclaim_existence(build_system_name)
+        own_lock = self.acquireLock()
+        listener = None
+
+        try:
+            config_file = self.config_file_names[0]
+            config_file_path = self.find_config_file(config_file)
+            if not config_file_path:
+                raise ConfigurationError("No config file for '%s' found in the config subdir" % config_file)
+            config_name = config_file_path.replace('config/', '')
+            lf_name = "log/%s.log" % config_file.replace('.yml', '').replace('_config', '')
+            self.log = ActivityLogger(lf_name)
+            logAllExceptions(True, self.log)
+
+            self._operateService(config_file_path)  # initial sweep, leaves self.connector ready for the events
+            listener = BuildEventListener(self.log, self.listen_address, self.listen_port)
+            listener.start()
+            self.listening = True
+            signal.signal(signal.SIGTERM, self._stopListening)
+            next_sweep = time.time() + self.reconcile_interval
+            while self.listening:
+                if listener.queue.wait(timeout=LISTEN_POLL_INTERVAL):
+                    time.sleep(self.event_batch_interval)  # let the announcements of a burst of builds accumulate
+                    self._reflectEvents(config_name, listener.queue.drain())
+                if time.time() >= next_sweep:
+                    self._reconcile(config_file_path)
+                    next_sweep = time.time() + self.reconcile_interval
+        except KeyboardInterrupt:
+            self.log.info("Interrupted, no longer listening")
+        except Exception as msg:
+            self.log.error(msg)
+        finally:
+            if listener:
+                listener.stop()
+            try:
+                if own_lock: self.releaseLock()
+            except Exception as msg:
+                raise OperationalError("ERROR: unable to remove lock file '%s', %s" % (LOCK_FILE, msg))
+        self.log.info('listen completed')
+
+    def _stopListening(self, signum, frame):
+        self.log.info("Received signal %d, no longer listening" % signum)
+        self.listening = False
+
+    def _reflectEvents(self, config_name, events):
+        """
+            Reflect the builds announced by the events using the connector of the latest sweep.
+            A failure is logged and the builds are left to the next reconciliation sweep.
+        """
+        started = time.time()
+        self.log.info("reflecting the builds of %d build notifications" % len(events))
+        try:
+            watermarks = self.watermark_file.read()
+            status, builds = self.connector.runEvents(events, self.extension, watermarks)
+        except Exception as msg:
+            self.log.error("Unable to reflect announced builds, they are left to the next reconciliation sweep, %s" % msg)
+            return
+        self.logServiceStatistics(config_name, builds, int(round(time.time() - started)))
+
+    def _reconcile(self, config_file_path):
+        """
+            A regular run, done periodically while listening.  The connector of the sweep replaces
+            the previous one (which is disconnected) for reflecting the announced builds, the listener
+            carries on with the previous connector should the sweep fail.
+        """
+        self.log.info("reconciliation sweep commencing")
+        previous_connector = self.connector
+        try:
+            self._operateService(config_file_path)
+        except Exception as msg:
+            self.log.error("Reconciliation sweep failed, %s" % msg)
+            if self.connector:
+                self.connector.disconnect()
+            self.connector = previous_connector
+            return
+        previous_connector.disconnect()
+
     def identifyBuildSystemName(self):
         file_name = self.find_config_file(self.first_config)
         if not file_name:
@@ -209,9 +322,17 @@ class BuildConnectorRunner(object):
         #self.log.info("Last Run %s --- Now %s" % (last_run_zulu, now_zulu))
         self.log.info("Time File value %s --- Now %s" % (last_run_zulu, now_zulu))
 
+        self.watermark_file = WatermarkFile(self.buildWatermarkFileName(config_name), self.log)
+        watermarks = self.watermark_file.read()
+        self.log.info("Build number watermarks on record for %d jobs" % len(watermarks))
+
+        self.pending_file = PendingBuildsFile(self.buildPendingFileName(config_name), self.log)
+        pending = self.pending_file.read()
+        self.log.info("Pending builds on record for %d jobs" % len(pending))
+
         self.connector = BLDConnector(config, self.log)
         self.log.debug("Got a BLDConnector instance, calling the BLDConnector.run ...")
-        status, builds = self.connector.run(last_run, self.extension)
+        status, builds = self.connector.run(last_run, self.extension, watermarks, pending)
         # builds is an OrderedDict instance, keyed by job name, value is a list of Build instances
 
         finished = time.time()
@@ -221,6 +342,21 @@ class BuildConnectorRunner(object):
         if self.preview:
             self.log.info("Preview mode in effect, time.file File not written/updated")
             return
+
+        # the watermarks only ever cover builds known to be in Agile Central, so they are
+        # safe to record even when there was an error in processing
+        if self.connector.watermarks != watermarks:
+            try:
+                self.watermark_file.write(self.connector.watermarks)
+                self.log.info("build number watermarks written for %d jobs" % len(self.connector.watermarks))
+            except Exception as msg:
+                raise OperationalError(msg)
+        if self.connector.pending_builds != pending:
+            try:
+                self.pending_file.write(self.connector.pending_builds)
+                self.log.info("pending builds written for %d jobs" % len(self.connector.pending_builds))
+            except Exception as msg:
+                raise OperationalError(msg)
         if not status and builds:
             # Not writing the time.file may cause repetitive detection of Builds, 
             # but that is better than missing out on Builds altogether
@@ -252,6 +388,20 @@ class BuildConnectorRunner(object):
         return time_file_path
 
 
+    def buildWatermarkFileName(self, config_file):
+        """
+            The watermark file lives next to the time file, eg, log/wombat_watermarks.file
+        """
+        return self.buildTimeFileName(config_file).replace('time.file', 'watermarks.file')
+
+
+    def buildPendingFileName(self, config_file):
+        """
+            The pending builds file lives next to the time file, eg, log/wombat_pending.file
+        """
+        return self.buildTimeFileName(config_file).replace('time.file', 'pending.file')
+
+
     def logServiceStatistics(self, config_name, builds, elapsed):
         """
             what we intend to append to the log...  
@@ -286,6 +436,11 @@ class BuildConnectorRunner(object):
         self.preview = False
         if svc_conf and svc_conf.get('Preview', None) == True:
             self.preview = True
+        listen_conf = svc_conf or {}
+        self.listen_address = listen_conf.get('ListenAddress', DEFAULT_LISTEN_ADDRESS)
+        self.listen_port    = self.listen_port_override or int(listen_conf.get('ListenPort', DEFAULT_LISTEN_PORT))
+        self.event_batch_interval = int(listen_conf.get('EventBatchInterval', DEFAULT_EVENT_BATCH_INTERVAL))
+        self.reconcile_interval   = int(listen_conf.get('ReconcileInterval', DEFAULT_RECONCILE_INTERVAL)) * 60  # config value is in minutes
         self.log_level = 'Info'
         if svc_conf:
             ll = svc_conf.get('LogLevel', 'Info').title()
@@ -16,6 +16,8 @@ class BLDConnection(object):
         self.username_required = True
         self.password_required = True
         self.build_selectors   = []
+        self.watermarks        = {}
+        self.max_builds        = None
         self.log.info("Initializing %s connection version %s" % (self.name(), self.version()))
 
     def name(self):
@@ -92,10 +94,27 @@ class BLDConnection(object):
             self.log.setLevel('DEBUG')
 
 
+    def setWatermarks(self, watermarks):
+        """
+            watermarks is a dict keyed by job fully qualified path with a dict of the
+            'number' and 'timestamp' of the most recent build known to be reflected in Agile Central.
+        """
+        self.watermarks = watermarks
+
+
+    def setMaxBuilds(self, max_builds):
+        """
+            max_builds is the most builds per job that will be reflected on a run (the Service MaxBuilds value),
+            connections may use it to size their requests to the build system.
+        """
+        self.max_builds = max_builds
+
+
     def getRecentBuilds(self, ref_time):
         """
             Finds items that have been created since a reference time (ref_time is in UTC) 
             and applying all specified BuildSelector conditions.
+            Builds at or below a job's watermark (see setWatermarks) need not be returned.
 
             Concrete subclasses must implement this method and return a list of qualified items.
         """
@@ -103,6 +122,36 @@ class BLDConnection(object):
         raise NotImplementedError(problem)
 
 
+    def getEventBuilds(self, events):
+        """
+            Return the builds announced by the events (build notifications received from the
+            build system) in the same form as getRecentBuilds returns them.
+            Connections that don't support build notifications leave it to polling, the default
+            is to return no builds.
+        """
+        return {}
+
+
+    def getPendingBuilds(self, pending):
+        """
+            pending is a dict keyed by job fully qualified path with a list of the numbers of builds
+            that were still running when last seen.  Return those builds, as they now are, in the
+            same form as getRecentBuilds returns them.
+            The default is to return no builds, leaving them to the lookback window.
+        """
+        return {}
+
+
+    def completeBuild(self, job, build):
+        """
+            Called for a build returned by getRecentBuilds just before the build is reflected in
+            Agile Central, for connections that defer obtaining some of a build's details
+            (eg, changesets) until it is known the build is to be reflected.
+            The default is to do nothing.
+        """
+        pass
+
+
     def createBuild(self, int_work_item):
         """
             This method should never be overridden. 
@@ -1,15 +1,26 @@
 import sys, os
 import datetime
-import urllib
+import urllib.parse
 import socket
 import re
 import time
+import calendar
+import json
+import hashlib
+import multiprocessing
 
-import requests
 from collections import Counter
+from contextlib  import closing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 from bldeif.connection import BLDConnection
 from bldeif.utils.eif_exception import ConfigurationError, OperationalError
+from bldeif.utils.jenkins_http  import JenkinsHttpClient, DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT
+from bldeif.utils.adaptive_limiter import AdaptiveLimiter, DEFAULT_MAX_RETRIES
+from bldeif.utils.inventory_cache import InventoryCache
+from bldeif.utils.http_cache import HttpCache
+from bldeif.utils.build_feed import BuildFeed
+from bldeif.utils.job_selector   import JobSelector
 
 quote = urllib.parse.quote
 
@@ -21,11 +32,19 @@ ACTION_WORD_PATTERN = re.compile(r'[A-Z][a-z]+')
 ARTIFACT_IDENT_PATTERN = re.compile(r'(?P<art_prefix>[A-Z]{1,4})(?P<art_num>\d+)')
 VALID_ARTIFACT_ABBREV = None  # set later after config values for artifact prefixes are known
 
-BUILD_ATTRS = "number,id,fullDisplayName,timestamp,duration,result,url,actions[remoteUrls],changeSet[*[*[*]]]"
-FOLDER_JOB_BUILD_ATTRS = "number,id,description,timestamp,duration,result,url,actions[remoteUrls],changeSet[*[*[*]]]"
-FOLDER_JOB_BUILDS_MINIMAL_ATTRS = "number,id,timestamp,result"
+# only the changeset fields that JenkinsBuild and JenkinsChangeset read
+CHANGESET_ATTRS = "kind,revisions[module],items[commitId,timestamp,msg,paths[file]]"
+WILDCARD_CHANGESET_ATTRS = "*[*[*]]"  # what used to be asked for, still used by the MeasureBuildFields comparison
+BUILD_ATTRS = "number,id,fullDisplayName,timestamp,duration,result,url,actions[remoteUrls],changeSet[%s]" % CHANGESET_ATTRS
+FOLDER_JOB_BUILD_ATTRS = "number,id,description,timestamp,duration,result,url,actions[remoteUrls],changeSet[%s]" % CHANGESET_ATTRS
+FOLDER_JOB_BUILDS_MINIMAL_ATTRS = "number,id,timestamp,duration,result,url"
+BUILD_DETAIL_ATTRS = "actions[remoteUrls],changeSet[%s]" % CHANGESET_ATTRS
+CHANGESET_PROJECTION = re.compile(r'(changeSets?)\[%s\]' % re.escape(CHANGESET_ATTRS))
+JOB_ACTIVITY_FIELDS = "lastBuild[number,timestamp]"
+FOLDER_CLASS = "com.cloudbees.hudson.plugins.folder.Folder"
 
 JENKINS_URL           = "{prefix}/api/json"
+TOP_LEVEL_JOBS_URL    = "{prefix}/api/json?tree=jobs[name]"
 ALL_JOBS_URL          = "{prefix}/api/json?tree=jobs[displayName,name,url,jobs[displayName,name,url]]"
 #VIEW_JOBS_URL         = "{prefix}/view/{view}/api/json?depth=0&tree=jobs[name]"
 #VIEW_JOBS_ENDPOINT    = "/api/json?depth=0&tree=jobs[name]"
@@ -33,12 +52,22 @@ VIEW_FOLDERS_URL      = "{prefix}/view/{view}/api/json?tree=jobs[displayName,nam
 JOB_BUILDS_URL        = "{prefix}/view/{view}/job/{job}/api/json?tree=builds[%s]" % BUILD_ATTRS
 FOLDER_JOBS_URL       = "{prefix}/job/{folder_name}/api/json?tree=jobs[displayName,name,url]"
 FOLDER_JOB_BUILDS_URL = "{prefix}/job/{folder_name}/jobs/{job_name}/api/json?tree=builds[%s]" % FOLDER_JOB_BUILD_ATTRS
-FOLDER_JOB_BUILD_URL  = "{prefix}/job/{folder_name}/jobs/{job_name}/{number}/api/json"
+FOLDER_JOB_BUILD_URL  = "{job_url}/{number}/api/json?tree=%s" % BUILD_DETAIL_ATTRS
+BUILD_BY_NUMBER_URL   = "{job_url}/{number}/api/json?tree=%s" % FOLDER_JOB_BUILD_ATTRS
+CONTAINER_BUILDS_URL  = "%s/api/json?tree=jobs[name,builds[%s]{0,%d}]{%d,%d}"
+BUILD_FEED_URL        = "{prefix}/rssAll"
+
+HTTP_CACHE_DIR = "log/jenkins_http_cache"
+DEFAULT_BATCH_SIZE = 50  # jobs per request for BatchedFetch
+AUTO_MAX_DEPTH     = 10  # deepest MaxDepth the MaxDepth auto mode will crawl with
+INVENTORY_TIMEOUT  = None  # the full crawl of a large Jenkins can take minutes, the Timeout value doesn't apply to it
 
 
 ############################################################################################
 
 class JenkinsConnection(BLDConnection):
+    DEFAULT_CONCURRENCY = 1  # when the Jenkins config has no Concurrency value
+
     def __init__(self, config, logger):
         super().__init__(logger)
         self.jenkins = None
@@ -81,7 +110,41 @@ class JenkinsConnection(BLDConnection):
         self.all_views  = []
         self.all_jobs   = []
         self.view_folders = {}
-        self.maxDepth   = config.get('MaxDepth', 1) + 2
+        max_depth       = config.get('MaxDepth', 1)
+        self.auto_depth = str(max_depth).lower() == 'auto'
+        if not self.auto_depth and (not isinstance(max_depth, int) or max_depth < 0):
+            raise ConfigurationError("Jenkins MaxDepth value must be zero, a positive integer or auto")
+        self.maxDepth   = (self.configuredItemsDepth() if self.auto_depth else max_depth) + 2
+        self.concurrency = int(config.get('Concurrency', self.DEFAULT_CONCURRENCY))
+        if self.concurrency < 1:
+            raise ConfigurationError("Jenkins Concurrency value must be a positive integer")
+        self.pool_size  = int(config.get('PoolSize', max(DEFAULT_POOL_SIZE, self.concurrency)))
+        self.timeout    = int(config.get('Timeout', DEFAULT_TIMEOUT))
+        self.limiter    = None
+        if config.get('AdaptiveConcurrency', False):
+            # start with a single request in flight and let the limiter work up towards Concurrency
+            max_retries  = int(config.get('MaxRetries', DEFAULT_MAX_RETRIES))
+            self.limiter = AdaptiveLimiter(self.concurrency, initial_limit=1, max_retries=max_retries)
+        self.prefilter_idle_jobs = config.get('PrefilterIdleJobs', True)
+        self.stream_build_history = config.get('StreamBuildHistory', False)
+        self.two_phase_fetch = config.get('TwoPhaseFetch', False)
+        self.targeted_crawl  = config.get('TargetedCrawl', False)
+        self.measure_build_fields = config.get('MeasureBuildFields', False)
+        self.batched_fetch   = config.get('BatchedFetch', False)
+        self.feed_discovery  = config.get('FeedDiscovery', False)
+        self.batch_size      = int(config.get('BatchSize', DEFAULT_BATCH_SIZE))
+        if self.batch_size < 1:
+            raise ConfigurationError("Jenkins BatchSize value must be a positive integer")
+        self.inventory_cache = None
+        self.cached_vetting  = None
+        inventory_cache_ttl  = int(config.get('InventoryCacheTTL', 0)) * 60  # config value is in minutes
+        if inventory_cache_ttl > 0:
+            fingerprint = self.configFingerprint(config)
+            cache_file  = "log/jenkins_inventory_%s.cache" % fingerprint[:12]
+            self.inventory_cache = InventoryCache(cache_file, inventory_cache_ttl, fingerprint, self.log)
+        self.http_cache_size = int(config.get('HttpCacheSize', 0)) * 1024 * 1024  # config value is in megabytes
+        if self.http_cache_size < 0:
+            raise ConfigurationError("Jenkins HttpCacheSize value must be zero or a positive integer")
         if self.username:
             if self.api_token:
                 cred = self.api_token
@@ -103,13 +166,24 @@ class JenkinsConnection(BLDConnection):
             self.http_proxy = {self.protocol : proxy}
             self.log.info("Proxy for Jenkins connection:  %s" % proxy)
 
+        http_cache = None
+        if self.http_cache_size:
+            http_cache = HttpCache(HTTP_CACHE_DIR, self.http_cache_size, self.log, user=self.username)
+        self.http = JenkinsHttpClient(self.log, auth=self.creds, proxies=self.http_proxy,
+                                      pool_size=self.pool_size, timeout=self.timeout, limiter=self.limiter,
+                                      cache=http_cache)
+
         valid_config_items = ['Server', 'Protocol', 'Prefix', 'Port', 'API_Token', 'MaxItems',
                               'Username', 'User', 'Password',
                               'ProxyProtocol', 'ProxyServer', 'ProxyPort', 'ProxyUser', 'ProxyUsername',
                               'ProxyPassword',
                               'Debug', 'Lookback',
                               'AgileCentral_DefaultBuildProject',
-                              'MaxDepth', 'FullFolderPath',
+                              'MaxDepth', 'FullFolderPath', 'Concurrency', 'PoolSize', 'Timeout',
+                              'Class', 'PrefilterIdleJobs', 'InventoryCacheTTL', 'StreamBuildHistory',
+                              'TwoPhaseFetch', 'TargetedCrawl', 'AdaptiveConcurrency', 'MaxRetries',
+                              'MeasureBuildFields', 'HttpCacheSize', 'BatchedFetch', 'BatchSize',
+                              'FeedDiscovery', 'ParseWorkers',
                               'Views', 'Jobs', 'Folders',
                              ]
 
@@ -119,6 +193,19 @@ class JenkinsConnection(BLDConnection):
                 invalid_config_items)
             raise ConfigurationError(problem)
 
+        self.parse_workers = int(config.get('ParseWorkers', 0))
+        if self.parse_workers < 0:
+            raise ConfigurationError("Jenkins ParseWorkers value must be zero or a positive integer")
+        self.parse_pool = None  # only there while getRecentBuilds is retrieving the build histories
+
+    def configFingerprint(self, config):
+        """
+            Return a digest of the Jenkins config section (and connector version), any change
+            in the config results in a different fingerprint.
+        """
+        content = json.dumps(config, sort_keys=True, default=str)
+        return hashlib.sha1(("%s|%s" % (__version__, content)).encode('utf-8')).hexdigest()
+
     def connect(self):
         """
         """
@@ -135,20 +222,23 @@ class JenkinsConnection(BLDConnection):
         return True
 
     def _getJenkinsVersion(self):
-        version = None
         jenkins_url = "%s/manage" % self.base_url
         self.log.debug(jenkins_url)
         try:
-            response = requests.get(jenkins_url, auth=self.creds, proxies=self.http_proxy)
+            response = self.http.get(jenkins_url)
         except Exception as msg:
             self.log.error(msg)
-        if response.status_code >= 300:
-            mo = re.search(r'<title>.*?</title>', response.text)
+        return self._extractJenkinsVersion(response.status_code, response.text, response.headers)
+
+    def _extractJenkinsVersion(self, status_code, text, headers):
+        version = None
+        if status_code >= 300:
+            mo = re.search(r'<title>.*?</title>', text)
             msg = mo.group(0) if mo else 'Connection error to Jenkins'
-            raise ConfigurationError('%s  status_code: %s' % (msg, response.status_code))
+            raise ConfigurationError('%s  status_code: %s' % (msg, status_code))
 
-        # self.log.debug(response.headers)
-        extract = [value for key, value in response.headers.items() if key.lower() == 'x-jenkins']
+        # self.log.debug(headers)
+        extract = [value for key, value in headers.items() if key.lower() == 'x-jenkins']
         if extract:
             version = extract.pop(0)
         return version
@@ -157,7 +247,7 @@ class JenkinsConnection(BLDConnection):
         class_exists = False
         jenkins_url = "%s/api/json" %self.base_url
         self.log.debug(jenkins_url)
-        response = requests.get(jenkins_url, auth=self.creds, proxies=self.http_proxy)
+        response = self.http.get(jenkins_url)
         extract = [key for key in response.json() if key == '_class']
         if extract:
             class_exists = True
@@ -165,12 +255,15 @@ class JenkinsConnection(BLDConnection):
 
     def disconnect(self):
         """
-            Just reset our jenkins instance variable to None
+            Just reset our jenkins instance variable to None and let go of the pooled connections
         """
         self.jenkins = None
+        self.http.close()
 
     def makeFieldsString(self, depth):
         basic_fields = '_class,name,displayName,views[name,jobs[name]],jobs'
+        if self.prefilter_idle_jobs:
+            basic_fields = '_class,name,displayName,%s,views[name,jobs[name,%s]],jobs' % (JOB_ACTIVITY_FIELDS, JOB_ACTIVITY_FIELDS)
         detailed_fetch = basic_fields[:]
         if depth <= 1:
             return basic_fields
@@ -182,43 +275,323 @@ class JenkinsConnection(BLDConnection):
     def obtainJenkinsInventory(self):
         """
              Utilize the Jenkins REST API endpoint to obtain all visible/accessible Jenkins Jobs/Views/Folders
+             (or use the inventory snapshot from the inventory cache when it is still valid)
+        """
+        if self.restoreCachedInventory():
+            return
+        self.inventory = self.crawlInventory()
+
+    def crawlInventory(self, jenkins_info=None):
+        """
+            Return an inventory built from the Jenkins REST API, using the targeted crawl when that
+            is configured and able to resolve the config items, otherwise the full crawl of the
+            Jenkins job tree (whose response may already be at hand in jenkins_info).
+        """
+        if self.targeted_crawl:
+            inventory = self.crawlConfiguredItems()
+            if inventory:
+                return inventory
+        if jenkins_info is None:
+            jenkins_url = self.inventoryUrl()
+            response = self.http.get(jenkins_url, timeout=INVENTORY_TIMEOUT)
+            jenkins_info = response.json()
+        inventory = self.buildInventory(jenkins_info)
+        if self.auto_depth:
+            if not self.full_folder_path:
+                inventory = self.deepenInventory(inventory)
+            self.log.info("Jenkins job tree crawled with MaxDepth %d (auto)" % (self.maxDepth - 2))
+        return inventory
+
+    def configuredItemsDepth(self):
+        """
+            Return the fewest folder levels (ie, the MaxDepth value) the inventory query has to span
+            to list the jobs of every configured Folder and View, as far as the config names tell.
+            With FullFolderPath a name is the whole path ('a // b // c' is 3 levels down), otherwise
+            it is only a lower bound as the named folder may be nested in any number of other folders.
+        """
+        separator = ' // ' if self.full_folder_path else '/'
+        levels  = [len(folder['Folder'].split(separator))   for folder in self.folders]
+        levels += [len(view['View'].split(separator)) - 1   for view   in self.views]
+        return max(levels + [0])
+
+    def deepenInventory(self, inventory):
+        """
+            For MaxDepth auto without FullFolderPath, crawl the job tree again one folder level deeper
+            for as long as a configured Folder or View hasn't been reached and the inventory has folders
+            whose contents were beyond the reach of the crawl (up to a MaxDepth of AUTO_MAX_DEPTH).
+        """
+        while self.maxDepth - 2 < AUTO_MAX_DEPTH:
+            unreached = self.unreachedConfigItems(inventory)
+            if not unreached or not self.foldersBeyondReach(inventory):
+                break
+            self.maxDepth += 1
+            self.log.info("%s not reached, crawling the Jenkins job tree with MaxDepth %d" % \
+                          (', '.join("'%s'" % name for name in unreached), self.maxDepth - 2))
+            inventory = self.buildInventory(self.http.getJSON(self.inventoryUrl(), timeout=INVENTORY_TIMEOUT))
+        return inventory
+
+    def unreachedConfigItems(self, inventory):
+        """
+            Return the names of the configured Folders and Views whose jobs aren't in the inventory,
+            either because they aren't in Jenkins or because they are beyond the reach of the crawl
+            (a folder one level deeper than MaxDepth is listed, but not its jobs).
+        """
+        if self.full_folder_path:
+            getFolder, getView = inventory.getFolderByPath, inventory.getViewByPath
+        else:
+            getFolder, getView = inventory.getFolder, inventory.getView
+        unreached  = [folder['Folder'] for folder in self.folders if not self.withinReach(getFolder(folder['Folder']))]
+        unreached += [view['View']     for view   in self.views   if not self.withinReach(getView(view['View']))]
+        return unreached
+
+    def withinReach(self, container):
+        return container is not None and self.folderLevel(container.url) <= self.maxDepth - 2
+
+    def foldersBeyondReach(self, inventory):
+        return [path for path, folder in inventory.folders.items() if not self.withinReach(folder)]
+
+    def folderLevel(self, url):
+        """
+            Return the number of folders the url (of a folder or view) is nested in, a top level folder being 1.
+        """
+        return url[len(self.base_url):].count('/job/')
+
+    def maxDepthSetting(self):
+        if self.auto_depth:
+            return "auto (%d)" % (self.maxDepth - 2)
+        return self.config.get('MaxDepth', 1)
+
+    def crawlConfiguredItems(self):
+        """
+            With FullFolderPath config item paths, each configured Folder and View can be requested
+            directly by walking the path segments it names, so rather than crawling the whole Jenkins
+            job tree, only the top level jobs (for the Jobs entries) and the configured Folders and
+            Views are requested.  The responses are assembled into a skeleton of the Jenkins job tree
+            which is run through buildInventory just as the full crawl response would be.
+            Returns None when the config items can't all be resolved that way (the full crawl then
+            gets the final say on what is or isn't present in Jenkins).
+        """
+        if not self.full_folder_path:
+            self.log.info("TargetedCrawl requires FullFolderPath : True, the whole Jenkins job tree will be crawled")
+            return None
+
+        item_fields = "name,_class"
+        if self.prefilter_idle_jobs:
+            item_fields = "%s,%s" % (item_fields, JOB_ACTIVITY_FIELDS)
+        container_fields = "_class,name,jobs[%s]" % item_fields
+
+        folder_paths = [folder['Folder'].split(' // ') for folder in self.folders]
+        view_paths   = [view['View'].split(' // ')     for view   in self.views]
+        urls  = ["%s/api/json?tree=jobs[%s]" % (self.base_url, item_fields)]
+        urls += ["%s/api/json?tree=%s" % (self.folderPathUrl(path), container_fields) for path in folder_paths]
+        urls += ["%s/view/%s/api/json?tree=%s" % (self.folderPathUrl(path[:-1]), quote(path[-1]), container_fields)
+                 for path in view_paths]
+        self.log.info("Targeted crawl of %d Jenkins Folders and %d Views" % (len(folder_paths), len(view_paths)))
+        responses = self._fetchInventoryPieces(urls)
+        if any(response is None for response in responses):
+            return None
+
+        root_info = {'jobs': responses[0]['jobs'], 'views': []}
+        root_job_names = [job['name'] for job in root_info['jobs'] if 'name' in job and not job['_class'].endswith('.Folder')]
+        unresolved = [job['Job'] for job in self.jobs if job['Job'] not in root_job_names]
+        if unresolved:
+            self.log.info("Jobs %s are not top level Jenkins jobs, crawling the whole Jenkins job tree" % ', '.join(unresolved))
+            return None
+
+        folder_infos = responses[1:len(folder_paths) + 1]
+        for path, folder_info in sorted(zip(folder_paths, folder_infos), key=lambda pair: len(pair[0])):
+            folder_node = self.skeletonFolder(root_info, path)
+            if folder_node is None or not folder_info['_class'].endswith('.Folder'):
+                return None
+            folder_node['jobs'] = folder_info['jobs']
+
+        for path, view_info in zip(view_paths, responses[len(folder_paths) + 1:]):
+            container = root_info if len(path) == 1 else self.skeletonFolder(root_info, path[:-1])
+            if container is None:
+                return None
+            view_info['name'] = path[-1]
+            container.setdefault('views', []).append(view_info)
+
+        return self.buildInventory(root_info)
+
+    def folderPathUrl(self, path):
+        return self.base_url + ''.join('/job/%s' % quote(segment) for segment in path)
+
+    def skeletonFolder(self, root_info, path):
+        """
+            Return the folder node at path in the skeleton job tree, creating nodes for any folders
+            along the path that haven't been requested (their contents aren't needed).
+            Returns None if an item along the path is known to not be a folder.
+        """
+        node = root_info
+        for segment in path:
+            matches = [item for item in node.setdefault('jobs', []) if item.get('name') == segment]
+            if not matches:
+                matches = [{'name': segment, '_class': FOLDER_CLASS}]
+                node['jobs'].append(matches[0])
+            node = matches[0]
+            if not node['_class'].endswith('.Folder'):
+                return None
+        return node
+
+    def _fetchInventoryPieces(self, urls):
+        """
+            Issue the requests for the urls and return the decoded JSON responses in the same order,
+            None for any request not answered with a 200 status (ie, the configured item isn't there).
+        """
+        def fetch(url):
+            response = self.http.get(url)
+            return response.json() if response.status_code == 200 else None
+
+        for url in urls:
+            self.log.debug("inventory req_url: %s" % url)
+        if self.concurrency <= 1:
+            return [fetch(url) for url in urls]
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(urls))) as pool:
+            return list(pool.map(fetch, urls))
+
+    def restoreCachedInventory(self):
+        """
+            If the inventory cache holds a snapshot that hasn't expired and was built for this config,
+            make it the current inventory and return True.
+            As a cheap check on the snapshot still reflecting the Jenkins instance, the names of the
+            top level Jenkins jobs/folders are obtained and compared against those in the snapshot
+            (and with PrefilterIdleJobs, the jobs of the configured Folders and Views, see refreshBuildActivity).
+        """
+        self.cached_vetting = None
+        if not self.inventory_cache:
+            return False
+        snapshot = self.inventory_cache.load()
+        if not snapshot:
+            return False
+
+        top_level_url = TOP_LEVEL_JOBS_URL.format(prefix=self.base_url)
+        top_level_names = sorted(job['name'] for job in self.http.getJSON(top_level_url)['jobs'] if 'name' in job)
+        if top_level_names != snapshot['top_level_names']:
+            self.log.info("Top level Jenkins jobs/folders have changed since the inventory cache was written, refreshing the inventory")
+            return False
+
+        if not self.refreshBuildActivity(snapshot['inventory']):
+            self.log.info("Jobs in the configured Jenkins Folders/Views have changed since the inventory cache was written, refreshing the inventory")
+            return False
+
+        self.inventory = snapshot['inventory']
+        self.cached_vetting = (snapshot['vetted_jobs'], snapshot['vetted_view_jobs'], snapshot['vetted_folder_jobs'])
+        created = time.strftime("%Y-%m-%d %H:%M:%S Z", time.gmtime(snapshot['created']))
+        self.log.info("Jenkins inventory restored from %s written at %s" % (self.inventory_cache.filename, created))
+        return True
+
+    def refreshBuildActivity(self, inventory):
         """
+            The lastBuild info in an inventory snapshot is stale, so with PrefilterIdleJobs it is brought
+            up to date with a jobs[name,_class,lastBuild[...]] request for each configured Folder and View
+            (and for the top level when there are configured Jobs).  Those requests double as a check on
+            the jobs in each of them still being the ones in the snapshot, as a job added to a configured
+            Folder would otherwise go unseen until the snapshot expires.
+            Returns False if that check fails, True otherwise.
+        """
+        inventory.forgetBuildActivity()
+        if not self.prefilter_idle_jobs:
+            return True
+
+        if self.full_folder_path:
+            getFolder, getView = inventory.getFolderByPath, inventory.getViewByPath
+        else:
+            getFolder, getView = inventory.getFolder, inventory.getView
+        top_level_jobs = [job for job in inventory.jobs if job.container == self.base_url]
+        containers  = [(self.base_url, top_level_jobs)] if self.jobs else []
+        containers += [getFolder(folder['Folder']) for folder in self.folders]
+        containers += [getView(view['View'])       for view   in self.views]
+        if None in containers:
+            return False
+        containers = [item if isinstance(item, tuple) else (item.url, item.jobs) for item in containers]
+
+        urls = ["%s/api/json?tree=jobs[name,_class,%s]" % (url, JOB_ACTIVITY_FIELDS) for url, jobs in containers]
+        for (url, jobs), response in zip(containers, self._fetchInventoryPieces(urls)):
+            if response is None:
+                return False
+            listed = {item['name']: item for item in response['jobs'] if not item['_class'].endswith('.Folder')}
+            if sorted(listed) != sorted(job.name for job in jobs):
+                return False
+            for job in jobs:
+                job = job.job if isinstance(job, JenkinsViewJob) else job
+                job.recordBuildActivity(listed[job.name])
+        self.log.info("lastBuild info of the jobs in %d configured Jenkins containers refreshed" % len(containers))
+        return True
+
+    def saveInventoryCache(self):
+        snapshot = {'top_level_names'    : self.inventory.top_level_names,
+                    'inventory'          : self.inventory,
+                    'vetted_jobs'        : self.vetted_jobs,
+                    'vetted_view_jobs'   : self.vetted_view_jobs,
+                    'vetted_folder_jobs' : self.vetted_folder_jobs,
+                   }
+        try:
+            self.inventory_cache.save(snapshot)
+            self.log.info("Jenkins inventory saved in %s" % self.inventory_cache.filename)
+        except Exception as msg:
+            self.log.warn("Unable to save the Jenkins inventory in %s, %s" % (self.inventory_cache.filename, msg))
+
+    def inventoryUrl(self):
         urlovals = {'prefix': self.base_url}
         jenkins_url = JENKINS_URL.format(**urlovals)
         self.log.info("Jenkins initial query url: %s" % jenkins_url)
-        urlovals = {'prefix': self.base_url}
 
         fields = self.makeFieldsString(self.maxDepth)
         jenkins_url = "%s?depth=%d&tree=%s" % (JENKINS_URL.format(**urlovals), self.maxDepth, fields)
-        response = requests.get(jenkins_url, auth=self.creds, proxies=self.http_proxy)
-        status = response.status_code
-        jenkins_info = response.json()
-
-        job_bucket = []
-        folder_bucket = {}
-        view_bucket = {}
-        base_views  = [view for view in jenkins_info['views'] if not view['_class'].endswith('AllView')]
-        for view in base_views:
-            view_bucket['/%s' % view['name']] = JenkinsView(view, base_url=self.base_url)
-        job_bucket, folder_bucket, view_bucket = self.fill_buckets(jenkins_info['jobs'], self.base_url, job_bucket, folder_bucket, view_bucket)
-        self.inventory = JenkinsInventory(self.base_url, job_bucket, folder_bucket, view_bucket)
-
-    def fill_buckets(self, jobs, container, job_bucket, folder_bucket, view_bucket, level=1):
-
-        non_folders = [job for job in jobs if 'name' in job.keys() and not job['_class'].endswith('.Folder')]
-        folders     = [job for job in jobs if 'name' in job.keys() and     job['_class'].endswith('.Folder')]
-
-        for job in non_folders:
-            job_bucket.append(JenkinsJob(job, container=container, base_url=self.base_url))
-        for folder in folders:
-            name = folder.get('name', 'NO-NAME-FOLDER')
-            fcon = self.get_folder_full_path(container, name)
-            folder_bucket[fcon] = JenkinsJobsFolder(folder, container, folder_url="%s/job/%s" % (container, name))
-            folder_views = [view for view in folder['views'] if not view['_class'].endswith('AllView')]
-            for folder_view in folder_views:
-                full_view_path = self.get_view_full_path(container, name, folder_view['name'])
-                view_bucket[full_view_path] = JenkinsView(folder_view, '%s/job/%s' % (container, name), base_url="%s/job/%s" % (container, name))
-            self.fill_buckets(folder['jobs'], '%s/job/%s' % (container, name), job_bucket, folder_bucket, view_bucket, level + 1)
+        return jenkins_url
+
+    def buildInventory(self, jenkins_info):
+        """
+            Sort the jobs, folders and views in the jenkins_info response into their
+            respective buckets and return a JenkinsInventory instance holding those buckets.
+        """
+        job_bucket, folder_bucket, view_bucket = self.fill_buckets(jenkins_info['jobs'], jenkins_info['views'], self.base_url, [], {}, {})
+        top_level_names = sorted(job['name'] for job in jenkins_info['jobs'] if 'name' in job)
+        return JenkinsInventory(self.base_url, job_bucket, folder_bucket, view_bucket, top_level_names)
+
+    def fill_buckets(self, jobs, views, container, job_bucket, folder_bucket, view_bucket):
+        """
+            Walk the job tree (depth first, in the order Jenkins returns the items) without recursion.
+            Each pending folder carries its path components as a tuple, so the folder and view
+            bucket keys are simply joined rather than being re-derived from the container url.
+            There is one JenkinsJob per job, the folder holding the job and any views of the
+            job refer to that same instance.
+        """
+        pending = [(None, container, ())]
+        while pending:
+            folder, parent, path = pending.pop()
+            container = parent
+            if folder is not None:
+                name = folder['name']
+                jobs, views = folder.get('jobs', []), folder.get('views', [])
+                container = "%s/job/%s" % (parent, name)
+                path = path + (name,)
+
+            level_jobs, subfolders = [], []
+            for job in jobs:
+                if 'name' not in job:
+                    continue
+                if job['_class'].endswith('.Folder'):
+                    subfolders.append((job, container, path))
+                else:
+                    level_jobs.append(JenkinsJob(job, container=container, base_url=self.base_url))
+            job_bucket.extend(level_jobs)
+
+            if folder is not None:
+                folder_bucket['/%s' % '/'.join(path)] = JenkinsJobsFolder(folder, parent, folder_url=container, jobs=level_jobs)
+
+            peers = {job.name: job for job in level_jobs}
+            for view in views:
+                if view['_class'].endswith('AllView'):
+                    continue
+                if folder is None:
+                    view_bucket['/%s' % view['name']] = JenkinsView(view, base_url=self.base_url, peers=peers)
+                else:
+                    view_path = '/%s/%s' % ('/'.join(path), view['name'])
+                    view_bucket[view_path] = JenkinsView(view, container, base_url=container, peers=peers)
+
+            pending.extend(reversed(subfolders))
 
         return job_bucket, folder_bucket, view_bucket
 
@@ -339,10 +712,16 @@ class JenkinsConnection(BLDConnection):
         if self.duplicate_items_found():
             return False
 
-        if self.full_folder_path:
-            vetted = self.fullyPathedConfigItemsVetted()
+        if self.cached_vetting:
+            self.vetted_jobs, self.vetted_view_jobs, self.vetted_folder_jobs = self.cached_vetting
+            vetted = True
         else:
-            vetted =  self.nonFullyPathedConfigItemsVetted()
+            if self.full_folder_path:
+                vetted = self.fullyPathedConfigItemsVetted()
+            else:
+                vetted =  self.nonFullyPathedConfigItemsVetted()
+            if vetted and self.inventory_cache:
+                self.saveInventoryCache()
 
         if not vetted:
             self.log.error("Some Jobs, Views, or Job Folders were invalid in your configuration")
@@ -394,9 +773,9 @@ class JenkinsConnection(BLDConnection):
         self.vetted_folder_jobs = {}
 
         if self.jobs:
-            job_names = [job.name.replace('::','') for job in self.inventory.jobs]
-            config_job_names = [job['Job'] for job in self.jobs]
-            diff = set(config_job_names) - set(job_names)
+            job_names = {job.name.replace('::','') for job in self.inventory.jobs}
+            config_job_names = {job['Job'] for job in self.jobs}
+            diff = config_job_names - job_names
             if diff:
                 villains = ', '.join(["'%s'" % d for d in diff])
                 self.log.error("these jobs: %s  were not present in the Jenkins inventory of Jobs" % villains)
@@ -410,11 +789,11 @@ class JenkinsConnection(BLDConnection):
 
             config_view_names = [view['View'] for view in self.views]
             # other means of detecting things in config_view_names that are not in view_names
-            diff = [name for name in config_view_names if name not in view_map.keys()]
+            diff = [name for name in config_view_names if name not in view_map]
             if diff:
                 villains = ', '.join(["'%s'" % d for d in diff])
                 self.log.error("these views: %s  were not present in the Jenkins inventory of Views" % villains)
-                max_depth_comment = "Check if MaxDepth value %s in config is sufficient to reach these views" % self.config['MaxDepth']
+                max_depth_comment = "Check if MaxDepth value %s in config is sufficient to reach these views" % self.maxDepthSetting()
                 self.log.error(max_depth_comment)
                 if self.config['FullFolderPath']:
                     fqp_comment = "Check if your View entries use the fully qualified path syntax"
@@ -434,11 +813,11 @@ class JenkinsConnection(BLDConnection):
 
             config_folder_names = [folder['Folder'] for folder in self.folders]
             # other means of detecting things in config_folder_names that are not in folder_names
-            diff = [name for name in config_folder_names if name not in folder_map.keys()]
+            diff = [name for name in config_folder_names if name not in folder_map]
             if diff:
                 villains = ', '.join(["'%s'" % d for d in diff])
                 self.log.error("these folders: %s  were not present in the Jenkins inventory of Folders" % villains)
-                max_depth_comment = "Check if MaxDepth value %s in config is sufficient to reach these folders" % self.config['MaxDepth']
+                max_depth_comment = "Check if MaxDepth value %s in config is sufficient to reach these folders" % self.maxDepthSetting()
                 self.log.error(max_depth_comment)
                 if self.config['FullFolderPath']:
                     fqp_comment = "Check if your Folder entries use the fully qualified path syntax"
@@ -456,48 +835,12 @@ class JenkinsConnection(BLDConnection):
 
 
     def getMatchingFullyQualifiedFolderPathJobs(self, folder):
-        folder_path = folder['Folder']
-        jenkins_folder = self.inventory.getFolderByPath(folder_path)
-        all_folder_jobs = jenkins_folder.jobs
-
-        included_jobs = all_folder_jobs[:]
-        if 'include' in folder:
-            inclusions = folder.get('include', '*')
-            inclusions = inclusions.replace('*', '\.*')
-            include_patt = "(%s)" % '|'.join(re.split(', ?', inclusions))
-            included_jobs = [job for job in all_folder_jobs if re.search(include_patt, job.name) != None]
-
-        excluded_jobs = []
-        if 'exclude' in folder and folder['exclude']:
-            exclusions = folder.get('exclude')
-            exclusions = exclusions.replace('*', '\.*')
-            exclude_patt = "(%s)" % '|'.join(re.split(', ?', exclusions))
-            excluded_jobs = [job for job in all_folder_jobs if re.search(exclude_patt, job.name) != None]
-
-        qualifying_jobs = list(set(included_jobs) - set(excluded_jobs))
-        return qualifying_jobs
+        jenkins_folder = self.inventory.getFolderByPath(folder['Folder'])
+        return JobSelector.forConfigItem(folder).select(jenkins_folder.jobs)
 
     def getMatchingFullyQualifiedViewPathJobs(self, view):
-        view_path = view['View']
-        jenkins_view = self.inventory.getViewByPath(view_path)
-        all_view_jobs = jenkins_view.jobs
-
-        included_jobs = all_view_jobs[:]
-        if 'include' in view:
-            inclusions = view.get('include', '*')
-            inclusions = inclusions.replace('*', '\.*')
-            include_patt = "(%s)" % '|'.join(re.split(', ?', inclusions))
-            included_jobs = [job for job in all_view_jobs if re.search(include_patt, job.name) != None]
-
-        excluded_jobs = []
-        if 'exclude' in view and view['exclude']:
-            exclusions = view.get('exclude')
-            exclusions = exclusions.replace('*', '\.*')
-            exclude_patt = "(%s)" % '|'.join(re.split(', ?', exclusions))
-            excluded_jobs = [job for job in all_view_jobs if re.search(exclude_patt, job.name) != None]
-
-        qualifying_jobs = list(set(included_jobs) - set(excluded_jobs))
-        return qualifying_jobs
+        jenkins_view = self.inventory.getViewByPath(view['View'])
+        return JobSelector.forConfigItem(view).select(jenkins_view.jobs)
 
 
     def nonFullyPathedConfigItemsVetted(self):
@@ -512,9 +855,9 @@ class JenkinsConnection(BLDConnection):
         self.vetted_folder_jobs = {}
 
         if self.jobs:
-            job_names = [job.name.replace('::','') for job in self.inventory.jobs]
-            config_job_names = [job['Job'] for job in self.jobs]
-            diff = set(config_job_names) - set(job_names)
+            job_names = {job.name.replace('::','') for job in self.inventory.jobs}
+            config_job_names = {job['Job'] for job in self.jobs}
+            diff = config_job_names - job_names
             if diff:
                 villains = ', '.join(["'%s'" % d for d in diff])
                 self.log.error("these jobs: %s  were not present in the Jenkins inventory of Jobs" % villains)
@@ -523,7 +866,7 @@ class JenkinsConnection(BLDConnection):
             self.vetted_jobs = [job for job in self.inventory.jobs if job.name in config_job_names]
 
         if self.views:
-            view_names = [view_name.rsplit('/', 1)[-1] for view_name in self.inventory.views.keys()]
+            view_names = {view_name.rsplit('/', 1)[-1] for view_name in self.inventory.views.keys()}
             config_view_names = [view['View'] for view in self.views]
             diff = [name for name in  config_view_names if name not in view_names]
             if diff:
@@ -539,13 +882,13 @@ class JenkinsConnection(BLDConnection):
                 self.vetted_view_jobs[key] = view_jobs
 
         if self.folders:
-            folder_names = [folder_name.rsplit('/', 1)[-1] for folder_name in self.inventory.folders.keys()]
+            folder_names = {folder_name.rsplit('/', 1)[-1] for folder_name in self.inventory.folders.keys()}
             config_folder_names = [folder['Folder'] for folder in self.folders]
             # other means of detecting things in config_folder_names that are not in folder_names
             diff = [name for name in config_folder_names if name not in folder_names]
             if diff:
                 villains = ', '.join(["'%s'" % d for d in diff])
-                max_depth_comment = "Check if MaxDepth value %s in config is sufficient to reach these folders" % self.config['MaxDepth']
+                max_depth_comment = "Check if MaxDepth value %s in config is sufficient to reach these folders" % self.maxDepthSetting()
                 self.log.error("these folders: %s  were not present in the Jenkins inventory of Folders" % villains)
                 self.log.error(max_depth_comment)
                 return False
@@ -571,46 +914,11 @@ class JenkinsConnection(BLDConnection):
 
     def getQualifyingFolderJobs(self, folder):
         jenkins_folder = self.inventory.getFolder(folder['Folder'])
-        all_folder_jobs = jenkins_folder.jobs
-
-        included_jobs   = all_folder_jobs[:]
-        if 'include' in folder:
-            inclusions = folder.get('include', '*')
-            inclusions = inclusions.replace('*', '\.*')
-            include_patt = "(%s)" % '|'.join(re.split(', ?', inclusions))
-            included_jobs = [job for job in all_folder_jobs if re.search(include_patt, job.name) != None]
-
-        excluded_jobs = []
-        if 'exclude' in folder and folder['exclude']:
-            exclusions = folder.get('exclude')
-            exclusions = exclusions.replace('*', '\.*')
-            exclude_patt = "(%s)" % '|'.join(re.split(', ?', exclusions))
-            excluded_jobs = [job for job in all_folder_jobs if re.search(exclude_patt, job.name) != None]
-
-        qualifying_jobs = list(set(included_jobs) - set(excluded_jobs))
-        return qualifying_jobs
-
+        return JobSelector.forConfigItem(folder).select(jenkins_folder.jobs)
 
     def getQualifyingViewJobs(self, view):
-
         jenkins_view = self.inventory.getView(view['View'])
-        all_view_jobs = jenkins_view.jobs
-
-        include_patt = view.get('include', '*')
-        include_patt = include_patt.replace('*', '\.*')
-        included_jobs = [job for job in all_view_jobs if re.search(include_patt, job.name) != None]
-        excluded_jobs = []
-        if 'exclude' in view:
-            exclusions = re.split(',\s*', view['exclude'])
-            for job in included_jobs:
-                for exclusion in exclusions:
-                    exclusion = exclusion.replace('*', '\.*')
-                    if re.search(exclusion, job.name):
-                        excluded_jobs.append(job)
-                        break
-
-        qualifying_jobs = list(set(included_jobs) - set(excluded_jobs))
-        return qualifying_jobs
+        return JobSelector.forConfigItem(view).select(jenkins_view.jobs)
 
     def showQualifiedJobs(self):
         self.log.debug('Configured top level Jobs')
@@ -644,8 +952,12 @@ class JenkinsConnection(BLDConnection):
         pending_operation = "Detecting recently added Jenkins Builds (added on or after %s)"
         self.log.info(pending_operation % ref_time_readable)
 
+        ref_time_millis = calendar.timegm(zulu_ref_time) * 1000
+
         builds = {}
         recent_builds_count = 0
+        fetches = []  # (key, job, label, builds_url, folder_name) in the order the config lists them
+        idle_jobs = 0
 
         for folder_conf in self.folders:
             folder_name = folder_conf['Folder']
@@ -653,9 +965,11 @@ class JenkinsConnection(BLDConnection):
             key = '%s::%s' % (folder_name, ac_project)
             builds[key] = {}
             for job in self.vetted_folder_jobs[key]:
-                builds[key][job] = self.getFolderJobBuildHistory(folder_name, job, zulu_ref_time)
-                self.log.debug("retrieved %d builds for Job %s that occured after %s" % (len(builds[key][job]), job.fully_qualified_path(), ref_time_readable))
-                recent_builds_count += len(builds[key][job])
+                if self.isIdle(job, ref_time_millis):
+                    builds[key][job] = []
+                    idle_jobs += 1
+                    continue
+                fetches.append((key, job, 'Job', self.folderJobBuildHistoryUrl(folder_name, job), folder_name))
 
         for view_conf in self.views:
             view_name  = view_conf['View']
@@ -663,9 +977,11 @@ class JenkinsConnection(BLDConnection):
             key = '%s::%s' % (view_name, ac_project)
             builds[key] = {}
             for job in self.vetted_view_jobs[key]:
-                builds[key][job] = self.getBuildHistory(view_name, job, zulu_ref_time)
-                self.log.debug("retrieved %d builds for View Job %s that occured after %s" % (len(builds[key][job]), job.fully_qualified_path(), ref_time_readable))
-                recent_builds_count += len(builds[key][job])
+                if self.isIdle(job, ref_time_millis):
+                    builds[key][job] = []
+                    idle_jobs += 1
+                    continue
+                fetches.append((key, job, 'View Job', self.buildHistoryUrl(view_name, job), None))
 
         for job in self.jobs:
             jenkins_job = self.inventory.getJob(job['Job'])
@@ -673,12 +989,52 @@ class JenkinsConnection(BLDConnection):
             key = 'All::%s' % ac_project
             if key not in builds:
                 builds[key] = {}
-            builds[key][jenkins_job] = self.getBuildHistory('All', jenkins_job, zulu_ref_time)
-            self.log.debug("retrieved %d builds for Folder Job %s that occured after %s" % (len(builds[key][jenkins_job]), jenkins_job.fully_qualified_path(), ref_time_readable))
-            recent_builds_count += len(builds[key][jenkins_job])
+            if self.isIdle(jenkins_job, ref_time_millis):
+                builds[key][jenkins_job] = []
+                idle_jobs += 1
+                continue
+            fetches.append((key, jenkins_job, 'Folder Job', self.buildHistoryUrl('All', jenkins_job), None))
+
+        if idle_jobs:
+            self.log.info("%d jobs have no builds since %s or since the last run, their build history was not requested" % (idle_jobs, ref_time_readable))
+        if self.feed_discovery and fetches:
+            fetches, quiet = self.discoverBuiltJobs(fetches, ref_time_millis)
+            for key, job, label, builds_url, folder_name in quiet:
+                builds[key][job] = []
+        distinct_fetches, sharers = self.dedupeFetches(fetches)
+        if len(distinct_fetches) < len(fetches):
+            self.log.info("%d jobs are covered by more than one config item, %d duplicate build history fetches avoided" % \
+                          (sum(1 for sharing in sharers if len(sharing) > 1), len(fetches) - len(distinct_fetches)))
+        self.parse_pool = self.startParsePool()
+        try:
+            if self.batched_fetch:
+                histories = self._fetchBatchedBuildHistories(distinct_fetches, zulu_ref_time)
+            else:
+                histories = self._fetchBuildHistories(distinct_fetches, zulu_ref_time)
+        except Exception:
+            if self.cached_vetting:
+                # a configured job may have gone away since the snapshot was written, crawl afresh next time
+                self.log.warn("Build history retrieval failed, discarding the inventory cache")
+                self.inventory_cache.invalidate()
+            raise
+        finally:
+            if self.parse_pool:
+                self.parse_pool.shutdown()
+                self.parse_pool = None
+        for sharing, history in zip(sharers, histories):
+            fetched_after = self.watermarkFor(sharing[0][1])
+            for key, job, label, builds_url, folder_name in sharing:
+                after_number = self.watermarkFor(job)
+                job_builds = history if after_number == fetched_after else [build for build in history if build.number > after_number]
+                builds[key][job] = job_builds
+                self.log.debug("retrieved %d builds for %s %s that occured after %s" % (len(job_builds), label, job.fully_qualified_path(), ref_time_readable))
+                recent_builds_count += len(job_builds)
 
         log_msg = "recently added Jenkins Builds detected: %s"
         self.log.info(log_msg % recent_builds_count)
+        self.logTraffic()
+        if self.measure_build_fields:
+            self.measureBuildFields(distinct_fetches)
 
         if self.debug:
             jbf = open('jenkins.blds.hist', 'w+')
@@ -687,123 +1043,705 @@ class JenkinsConnection(BLDConnection):
 
         return builds
 
+    def startParsePool(self):
+        """
+            Return a pool of ParseWorkers processes for decoding the build history responses, or None
+            when ParseWorkers isn't in effect.  The threads retrieving the build histories each wait
+            on the pool for the page they handed it, so the pool only pays off with Concurrency above 1.
+            The worker processes are started from a forkserver (spawned where there is none) rather
+            than forked from this process, which by then has threads running.
+        """
+        if not self.parse_workers:
+            return None
+        if self.stream_build_history:
+            self.log.info("ParseWorkers is not used with StreamBuildHistory, build history responses are decoded as they arrive")
+            return None
+        if self.concurrency <= 1:
+            self.log.info("ParseWorkers is not used with a Concurrency of 1, build history responses are decoded in process")
+            return None
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        return ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=multiprocessing.get_context(start_method))
+
+    def dedupeFetches(self, fetches):
+        """
+            A job can be covered by several config items (eg, a Folder and a View or two Views), each
+            with its own (key, job, label, builds_url, folder_name) fetch.  Return the fetches with one
+            per distinct job (by the url of the job itself, so a view job and the job in its folder are
+            the same job) along with, for each of those, the list of all the fetches for the job.
+            The fetch kept for a job is the one with the lowest watermark, so that its build history
+            goes back far enough for all the fetches sharing it, it comes first in its list.
+        """
+        sharers = {}  # canonical job url -> [fetch, ...] in fetch order
+        for fetch in fetches:
+            sharers.setdefault(self.canonicalJobUrl(fetch[1]), []).append(fetch)
+        groups = []
+        for sharing in sharers.values():
+            lowest = min(sharing, key=lambda fetch: self.watermarkFor(fetch[1]))
+            groups.append([lowest] + [fetch for fetch in sharing if fetch is not lowest])
+        return [sharing[0] for sharing in groups], groups
+
+    def measureBuildFields(self, fetches):
+        """
+            For the MeasureBuildFields config setting, request the first page of each job's build history
+            both with the changeset projection that used to be used (changeSet[*[*[*]]]) and with the
+            explicit one now used, and log the response size of each per job and in total.
+            This doubles up on the requests, it is meant for an occasional diagnostic run.
+        """
+        before_total = after_total = 0
+        for key, job, label, builds_url, folder_name in fetches:
+            after_url = self.buildPageUrl(builds_url, 0)
+            if not CHANGESET_PROJECTION.search(after_url):
+                continue  # eg, with TwoPhaseFetch the build history has no changeset info
+            before_url = CHANGESET_PROJECTION.sub(r'\1[%s]' % WILDCARD_CHANGESET_ATTRS, after_url)
+            before = len(self.http.get(before_url).content)
+            after  = len(self.http.get(after_url).content)
+            before_total += before
+            after_total  += after
+            self.log.info("build history response bytes for %s: %d with changeSet[%s], %d with the explicit projection" % \
+                          (job.fully_qualified_path(), before, WILDCARD_CHANGESET_ATTRS, after))
+        if before_total:
+            self.log.info("build history response bytes in total: %d before, %d after (%.1f%% less)" % \
+                          (before_total, after_total, 100.0 * (before_total - after_total) / before_total))
+
+    def discoverBuiltJobs(self, fetches, ref_time_millis):
+        """
+            For FeedDiscovery, use the builds listed in the Jenkins /rssAll feed to split the fetches into
+            those for jobs built since ref_time and the rest (the quiet jobs, which need not be fetched).
+            The feed leaves out builds still in progress, so a job whose last build (as far as the inventory
+            knows) started since ref_time is kept.  When the feed can't be had or doesn't reach back as far
+            as ref_time (it lists a limited number of builds), all of the fetches are kept.
+            Returns the fetches to be made and the quiet ones.
+        """
+        response = self.http.get(BUILD_FEED_URL.format(prefix=self.base_url))
+        feed = None
+        if response.status_code == 200:
+            try:
+                feed = BuildFeed(response.content)
+            except ValueError as msg:
+                self.log.warn("Unable to read the Jenkins build feed, %s" % msg)
+        else:
+            self.log.warn("Jenkins build feed request failed with status %d" % response.status_code)
+        if feed is None or not feed.reachesBack(ref_time_millis):
+            if feed is not None:
+                self.log.info("Jenkins build feed (%d builds) doesn't reach back to the ref time" % len(feed.entries))
+            self.log.info("build history of all %d jobs is to be requested" % len(fetches))
+            return fetches, []
+
+        oldest = time.strftime("%Y-%m-%d %H:%M:%S Z", time.gmtime(feed.oldest() / 1000))
+        self.log.info("Jenkins build feed (%d builds) reaches back to %s, before the ref time" % (len(feed.entries), oldest))
+        built = feed.jobsBuiltSince(ref_time_millis)
+        active, quiet = [], []
+        for fetch in fetches:
+            job = fetch[1]
+            recent = job.last_build_timestamp is not None and job.last_build_timestamp >= ref_time_millis
+            (active if recent or self.relativeJobUrl(job) in built else quiet).append(fetch)
+        for key, job, label, builds_url, folder_name in quiet:
+            self.log.debug("no builds of %s %s in the Jenkins build feed, its build history is not requested" % (label, job.fully_qualified_path()))
+        self.log.info("Jenkins build feed lists builds for %d of %d jobs, the build history of the other %d was not requested" % \
+                      (len(active), len(fetches), len(quiet)))
+        return active, quiet
+
+    def isIdle(self, job, ref_time_millis):
+        """
+            Use the lastBuild info obtained with the inventory to determine whether a job can't
+            have any builds of interest, ie, it has never been built, its last build started before
+            the ref_time or its last build is at or below the job's watermark.
+            A job whose lastBuild is unknown is never considered idle.
+        """
+        if not self.prefilter_idle_jobs or job.last_build_number is None:
+            return False
+        if job.last_build_number == 0:
+            return True
+        if job.last_build_timestamp < ref_time_millis:
+            return True
+        return job.last_build_number <= self.watermarkFor(job)
+
+    def _fetchBuildHistories(self, fetches, ref_time):
+        """
+            Retrieve the build history for each (key, job, label, builds_url, folder_name) item
+            in fetches and return the results in the same order as the fetches.
+            When Concurrency is greater than 1 the requests are spread over a bounded pool of
+            worker threads and every fetch runs its course, see raiseFailedFetches for how a
+            failing fetch is dealt with.  The methods run on worker threads, here and in the other
+            requests fanned out over a pool, leave all logging to the thread that started the pool.
+        """
+        if self.concurrency <= 1 or len(fetches) <= 1:
+            return [self.retrieveBuildHistory(builds_url, job, folder_name, ref_time)
+                    for key, job, label, builds_url, folder_name in fetches]
+
+        workers = min(self.concurrency, len(fetches))
+        self.log.debug("fetching build history for %d jobs using %d workers" % (len(fetches), workers))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self.retrieveBuildHistory, builds_url, job, folder_name, ref_time)
+                       for key, job, label, builds_url, folder_name in fetches]
+        outcomes = [future.exception() or future.result() for future in futures]
+        self.raiseFailedFetches(fetches, outcomes)
+        return outcomes
+
+    def raiseFailedFetches(self, fetches, outcomes):
+        """
+            outcomes holds the build history (or the exception raised) for each of the fetches.
+            Each failed fetch is logged with the job it was for and the first of them (in config order)
+            gets raised.  The build histories that were obtained aren't returned, as the builds of the
+            failed job would be passed over for good once the other jobs were moved past them.
+        """
+        failures = [(fetch, outcome) for fetch, outcome in zip(fetches, outcomes) if isinstance(outcome, Exception)]
+        for (key, job, label, builds_url, folder_name), failure in failures:
+            self.log.error("Build history retrieval for %s %s failed: %s" % (label, job.fully_qualified_path(), failure))
+        if failures:
+            raise failures[0][1]
+
+    def _fetchBatchedBuildHistories(self, fetches, ref_time):
+        """
+            For BatchedFetch, the first page of builds of the jobs in fetches that share a container
+            (folder, view or the top level) is obtained for all of them together, with a request per
+            BatchSize jobs of the container, and split back out per job.  The build histories are
+            returned in the same order as the fetches.
+            A container is batched only when that takes fewer requests than a request per job (see worthBatching).
+            A job in a container that isn't batched, missing from the container's response or with more
+            builds of interest than fit in a page is left to the per job retrieval of _fetchBuildHistories.
+        """
+        containers = {}  # (container url, build attrs) -> [index of the fetch, ...]
+        for index, (key, job, label, builds_url, folder_name) in enumerate(fetches):
+            containers.setdefault((job.container, self.batchBuildAttrs(builds_url)), []).append(index)
+        batched = [container for container, indexes in containers.items()
+                   if self.worthBatching(container[0], len(indexes))]
+        job_pages = self._fetchContainerBuilds(batched)
+
+        ref_time_millis = calendar.timegm(ref_time) * 1000
+        histories = [None] * len(fetches)
+        for container, pages in zip(batched, job_pages):
+            for index in containers[container]:
+                key, job, label, builds_url, folder_name = fetches[index]
+                page = pages.get(job.name, None) if pages is not None else None
+                after_number = self.watermarkFor(job)
+                if page is None or self.needsNextPage(page, 0, ref_time, ref_time_millis, after_number):
+                    continue
+                histories[index] = self.extractQualifyingBuilds(job.name, folder_name, ref_time, page,
+                                                                after_number=after_number)
+
+        remaining = [index for index, history in enumerate(histories) if history is None]
+        self.log.info("build history of %d jobs obtained in batches for %d containers, %d jobs requested individually" % \
+                      (len(fetches) - len(remaining), len(batched), len(remaining)))
+        if remaining:
+            for index, history in zip(remaining, self._fetchBuildHistories([fetches[index] for index in remaining], ref_time)):
+                histories[index] = history
+        return histories
+
+    def worthBatching(self, container_url, wanted):
+        """
+            Return True when the batches of retrieveContainerBuilds, which cover every item the inventory
+            has for the container (a full last batch calls for one more request), take fewer requests
+            than a request for each of the wanted jobs.  A container the inventory doesn't know isn't batched.
+        """
+        size = self.inventory.containerSize(container_url)
+        return size is not None and size // self.batch_size + 1 < wanted
+
+    def batchBuildAttrs(self, builds_url):
+        """
+            Return the builds[...] attributes of a job's builds_url with the changeset asked for under
+            both the changeSet (freestyle) and changeSets (pipeline) names, as a container can hold both
+            kinds of jobs.  JenkinsBuild picks whichever applies from the build's _class.
+        """
+        attrs = builds_url.split('tree=builds[', 1)[1][:-1].replace('changeSets[', 'changeSet[')
+        if 'changeSet[' in attrs:
+            attrs += ',changeSets[%s]' % CHANGESET_ATTRS
+        return attrs
+
+    def _fetchContainerBuilds(self, containers):
+        """
+            Issue the requests for each (container url, build attrs) in containers and return a dict
+            of job name to the list of raw builds for each container, in the same order as the containers.
+        """
+        if self.concurrency <= 1 or len(containers) <= 1:
+            return [self.retrieveContainerBuilds(url, attrs) for url, attrs in containers]
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(containers))) as pool:
+            return list(pool.map(lambda container: self.retrieveContainerBuilds(*container), containers))
+
+    def retrieveContainerBuilds(self, container_url, attrs):
+        """
+            Request the first page of builds (see buildPageSize) of every job in the container, using the
+            range syntax of the tree parameter on the jobs to take BatchSize jobs at a time.
+            Returns a dict of job name to the list of raw builds (most recent first) or None if the
+            container didn't answer with a 200 status.
+        """
+        pages = {}
+        start = 0
+        while True:
+            url = CONTAINER_BUILDS_URL % (container_url, attrs, self.buildPageSize(), start, start + self.batch_size)
+            response = self.http.get(url)
+            if response.status_code != 200:
+                return None
+            items = response.json().get('jobs', [])
+            for item in items:
+                if 'builds' in item:  # a folder in the container has no builds
+                    pages[item['name']] = item['builds']
+            if len(items) < self.batch_size:
+                return pages
+            start += self.batch_size
+
     def getBuildHistory(self, view, job, ref_time):
-        JOB_BUILDS_ENDPOINT = "/api/json?tree=builds[%s]" % BUILD_ATTRS
+        job_builds_url = self.buildHistoryUrl(view, job)
+        return self.retrieveBuildHistory(job_builds_url, job, None, ref_time)
+
+    def getFolderJobBuildHistory(self, folder_name, job, ref_time):
+        folder_job_builds_url = self.folderJobBuildHistoryUrl(folder_name, job)
+        return self.retrieveBuildHistory(folder_job_builds_url, job, folder_name, ref_time)
+
+    def buildHistoryUrl(self, view, job):
+        JOB_BUILDS_ENDPOINT = "/api/json?tree=builds[%s]" % (FOLDER_JOB_BUILDS_MINIMAL_ATTRS if self.two_phase_fetch else BUILD_ATTRS)
         urlovals = {'prefix': self.base_url, 'view': quote(view), 'job': quote(job.name)}
         job_builds_url = job.url + (JOB_BUILDS_ENDPOINT.format(**urlovals))
         if job._type == 'WorkflowJob':
             job_builds_url = job_builds_url.replace('changeSet', 'changeSets')
         self.log.debug("view: %s  job: %s  req_url: %s" % (view, job, job_builds_url))
-        raw_builds = requests.get(job_builds_url, auth=self.creds, proxies=self.http_proxy).json()['builds']
-        qualifying_builds = self.extractQualifyingBuilds(job.name, None, ref_time, raw_builds)
-        return qualifying_builds
+        return job_builds_url
 
-    def getFolderJobBuildHistory(self, folder_name, job, ref_time):
-        folder_job_builds_url = job.url + ('/api/json?tree=builds[%s]' % FOLDER_JOB_BUILD_ATTRS)
+    def folderJobBuildHistoryUrl(self, folder_name, job):
+        build_attrs = FOLDER_JOB_BUILDS_MINIMAL_ATTRS if self.two_phase_fetch else FOLDER_JOB_BUILD_ATTRS
+        folder_job_builds_url = job.url + ('/api/json?tree=builds[%s]' % build_attrs)
         if job._type == 'WorkflowJob':
             folder_job_builds_url = folder_job_builds_url.replace('changeSet', 'changeSets')
         self.log.debug("folder: %s  job: %s  req_url: %s" % (folder_name, job.name, folder_job_builds_url))
-        raw_builds = requests.get(folder_job_builds_url, auth=self.creds, proxies=self.http_proxy).json()['builds']
-        qualifying_builds = self.extractQualifyingBuilds(job.name, folder_name, ref_time, raw_builds)
-        return qualifying_builds
+        return folder_job_builds_url
+
+    def retrieveBuildHistory(self, builds_url, job, folder_name, ref_time):
+        """
+            Issue the request(s) for the builds_url and return the list of JenkinsBuild items
+            that occurred at or after ref_time.
+            The builds are requested a page (see buildPageSize) at a time using the range syntax
+            of the tree parameter, the next page only being requested when every build of the
+            page is still of interest.
+            With StreamBuildHistory on, the builds are decoded one at a time as the response
+            arrives and the response is abandoned once a build before ref_time turns up.
+        """
+        if self.parse_pool:
+            return self.retrieveParsedBuildHistory(builds_url, job, folder_name, ref_time)
+        after_number = self.watermarkFor(job)
+        ref_time_millis = calendar.timegm(ref_time) * 1000
+        raw_builds = []
+        start = 0
+        while True:
+            page = self.retrieveBuildPage(self.buildPageUrl(builds_url, start), ref_time, ref_time_millis, after_number)
+            raw_builds.extend(page)
+            if not self.needsNextPage(page, start, ref_time, ref_time_millis, after_number):
+                break
+            start += self.buildPageSize()
+        return self.extractQualifyingBuilds(job.name, folder_name, ref_time, raw_builds, after_number=after_number)
+
+    def retrieveParsedBuildHistory(self, builds_url, job, folder_name, ref_time):
+        """
+            The ParseWorkers take on retrieveBuildHistory, the pages of builds are requested here,
+            but the content of each is handed to a process of the parse pool to be decoded into the
+            JenkinsBuild items of interest (see parseBuildPage), so the decoding isn't held to the
+            one core the threads of this process share.
+        """
+        after_number = self.watermarkFor(job)
+        builds = []
+        beyond_horizon = False
+        start = 0
+        while True:
+            content = self.http.get(self.buildPageUrl(builds_url, start)).content
+            page_builds, page_length, last_beyond = self.parse_pool.submit(parseBuildPage, content, job.name, folder_name,
+                                                                           ref_time, after_number, not self.two_phase_fetch).result()
+            if not beyond_horizon:
+                builds.extend(page_builds)
+                beyond_horizon = len(page_builds) < page_length
+            if last_beyond or self.pageLimitReached(page_length, start):
+                break
+            start += self.buildPageSize()
+        return builds[::-1]
+
+    def retrieveBuildPage(self, page_url, ref_time, ref_time_millis, after_number):
+        if not self.stream_build_history:
+            return self.http.getJSON(page_url)['builds']
+
+        page = []
+        with closing(self.http.streamJSONArray(page_url, 'builds')) as raw_builds:
+            for brec in raw_builds:
+                page.append(brec)
+                if self.isBeyondHorizon(brec, ref_time, ref_time_millis, after_number):
+                    break
+        return page
+
+    def buildPageSize(self):
+        """
+            The number of builds asked for per build history request, the Service MaxBuilds value
+            (when the connector has supplied it) but no more than MaxItems.
+        """
+        max_items = int(self.max_items)
+        return max(1, min(max_items, self.max_builds or max_items))
+
+    def buildPageUrl(self, builds_url, start):
+        """
+            Return the builds_url (whose tree parameter ends with the builds[...] spec) ranged to
+            a page of builds from the start index, never going past MaxItems builds in all.
+        """
+        end = min(start + self.buildPageSize(), int(self.max_items))
+        return "%s{%d,%d}" % (builds_url, start, end)
+
+    def needsNextPage(self, page, start, ref_time, ref_time_millis, after_number):
+        """
+            The next page of builds is only of interest if this page was full, its last (oldest) build
+            is still within the horizon and MaxItems builds have not yet been requested.
+            Note that Jenkins lists no more than the 100 most recent builds of a job in builds.
+        """
+        if self.pageLimitReached(len(page), start):
+            return False
+        return not self.isBeyondHorizon(page[-1], ref_time, ref_time_millis, after_number)
 
-    def extractQualifyingBuilds(self, job_name, folder_name, ref_time, raw_builds):
+    def pageLimitReached(self, page_length, start):
+        """
+            The page of builds from the start index wasn't full or MaxItems builds have been requested.
+        """
+        page_size = self.buildPageSize()
+        return page_length < page_size or start + page_size >= int(self.max_items)
+
+    def watermarkFor(self, job):
+        """
+            Return the number of the most recent build of the job already reflected in Agile Central
+            or 0 if there is no watermark for the job.
+        """
+        watermark = self.watermarks.get(job.fully_qualified_path(), None)
+        return watermark['number'] if watermark else 0
+
+    def extractQualifyingBuilds(self, job_name, folder_name, ref_time, raw_builds, after_number=0):
         builds = []
+        ref_time_millis = calendar.timegm(ref_time) * 1000
         for brec in raw_builds:
-            # print(brec)
-            build = JenkinsBuild(job_name, brec, job_folder=folder_name)
-            if build.id_as_ts < ref_time:  # when true build time is older than ref_time, don't consider this job
+            if self.isBeyondHorizon(brec, ref_time, ref_time_millis, after_number):
                 break
-            builds.append(build)
+            builds.append(JenkinsBuild(job_name, brec, job_folder=folder_name, complete=not self.two_phase_fetch))
         return builds[::-1]
 
+    def completeBuild(self, job, build):
+        """
+            With TwoPhaseFetch on, the build history requests only obtained the minimal attributes
+            of each build, here the actions and changeset details of a build that is about
+            to be reflected in Agile Central are obtained from the per-build endpoint.
+        """
+        if getattr(build, 'complete', True):
+            return
+        build_url = FOLDER_JOB_BUILD_URL.format(job_url=job.url, number=build.number)
+        if job._type == 'WorkflowJob':
+            build_url = build_url.replace('changeSet', 'changeSets')
+        self.log.debug("job: %s  build: %s  req_url: %s" % (job.name, build.number, build_url))
+        build.absorbDetails(self.http.getJSON(build_url))
+
+    def configuredJobEntries(self):
+        """
+            Return a list of the (key, job, folder_name) for each job covered by each config item,
+            in config order, the key being as in the dict returned by getRecentBuilds.
+        """
+        entries = []
+        for folder_conf in self.folders:
+            folder_name = folder_conf['Folder']
+            key = '%s::%s' % (folder_name, folder_conf.get('AgileCentral_Project', self.ac_project))
+            entries.extend((key, job, folder_name) for job in self.vetted_folder_jobs[key])
+        for view_conf in self.views:
+            key = '%s::%s' % (view_conf['View'], view_conf.get('AgileCentral_Project', self.ac_project))
+            entries.extend((key, job, None) for job in self.vetted_view_jobs[key])
+        for job in self.jobs:
+            key = 'All::%s' % job.get('AgileCentral_Project', self.ac_project)
+            entries.append((key, self.inventory.getJob(job['Job']), None))
+        return entries
+
+    def eventJobIndex(self):
+        """
+            Return a dict keyed by the url of each configured job relative to the Jenkins base url
+            (as a Notification plugin event has it, eg, 'job/frozique/job/australopithicus') with
+            a list of the (key, job, folder_name) each config item that covers the job has for it.
+            A view job is indexed by the url of the job itself rather than its view scoped url.
+        """
+        index = {}
+        for key, job, folder_name in self.configuredJobEntries():
+            index.setdefault(self.relativeJobUrl(job), []).append((key, job, folder_name))
+        return index
+
+    def relativeJobUrl(self, job):
+        """
+            Return the (unquoted) url of the job relative to the Jenkins base url, eg, 'job/frozique/job/australopithicus',
+            for a view job that of the job itself.
+        """
+        return urllib.parse.unquote(self.canonicalJobUrl(job)[len(self.base_url):]).strip('/')
+
+    def canonicalJobUrl(self, job):
+        return job.job.url if isinstance(job, JenkinsViewJob) else job.url
+
+    def getEventBuilds(self, events):
+        """
+            Return the builds announced by the events (BuildEvent instances) in the same form as
+            getRecentBuilds, but with only the configured jobs the events are for and only the
+            announced builds of those jobs.  Each announced build is requested once, by number,
+            no matter how many config items cover its job.  Events for jobs that are not configured
+            are ignored, as are builds at or below the job's watermark.
+        """
+        index = self.eventJobIndex()
+        targets = {}  # (canonical job url, build number) -> [(key, job, folder_name), ...]
+        ignored = 0
+        for event in events:
+            entries = index.get(urllib.parse.unquote(event.job_url), None)
+            if not entries:
+                ignored += 1
+                continue
+            entries = [entry for entry in entries if event.number > self.watermarkFor(entry[1])]
+            if entries:
+                targets[(self.canonicalJobUrl(entries[0][1]), event.number)] = entries
+        if ignored:
+            self.log.info("%d build notifications were for jobs not covered by the config, ignored" % ignored)
+
+        builds = self.retrieveBuildsByNumber(targets)
+        self.log.info("%d builds requested from Jenkins for %d build notifications" % (len(targets), len(events)))
+        self.logTraffic()
+        return builds
+
+    def logTraffic(self):
+        """
+            Log the counts of the REST requests made to Jenkins so far and, when in use, how the
+            requests were throttled and how many were answered from the HTTP cache.
+        """
+        self.log.info("Jenkins REST traffic: %s" % self.http.statistics())
+        if self.limiter:
+            self.log.info("Jenkins request throttling: %s" % self.limiter.statistics())
+        if self.http.cache:
+            self.log.info("Jenkins HTTP cache: %s" % self.http.cache.statistics())
+
+    def getPendingBuilds(self, pending):
+        """
+            pending is a dict keyed by job fully qualified path with a list of the numbers of the
+            builds of the job that were still running when last seen.  Return those builds (as they
+            are now) in the same form as getRecentBuilds, regardless of the job's watermark.
+            Pending builds of jobs no longer covered by the config are dropped.  A build of a job
+            covered by more than one config item is requested once.
+        """
+        targets = {}  # (canonical job url, build number) -> [(key, job, folder_name), ...]
+        for key, job, folder_name in self.configuredJobEntries():
+            for number in pending.get(job.fully_qualified_path(), []):
+                targets.setdefault((self.canonicalJobUrl(job), number), []).append((key, job, folder_name))
+        builds = self.retrieveBuildsByNumber(targets)
+        self.log.info("%d pending builds re-polled, %d of them now complete" % \
+                      (len(targets), sum(1 for jobs in builds.values() for job_builds in jobs.values()
+                                            for build in job_builds if build.result != 'None')))
+        return builds
+
+    def retrieveBuildsByNumber(self, targets):
+        """
+            targets is a dict keyed by (job url, build number) with the list of (key, job, folder_name)
+            the build is to be returned under.  Each build is requested once and the builds are
+            returned in the same form as getRecentBuilds.  A build that Jenkins no longer has is logged and left out.
+        """
+        def fetch(target):
+            job_url, number = target
+            build_url = BUILD_BY_NUMBER_URL.format(job_url=job_url, number=number)
+            if targets[target][0][1]._type == 'WorkflowJob':
+                build_url = build_url.replace('changeSet', 'changeSets')
+            response = self.http.get(build_url)
+            return response.json() if response.status_code == 200 else None
+
+        requested = list(targets)
+        if self.concurrency <= 1 or len(requested) <= 1:
+            raw_builds = [fetch(target) for target in requested]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(requested))) as pool:
+                raw_builds = list(pool.map(fetch, requested))
+
+        builds = {}
+        for target, raw in zip(requested, raw_builds):
+            if raw is None:
+                self.log.warn("Unable to retrieve build #%d of %s" % (target[1], target[0]))
+                continue
+            for key, job, folder_name in targets[target]:
+                builds.setdefault(key, {}).setdefault(job, []).append(JenkinsBuild(job.name, raw, job_folder=folder_name))
+        for jobs in builds.values():
+            for job_builds in jobs.values():
+                job_builds.sort(key=lambda build: build.number)
+        return builds
+
+    def isBeyondHorizon(self, brec, ref_time, ref_time_millis, after_number):
+        """
+            Builds are listed most recent first, once a build is reached that is already reflected
+            (at or below the job's watermark) or that is older than ref_time, it and all the builds
+            after it are of no interest.
+        """
+        return beyondHorizon(brec, ref_time, ref_time_millis, after_number)
+
+
+##############################################################################################
+
+def beyondHorizon(brec, ref_time, ref_time_millis, after_number):
+    if int(brec['number']) <= after_number:
+        return True
+    return JenkinsBuild.occurredBefore(brec, ref_time, ref_time_millis)
+
+def parseBuildPage(content, job_name, folder_name, ref_time, after_number, complete=True):
+    """
+        Decode the content of a build history response and return a (builds, page_length, last_beyond) tuple,
+        builds being the JenkinsBuild items for the builds listed ahead of the first one beyond the horizon
+        (see JenkinsConnection.isBeyondHorizon), page_length the number of builds listed and last_beyond
+        whether the last of them is beyond the horizon.
+        This is run in the processes of a ParseWorkers pool, so what goes in and comes out gets pickled.
+        The changeset information of each build is digested here, which lets go of the raw build record,
+        so only the compact JenkinsBuild and JenkinsChangeset items are handed back.
+    """
+    raw_builds = json.loads(content)['builds']
+    ref_time_millis = calendar.timegm(ref_time) * 1000
+    builds = []
+    for brec in raw_builds:
+        if beyondHorizon(brec, ref_time, ref_time_millis, after_number):
+            break
+        build = JenkinsBuild(job_name, brec, job_folder=folder_name, complete=complete)
+        build._digestChangeSets()  # now, rather than in the main process
+        builds.append(build)
+    last_beyond = bool(raw_builds) and beyondHorizon(raw_builds[-1], ref_time, ref_time_millis, after_number)
+    return builds, len(raw_builds), last_beyond
+
 
 ##############################################################################################
 
 class JenkinsInventory:
-    def __init__(self, base_url, job_bucket, folder_bucket, view_bucket):
+    def __init__(self, base_url, job_bucket, folder_bucket, view_bucket, top_level_names=None):
         self.base_url = base_url
         self.jobs     = job_bucket
         self.folders  = folder_bucket
         self.views    = view_bucket
+        self.top_level_names = top_level_names or []
+        self.container_sizes = None
+        self.buildIndexes()
+
+    def buildIndexes(self):
+        """
+            Construct the lookup tables used by the get* methods so that each lookup is a
+            dict access instead of a scan over the buckets.
+              job_index           - job name to job, top level jobs take precedence over folder jobs,
+                                    which take precedence over view jobs (first one seen wins)
+              folder_suffix_index - every trailing portion of a folder path ('/c', '/b/c', '/a/b/c')
+                                    to the first folder (in bucket order) whose path ends that way
+              view_suffix_index   - same as folder_suffix_index, for views
+              folder_path_index   - fully qualified config syntax path ('a // b // c') to folder path
+              view_path_index     - fully qualified config syntax path to view path
+        """
+        self.job_index = {}
+        for job in self.jobs:
+            self.job_index.setdefault(job.name, job)
+        for container in list(self.folders.values()) + list(self.views.values()):
+            for job in container.jobs:
+                self.job_index.setdefault(job.name, job)
+
+        self.folder_suffix_index = self._suffixIndex(self.folders)
+        self.view_suffix_index   = self._suffixIndex(self.views)
+        self.folder_path_index   = self._fullyQualifiedIndex(self.folders)
+        self.view_path_index     = self._fullyQualifiedIndex(self.views)
+
+    def _suffixIndex(self, bucket):
+        index = {}
+        for path, item in bucket.items():
+            components = path.split('/')[1:]
+            for ix in range(len(components)):
+                index.setdefault('/%s' % '/'.join(components[ix:]), item)
+        return index
+
+    def _fullyQualifiedIndex(self, bucket):
+        return {" // ".join(re.split(r'\/', path)[1:]) : path for path in sorted(bucket.keys())}
+
+    def containerSize(self, container_url):
+        """
+            Return the number of items (jobs and folders) the inventory has for the top level,
+            folder or view at container_url, None if there is no such container in the inventory.
+        """
+        if self.container_sizes is None:
+            sizes = {self.base_url: len(self.top_level_names)}
+            for job in self.jobs:
+                if job.container != self.base_url:
+                    sizes[job.container] = sizes.get(job.container, 0) + 1
+            for folder in self.folders.values():
+                sizes.setdefault(folder.url, 0)
+                parent = folder.url.rsplit('/job/', 1)[0]
+                if parent != self.base_url:
+                    sizes[parent] = sizes.get(parent, 0) + 1
+            for view in self.views.values():
+                sizes[view.url] = len(view.jobs)
+            self.container_sizes = sizes
+        return self.container_sizes.get(container_url, None)
+
+    def forgetBuildActivity(self):
+        """
+            Mark the lastBuild info of every job in the inventory as unknown.
+        """
+        jobs = self.jobs[:]
+        for folder in self.folders.values():
+            jobs.extend(folder.jobs)
+        for view in self.views.values():
+            # a JenkinsViewJob gets its lastBuild info from the folder/top level JenkinsJob it refers to
+            jobs.extend(job for job in view.jobs if isinstance(job, JenkinsJob))
+        for job in jobs:
+            job.last_build_number    = None
+            job.last_build_timestamp = None
 
     def getFolder(self, name):
         target = name if name.startswith('/') else '/%s' % name
-        folder = next((self.folders[folder] for folder in self.folders.keys() if folder.endswith(target)), None)
-        return folder
+        return self.folder_suffix_index.get(target, None)
 
     def getView(self, view_path):
         view_path = '/%s' % view_path if view_path[0] != '/' else view_path
-        target_view = next((self.views[vp] for vp in self.views.keys() if vp.endswith(view_path)), None)
-        return target_view
+        return self.view_suffix_index.get(view_path, None)
 
     def getJob(self, job_name):
-        first_level_jobs = [job for job in self.jobs if job.name == job_name]
-        if first_level_jobs:
-            return first_level_jobs[0]
-
-        jobs = []
-        for folder_path in self.folders.keys():
-           matching_jobs = [job for job in self.folders[folder_path].jobs if job.name == job_name]
-           if matching_jobs: jobs.extend(matching_jobs)
-        for view_path in self.views.keys():
-            matching_jobs = [job for job in self.views[view_path].jobs if job.name == job_name]
-            if matching_jobs: jobs.extend(matching_jobs)
-
-        return jobs[0]
+        return self.job_index.get(job_name, None)
 
     def getFullyQualifiedFolderMapping(self):
         # maps folder's path representation from the config file to the folder's path
-        #fm = {" // ".join(re.split(r'\/', key)[1:]) : key for key in self.folders.keys()}
-        fm = {}
-        for fk in sorted(self.folders.keys()):
-            #tfk = fk.replace(self.base_url,'')
-            path_components = re.split(r'\/', fk)[1:]
-            fqpath = " // ".join(path_components)
-            #print(fqpath)
-            fm[fqpath] = fk
-
-        return fm
+        return self.folder_path_index
 
     def getFolderByPath(self, folder_path):
-        folder_map = self.getFullyQualifiedFolderMapping()
-        if folder_path in folder_map:
-            folder = self.folders[folder_map[folder_path]]
-            return folder
+        if folder_path in self.folder_path_index:
+            return self.folders[self.folder_path_index[folder_path]]
         return None
 
-
     def getFullyQualifiedViewMapping(self):
         # maps view's path representation from the config file to the view's path
-        #vm = {" // ".join(re.split(r'\/', key)[1:]) : key for key in self.views.keys()}
-        vm = {}
-        for vk in sorted(self.views.keys()):
-            path_components = re.split(r'\/', vk)[1:]
-            fqpath = " // ".join(path_components)
-            #print(fqpath)
-            vm[fqpath] = vk
-
-        return vm
+        return self.view_path_index
 
     def getViewByPath(self, view_path):
-        view_map = self.getFullyQualifiedViewMapping()
-        if view_path in view_map:
-            folder = self.views[view_map[view_path]]
-            return folder
+        if view_path in self.view_path_index:
+            return self.views[self.view_path_index[view_path]]
         return None
 
 
 ##############################################################################################
 
 class JenkinsJob:
+    """
+        Slotted, as a large Jenkins instance has tens of thousands of these in the inventory.
+        The url is derived from the (shared) container string rather than stored per job.
+    """
+    __slots__ = ('container', 'name', '_type', 'last_build_number', 'last_build_timestamp', '_base_url')
+
     def __init__(self, info, container='Root', base_url=''):
         self.container = container
         self.name      = info.get('name', 'UNKNOWN-ITEM')
-        self._type     = info['_class'].split('.')[-1]
-        self.url       = "%s/job/%s" % (container, self.name)
+        self._type     = sys.intern(info['_class'].split('.')[-1])
+        # lastBuild is only present when the inventory query asked for it,
+        # a None last_build_number means nothing is known about the job's build activity
+        self.last_build_number    = None
+        self.last_build_timestamp = None
+        self.recordBuildActivity(info)
+        self._base_url = base_url
+
+    def recordBuildActivity(self, info):
+        if 'lastBuild' in info:
+            last_build = info['lastBuild'] or {'number': 0, 'timestamp': 0}  # null lastBuild --> never built
+            self.last_build_number    = int(last_build['number'])
+            self.last_build_timestamp = int(last_build['timestamp'])
+
+    @property
+    def url(self):
+        return "%s/job/%s" % (self.container, self.name)
+
+    @property
+    def job_path(self):
         # job_path is really only for dev purposes of displaying a short, readable job path, e.g. "/frozique::australopithicus"
-        self.job_path  = "%s::%s" % (re.sub(r'%s/?' % base_url, '', container), self.name)
-        self.job_path  = '/'.join(re.split('/?job/?', self.job_path))
+        job_path = "%s::%s" % (re.sub(r'%s/?' % self._base_url, '', self.container), self.name)
+        return '/'.join(re.split('/?job/?', job_path))
 
     def fully_qualified_path(self):
         return re.sub('https?://', '', self.url)
@@ -817,8 +1755,40 @@ class JenkinsJob:
 
 #############################################################################################
 
+class JenkinsViewJob:
+    """
+        A job as seen through a view.  Its url (and thus its identity in Agile Central) is
+        scoped by the view, but all else is obtained from the canonical JenkinsJob held
+        in the inventory for the container the view belongs to.
+    """
+    __slots__ = ('job', 'container')
+
+    def __init__(self, job, container):
+        self.job       = job
+        self.container = container
+
+    name                 = property(lambda self: self.job.name)
+    _type                = property(lambda self: self.job._type)
+    _base_url            = property(lambda self: self.job._base_url)
+    last_build_number    = property(lambda self: self.job.last_build_number)
+    last_build_timestamp = property(lambda self: self.job.last_build_timestamp)
+
+    url                  = JenkinsJob.url
+    job_path             = JenkinsJob.job_path
+    fully_qualified_path = JenkinsJob.fully_qualified_path
+    __str__              = JenkinsJob.__str__
+    __repr__             = JenkinsJob.__repr__
+
+#############################################################################################
+
 class JenkinsView:
-    def __init__(self, info, container='/', base_url=''):
+    __slots__ = ('name', 'url', 'jobs')
+
+    def __init__(self, info, container='/', base_url='', peers=None):
+        """
+            peers, when supplied, maps job name to the JenkinsJob instances already in the inventory
+            for the container this view belongs to, a view job for one of those refers to that instance.
+        """
         self.name = '/%s' % info['name']
         if container == '/':
             job_container  = "%s/view%s" % (base_url, self.name)
@@ -826,11 +1796,13 @@ class JenkinsView:
             job_container = "%s/view%s" % (container, self.name)
 
         self.url  = job_container
-        self.jobs = [JenkinsJob(job, job_container, base_url=base_url) for job in info['jobs'] if not job['_class'].endswith('.Folder')]
+        peers = peers or {}
+        self.jobs = [JenkinsViewJob(peers[job['name']], job_container) if job.get('name') in peers
+                     else JenkinsJob(job, job_container, base_url=base_url)
+                     for job in info['jobs'] if not job['_class'].endswith('.Folder')]
 
     def __str__(self):
-        vj = "%s::%s" % (self.container, self.name)
-        return "%-80.80s  %s" % (vj, self._type)
+        return "name: %-24.24s   jobs: %3d   url: %s " % (self.name, len(self.jobs), self.url)
 
     def __repr__(self):
         return str(self)
@@ -838,11 +1810,19 @@ class JenkinsView:
 #############################################################################################
 
 class JenkinsJobsFolder:
-    def __init__(self, info, container='/',  folder_url=''):
+    __slots__ = ('name', 'url', 'jobs')
+
+    def __init__(self, info, container='/',  folder_url='', jobs=None):
+        """
+            jobs, when supplied, are the JenkinsJob instances already in the inventory for the
+            folder's non-folder items, otherwise they are constructed from the info.
+        """
         self.name      = '/%s' % info['name']
         job_container  = "%s/job%s" % (container, self.name)
         self.url       = job_container
-        self.jobs      = [JenkinsJob(job, job_container, base_url=folder_url) for job in info['jobs'] if not job['_class'].endswith('.Folder')]
+        if jobs is None:
+            jobs = [JenkinsJob(job, job_container, base_url=folder_url) for job in info['jobs'] if not job['_class'].endswith('.Folder')]
+        self.jobs      = jobs
 
     def __str__(self):
         sub_jobs = len(self.jobs)
@@ -855,32 +1835,81 @@ class JenkinsJobsFolder:
     ###########################################################################################
 
 class JenkinsBuild(object):
-    def __init__(self, name, raw, job_folder=None):
+    """
+        Only the values that are cheap to obtain from the raw build record are set up front,
+        the display strings are computed when asked for and the changeset information is
+        digested from the raw build record on first access of vcs, revisions, repository or changeSets.
+    """
+    __slots__ = ('name', 'number', 'result', 'actions', 'id_str', 'Id', 'timestamp', 'url', 'duration', 'complete',
+                 '_raw', '_cs_label', '_vcs', '_revisions', '_repository', '_changeSets')
+
+    ID_TIMESTAMP_FORMAT = '%Y-%m-%d_%H-%M-%S'  # the format of build ids prior to Jenkins 1.597
+
+    def __init__(self, name, raw, job_folder=None, complete=True):
         """
+            complete is False when raw has only the minimal build attributes, the actions and
+            changeset details are then supplied later via absorbDetails.
         """
         self.name = name
         self.number = int(raw['number'])
         self.result = str(raw['result'])
-        self.actions = raw['actions']
+        self.actions = raw.get('actions', [])
+        self.complete = complete
         self.result = 'INCOMPLETE' if self.result == 'ABORTED' else self.result
-        cs_label = 'changeSet'
+        self._cs_label = 'changeSet'
         if str(raw['_class']).endswith('.WorkflowRun'):
-            cs_label = 'changeSets'
+            self._cs_label = 'changeSets'
 
         self.id_str = str(raw['id'])
         self.Id     = self.id_str
         self.timestamp = raw['timestamp']
         self.url    = str(raw['url'])
-
-        if re.search('^\d+$', self.id_str):
-            self.id_as_ts = time.gmtime(self.timestamp / 1000)
+        if self.id_str.isdigit():
             self.id_str = str(self.timestamp)
             self.Id = self.id_str
-        else:
-            self.id_as_ts = time.strptime(self.id_str, '%Y-%m-%d_%H-%M-%S')
-
-        self.started = time.strftime('%Y-%m-%d %H:%M:%SZ', time.gmtime(self.timestamp / 1000))
         self.duration = raw['duration']
+        self._raw = raw
+        self._changeSets = None
+
+    def absorbDetails(self, details):
+        """
+            Take on the actions and changeset information in details (the raw record of this
+            build obtained from the per-build endpoint).
+        """
+        self.actions = details.get('actions', [])
+        self._raw = dict(self._raw, **details)
+        self._changeSets = None
+        self.complete = True
+
+    @staticmethod
+    def occurredBefore(raw, ref_time, ref_time_millis):
+        """
+            Determine from a raw build record whether the build started before the ref_time
+            (a struct_time, with ref_time_millis being the same moment in epoch milliseconds)
+            without constructing a JenkinsBuild.
+        """
+        id_str = str(raw['id'])
+        if id_str.isdigit():
+            return raw['timestamp'] < ref_time_millis
+        return time.strptime(id_str, JenkinsBuild.ID_TIMESTAMP_FORMAT) < ref_time
+
+    @property
+    def id_as_ts(self):
+        if self.id_str.isdigit():  # a numeric id has been replaced by the (also numeric) timestamp
+            return time.gmtime(self.timestamp / 1000)
+        return time.strptime(self.id_str, JenkinsBuild.ID_TIMESTAMP_FORMAT)
+
+    @property
+    def started(self):
+        return time.strftime('%Y-%m-%d %H:%M:%SZ', time.gmtime(self.timestamp / 1000))
+
+    @property
+    def finished(self):
+        total = (self.timestamp + self.duration) / 1000
+        return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(total))
+
+    @property
+    def elapsed(self):
         whole, millis = divmod(self.duration, 1000)
         hours, leftover = divmod(whole, 3600)
         minutes, secs = divmod(leftover, 60)
@@ -892,17 +1921,39 @@ class JenkinsBuild(object):
             else:
                 duration = " %d:%02d.%03d" % (minutes, secs, millis)
 
-        self.elapsed = "%12s" % duration
+        return "%12s" % duration
 
-        total = (self.timestamp + self.duration) / 1000
-        self.finished = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(total))
+    @property
+    def vcs(self):
+        return self._digestChangeSets()[0]
+
+    @property
+    def revisions(self):
+        return self._digestChangeSets()[1]
 
-        self.vcs        = 'unknown'
-        self.revisions  = ''
-        self.repository = ''
-        self.changeSets = []
-        self.extractChangeSetInformation(raw, cs_label)
+    @property
+    def repository(self):
+        return self._digestChangeSets()[2]
 
+    @property
+    def changeSets(self):
+        return self._digestChangeSets()[3]
+
+    def _digestChangeSets(self):
+        """
+            Return the (vcs, revisions, repository, changeSets) for the build, a build that is not yet
+            complete (see absorbDetails) has no changeset information.
+        """
+        if not self.complete:
+            return 'unknown', '', '', []
+        if self._changeSets is None:
+            self._vcs        = 'unknown'
+            self._revisions  = ''
+            self._repository = ''
+            self._changeSets = []
+            self.extractChangeSetInformation(self._raw, self._cs_label)
+            self._raw = None  # the changeset info was all that was still needed from raw
+        return self._vcs, self._revisions, self._repository, self._changeSets
 
     def extractChangeSetInformation(self, json, cs_label):
         """
@@ -917,23 +1968,23 @@ class JenkinsBuild(object):
             if len(json[cs_label]) == 0:
                 return
             try:
-                self.vcs = json['changeSets'][0]['kind']
+                self._vcs = json['changeSets'][0]['kind']
             except Exception as msg:
                 self.log.warning(
                     'JenkinsBuild constructor unable to determine VCS kind, %s, marking vcs type as unknown' % (msg))
                 self.log.warning(
                     "We accessed your job's build JSON with this param %s and did not see 'kind' value" % BUILD_ATTRS)
-            self.revisions = json['changeSets'][0]['revisions'] if cs_label in json and 'revisions' in json['changeSets'][0] else None
+            self._revisions = json['changeSets'][0]['revisions'] if cs_label in json and 'revisions' in json['changeSets'][0] else None
             getRepoName = {'git': self.ripActionsForRepositoryName,
                            'svn': self.ripRevisionsForRepositoryName,
                            None: self.ripNothing
                            }
-            self.repository = getRepoName[self.vcs]()
+            self._repository = getRepoName[self.vcs]()
             if self.vcs != 'unknown':
                 for ch in json['changeSets']:
-                    self.changeSets.extend(self.ripChangeSets(self.vcs, ch['items']))
-            csd = {changeset.commitId: changeset for changeset in self.changeSets}
-            self.changeSets = [chgs for chgs in csd.values()]
+                    self._changeSets.extend(self.ripChangeSets(self.vcs, ch['items']))
+            csd = {changeset.commitId: changeset for changeset in self._changeSets}
+            self._changeSets = [chgs for chgs in csd.values()]
         except Exception as msg:
             self.log.warning('JenkinsBuild constructor unable to process %s information, %s' % (cs_label, msg))
 
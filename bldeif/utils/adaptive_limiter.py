@@ -0,0 +1,132 @@
+#############################################################################################
+
+import random
+import threading
+
+#############################################################################################
+
+THROTTLE_STATUSES   = (429, 503)   # Too Many Requests, Service Unavailable
+LATENCY_TOLERANCE   = 2.0          # smoothed latency this many times the baseline counts as rising latency
+DECREASE_FACTOR     = 0.5          # applied to the limit on a throttle response or timeout
+LATENCY_DECREASE    = 0.75         # applied to the limit on rising latency
+LATENCY_SMOOTHING   = 0.2          # weight of the newest sample in the smoothed latency
+BASELINE_DRIFT      = 0.01         # rate at which the baseline follows a smoothed latency above it
+BACKOFF_BASE        = 0.5          # seconds, doubled on each successive retry of a request
+BACKOFF_CAP         = 30.0         # seconds
+DEFAULT_MAX_RETRIES = 3
+
+#############################################################################################
+
+class AdaptiveLimiter(object):
+    """
+        An instance of this class decides how many Jenkins requests may be in flight at once,
+        using additive increase / multiplicative decrease:
+          - each request that completes with a latency close to the baseline (the lowest smoothed
+            latency seen) nudges the limit up, by about one per limit's worth of requests
+          - a 429 or 503 response or a timeout halves the limit
+          - a smoothed latency well above the baseline cuts the limit by a quarter (at most once
+            per limit's worth of requests)
+        The limit stays between min_limit and max_limit.  It also supplies the backoff delay before
+        a throttled or timed out request is retried, and counts the throttling events of the run.
+        Threads call acquire/release around a request, asyncio code polls with tryAcquire.
+    """
+
+    def __init__(self, max_limit, initial_limit=None, min_limit=1, max_retries=DEFAULT_MAX_RETRIES):
+        self.min_limit   = min_limit
+        self.max_limit   = max(min_limit, max_limit)
+        self.max_retries = max_retries
+        self.limit       = float(min(self.max_limit, initial_limit or self.max_limit))
+        self.in_flight   = 0
+        self.baseline    = None
+        self.smoothed    = None
+        self.since_decrease = 0  # completions since the limit was last decreased
+
+        self.throttled        = 0
+        self.timeouts         = 0
+        self.latency_backoffs = 0
+        self.retries          = 0
+        self.low_limit        = int(self.limit)
+        self.high_limit       = int(self.limit)
+
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def tryAcquire(self):
+        with self._cond:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def isThrottleStatus(self, status_code):
+        return status_code in THROTTLE_STATUSES
+
+    def recordSuccess(self, latency):
+        """
+            Account for a request that completed without being throttled, latency is in seconds.
+        """
+        with self._cond:
+            self.since_decrease += 1
+            if self.smoothed is None:
+                self.smoothed = latency
+            else:
+                self.smoothed = (1 - LATENCY_SMOOTHING) * self.smoothed + LATENCY_SMOOTHING * latency
+            if self.baseline is None or self.smoothed < self.baseline:
+                self.baseline = self.smoothed
+            else:  # let a lasting shift in latency (eg, bigger responses) eventually become the norm
+                self.baseline += BASELINE_DRIFT * (self.smoothed - self.baseline)
+
+            if self.smoothed > self.baseline * LATENCY_TOLERANCE and self.since_decrease >= self.limit:
+                self.latency_backoffs += 1
+                self._decrease(LATENCY_DECREASE)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                self.high_limit = max(self.high_limit, int(self.limit))
+            self._cond.notify_all()
+
+    def recordThrottle(self, timed_out=False):
+        """
+            Account for a request that got a 429/503 response (or timed out when timed_out is True).
+        """
+        with self._cond:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.throttled += 1
+            self._decrease(DECREASE_FACTOR)
+
+    def backoffDelay(self, attempt, retry_after=None):
+        """
+            Return the number of seconds to wait before retry number attempt (starting at 0) of a request,
+            honoring a Retry-After value (in seconds) supplied by Jenkins.
+        """
+        with self._cond:
+            self.retries += 1
+        try:
+            if retry_after is not None:
+                return min(BACKOFF_CAP, max(0.0, float(retry_after)))
+        except ValueError:
+            pass  # Retry-After can also be an HTTP date, fall back to our own backoff
+        delay = min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _decrease(self, factor):
+        self.limit = max(float(self.min_limit), self.limit * factor)
+        self.low_limit = min(self.low_limit, int(self.limit))
+        self.since_decrease = 0
+
+    def statistics(self):
+        return "%d throttled (429/503), %d timeouts, %d latency backoffs, %d retries, in-flight limit ranged %d..%d, ended at %d" % \
+               (self.throttled, self.timeouts, self.latency_backoffs, self.retries,
+                self.low_limit, self.high_limit, int(self.limit))
+
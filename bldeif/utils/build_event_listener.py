@@ -0,0 +1,167 @@
+#############################################################################################
+
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+#############################################################################################
+
+# The Jenkins Notification plugin POSTs a JSON document for each phase of a build, eg:
+#    {"name": "australopithicus", "url": "job/frozique/job/australopithicus/",
+#     "build": {"full_url": "http://jenkado:8080/job/frozique/job/australopithicus/42/",
+#               "number": 42, "phase": "COMPLETED", "status": "SUCCESS",
+#               "url": "job/frozique/job/australopithicus/42/"}}
+# Only the phases that signify a finished build are of interest, a build is typically
+# announced as COMPLETED and then as FINALIZED.
+
+FINISHED_PHASES = ('COMPLETED', 'FINALIZED')
+
+DEFAULT_LISTEN_ADDRESS = '127.0.0.1'
+DEFAULT_LISTEN_PORT    = 8765
+
+#############################################################################################
+
+class BuildEvent(object):
+    """
+        The finish of a Jenkins build, identified by the job url (relative to the Jenkins base url,
+        eg, 'job/frozique/job/australopithicus') and the build number.
+    """
+    __slots__ = ('job_url', 'number', 'phase', 'status')
+
+    def __init__(self, job_url, number, phase='COMPLETED', status=None):
+        self.job_url = job_url.strip('/')
+        self.number  = int(number)
+        self.phase   = phase
+        self.status  = status
+
+    @staticmethod
+    def fromNotification(payload):
+        """
+            Return a BuildEvent for a Notification plugin payload (a dict) or None if the payload
+            is for a phase of the build other than its finish.
+            A ValueError is raised if the payload lacks the job url or the build number.
+        """
+        try:
+            build   = payload['build']
+            job_url = payload['url']
+            number  = int(build['number'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Notification lacks the job url or the build number")
+        phase = str(build.get('phase', '')).upper()
+        if phase not in FINISHED_PHASES:
+            return None
+        return BuildEvent(job_url, number, phase, build.get('status', None))
+
+    def key(self):
+        return (self.job_url, self.number)
+
+    def __str__(self):
+        return "%s #%d %s" % (self.job_url, self.number, self.phase)
+
+    def __repr__(self):
+        return str(self)
+
+#############################################################################################
+
+class BuildEventQueue(object):
+    """
+        The builds announced since the last drain, in order of arrival, with repeat
+        announcements of a build (eg, COMPLETED then FINALIZED) coalesced into one entry.
+    """
+
+    def __init__(self):
+        self._events = {}
+        self._cond   = threading.Condition()
+        self.received  = 0
+        self.coalesced = 0
+
+    def add(self, event):
+        with self._cond:
+            self.received += 1
+            if event.key() in self._events:
+                self.coalesced += 1
+                return False
+            self._events[event.key()] = event
+            self._cond.notify_all()
+            return True
+
+    def wait(self, timeout=None):
+        """
+            Wait up to timeout seconds for the queue to have an event, return True if it has one.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._events, timeout=timeout)
+
+    def drain(self):
+        with self._cond:
+            events = list(self._events.values())
+            self._events = {}
+            return events
+
+    def __len__(self):
+        with self._cond:
+            return len(self._events)
+
+#############################################################################################
+
+class NotificationHandler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        try:
+            length  = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length).decode('utf-8'))
+            event   = BuildEvent.fromNotification(payload)
+        except ValueError as msg:  # json.JSONDecodeError and UnicodeDecodeError are ValueErrors
+            self.server.log.warn("Rejected build notification from %s, %s" % (self.client_address[0], msg))
+            self.reply(400, 'invalid notification')
+            return
+        if event:
+            self.server.log.debug("Build notification: %s" % event)
+            self.server.queue.add(event)
+        self.reply(202, 'accepted')
+
+    def reply(self, status, text):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # requests of interest are logged in do_POST
+
+#############################################################################################
+
+class BuildEventListener(object):
+    """
+        An HTTP server (on its own thread) that accepts Jenkins Notification plugin POSTs and
+        puts the finished builds they announce on a BuildEventQueue.
+    """
+
+    def __init__(self, logger, address=DEFAULT_LISTEN_ADDRESS, port=DEFAULT_LISTEN_PORT):
+        self.log    = logger
+        self.queue  = BuildEventQueue()
+        self.server = ThreadingHTTPServer((address, port), NotificationHandler)
+        self.server.daemon_threads = True
+        self.server.log   = logger
+        self.server.queue = self.queue
+        self.thread = None
+
+    @property
+    def address(self):
+        return self.server.server_address[:2]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name='BuildEventListener', daemon=True)
+        self.thread.start()
+        self.log.info("Listening for Jenkins build notifications on %s:%d" % self.address)
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread:
+            self.thread.join()
+        self.log.info("Stopped listening for Jenkins build notifications, %d received, %d coalesced" % \
+                      (self.queue.received, self.queue.coalesced))
+
@@ -0,0 +1,78 @@
+#############################################################################################
+
+import re
+import time
+import calendar
+import urllib.parse
+import xml.etree.ElementTree as ET
+
+#############################################################################################
+
+# The Jenkins /rssAll feed is an Atom document listing the most recent builds of all jobs,
+# most recent first, eg:
+#    <feed xmlns="http://www.w3.org/2005/Atom"><title>All all builds</title>
+#      <entry><title>australopithicus #42 (stable)</title>
+#             <link rel="alternate" type="text/html" href="http://jenkado:8080/job/frozique/job/australopithicus/42/"/>
+#             <published>2026-10-18T09:12:44Z</published><updated>2026-10-18T09:12:44Z</updated></entry>
+#      ...
+# The feed holds a limited number of builds, so it only accounts for all builds since some
+# moment if it reaches back beyond that moment.
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+BUILD_LINK_PATTERN = re.compile(r'(?P<job_url>job/.+)/(?P<number>\d+)/?$')
+FEED_TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+FEED_TIME_RESOLUTION = 1000  # millis, the feed times are to the second
+
+#############################################################################################
+
+class BuildFeed(object):
+    """
+        The builds listed in a Jenkins build feed, each as a (job url, build number, timestamp)
+        with the job url relative to the Jenkins base url (eg, 'job/frozique/job/australopithicus')
+        and the timestamp in epoch milliseconds.
+        Entries whose link isn't that of a build are skipped, content that isn't XML raises a ValueError.
+    """
+
+    def __init__(self, content):
+        self.entries = []
+        try:
+            root = ET.fromstring(content)
+        except ET.ParseError as msg:
+            raise ValueError("build feed is not well-formed XML, %s" % msg)
+        for entry in root.iter('%sentry' % ATOM_NS):
+            link = entry.find('%slink' % ATOM_NS)
+            published = entry.findtext('%spublished' % ATOM_NS) or entry.findtext('%supdated' % ATOM_NS)
+            if link is None or not published:
+                continue
+            path = urllib.parse.unquote(urllib.parse.urlparse(link.get('href', '')).path)
+            mo = BUILD_LINK_PATTERN.search(path)
+            if not mo:
+                continue
+            try:
+                timestamp = calendar.timegm(time.strptime(published.strip(), FEED_TIME_FORMAT)) * 1000
+            except ValueError:
+                continue
+            self.entries.append((mo.group('job_url'), int(mo.group('number')), timestamp))
+
+    def reachesBack(self, ref_time_millis):
+        """
+            Return True if the feed goes back far enough to list every build started at or after
+            ref_time_millis, ie, it has a build that started before then.  A feed without builds proves
+            nothing (Jenkins may have trimmed it, or the builds may not be visible to the user).
+        """
+        oldest = self.oldest()
+        return oldest is not None and oldest + FEED_TIME_RESOLUTION <= ref_time_millis
+
+    def oldest(self):
+        """
+            Return the timestamp of the oldest build in the feed, None when the feed has no builds.
+        """
+        return min((timestamp for job_url, number, timestamp in self.entries), default=None)
+
+    def jobsBuiltSince(self, ref_time_millis):
+        """
+            Return the set of job urls having a build in the feed that started at or after ref_time_millis
+            (allowing for the feed times being to the second).
+        """
+        return set(job_url for job_url, number, timestamp in self.entries
+                   if timestamp + FEED_TIME_RESOLUTION > ref_time_millis)
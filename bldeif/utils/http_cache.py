@@ -0,0 +1,180 @@
+#############################################################################################
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+#############################################################################################
+
+# Each cached response is held in two files in the cache directory, named by the digest of
+# the request key (the user name and url):
+#    <digest>.json  the url and the validators, eg, {"url": ..., "etag": "\"4f1e\"", "last_modified": ...}
+#    <digest>.body  the response content
+# The modification time of the .body file is bumped whenever the entry is used, eviction
+# removes the least recently used entries once the bodies exceed the size limit.
+
+EVICTION_TARGET = 0.9  # once over the limit, evict down to this fraction of it
+
+#############################################################################################
+
+class CachedResponse(object):
+    __slots__ = ('url', 'etag', 'last_modified', 'content_type', 'content')
+
+    def __init__(self, url, etag, last_modified, content_type, content):
+        self.url           = url
+        self.etag          = etag
+        self.last_modified = last_modified
+        self.content_type  = content_type
+        self.content       = content
+
+    def validators(self):
+        """
+            Return the conditional request headers for revalidating this response.
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+#############################################################################################
+
+class HttpCache(object):
+    """
+        An on-disk cache of GET responses that carry an ETag or Last-Modified validator, so that
+        a later GET of the same url can be made conditional and a 304 answer served from disk.
+        The total size of the cached bodies is kept under max_bytes by evicting the least recently
+        used entries.  An instance can be shared by threads.
+    """
+
+    def __init__(self, directory, max_bytes, logger, user=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.log       = logger
+        self.user      = user or ''
+        self._lock     = threading.Lock()
+        self.hits = self.misses = self.stored = self.evicted = 0
+
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self._entries = {}  # digest -> [body size, last used]
+        for entry in os.scandir(directory):
+            if entry.name.endswith('.body'):
+                stat = entry.stat()
+                self._entries[entry.name[:-5]] = [stat.st_size, stat.st_mtime]
+        self.size = sum(size for size, used in self._entries.values())
+
+    def _digest(self, url):
+        return hashlib.sha1(("%s|%s" % (self.user, url)).encode('utf-8')).hexdigest()
+
+    def _path(self, digest, suffix):
+        return os.path.join(self.directory, digest + suffix)
+
+    def lookup(self, url):
+        """
+            Return the CachedResponse for the url or None if there isn't one (or it can't be read).
+        """
+        digest = self._digest(url)
+        with self._lock:
+            if digest not in self._entries:
+                return None
+        try:
+            with open(self._path(digest, '.json'), 'r') as mf:
+                meta = json.load(mf)
+            with open(self._path(digest, '.body'), 'rb') as bf:
+                content = bf.read()
+        except (OSError, ValueError) as msg:
+            self.log.debug("HTTP cache entry for %s is unreadable, %s" % (url, msg))
+            self._forget(digest)
+            return None
+        if meta.get('url') != url:
+            return None
+        return CachedResponse(url, meta.get('etag'), meta.get('last_modified'), meta.get('content_type'), content)
+
+    def hit(self, cached):
+        """
+            Account for the cached response having been served for a 304 answer.
+        """
+        digest = self._digest(cached.url)
+        now = time.time()
+        with self._lock:
+            self.hits += 1
+            if digest in self._entries:
+                self._entries[digest][1] = now
+        try:
+            os.utime(self._path(digest, '.body'), (now, now))
+        except OSError:
+            pass
+
+    def store(self, url, etag, last_modified, content_type, content):
+        """
+            Save the response content and validators for the url (counted as a miss), a response
+            without any validator can't be revalidated and so isn't saved.
+        """
+        with self._lock:
+            self.misses += 1
+        if not etag and not last_modified:
+            return
+        if len(content) > self.max_bytes * EVICTION_TARGET:
+            return
+        digest = self._digest(url)
+        meta = {'url': url, 'etag': etag, 'last_modified': last_modified, 'content_type': content_type}
+        try:
+            self._write(self._path(digest, '.body'), content, 'wb')
+            self._write(self._path(digest, '.json'), json.dumps(meta), 'w')
+        except OSError as msg:
+            self.log.warn("Unable to save HTTP cache entry for %s, %s" % (url, msg))
+            return
+        with self._lock:
+            previous = self._entries.get(digest, [0, 0])[0]
+            self._entries[digest] = [len(content), time.time()]
+            self.size += len(content) - previous
+            self.stored += 1
+            evictees = self._chooseEvictees()
+        for evictee in evictees:
+            self._remove(evictee)
+
+    def _write(self, path, content, mode):
+        temp_path = "%s.%d.tmp" % (path, threading.get_ident())
+        with open(temp_path, mode) as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+    def _chooseEvictees(self):
+        """
+            With the lock held, drop the least recently used entries from the index until the size
+            is within the target and return their digests for their files to be removed.
+        """
+        if self.size <= self.max_bytes:
+            return []
+        evictees = []
+        target = self.max_bytes * EVICTION_TARGET
+        for digest, (size, used) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if self.size <= target:
+                break
+            del self._entries[digest]
+            self.size -= size
+            self.evicted += 1
+            evictees.append(digest)
+        return evictees
+
+    def _forget(self, digest):
+        with self._lock:
+            if digest in self._entries:
+                self.size -= self._entries.pop(digest)[0]
+        self._remove(digest)
+
+    def _remove(self, digest):
+        for suffix in ('.json', '.body'):
+            try:
+                os.remove(self._path(digest, suffix))
+            except OSError:
+                pass
+
+    def statistics(self):
+        return "%d hits (304 served from disk), %d misses, %d responses stored, %d evicted, %d entries holding %d bytes" % \
+               (self.hits, self.misses, self.stored, self.evicted, len(self._entries), self.size)
+
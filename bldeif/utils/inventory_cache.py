@@ -0,0 +1,74 @@
+#############################################################################################
+
+import os
+import time
+import pickle
+
+#############################################################################################
+
+# Bump this whenever the shape of the snapshot or of the pickled inventory classes changes,
+# so that snapshots written by a prior version are never restored.
+CACHE_FORMAT = 5
+
+#############################################################################################
+
+class InventoryCache(object):
+    """
+        An instance of this class is used to persist a snapshot of a Jenkins inventory
+        (and the config items vetted against it) so that back-to-back runs can skip the
+        deep crawl of the Jenkins job tree.
+        A snapshot is only handed back by load() if it was written for the same fingerprint
+        (a digest of the config) and is younger than the ttl (in seconds).
+    """
+
+    def __init__(self, filename, ttl, fingerprint, logger):
+        self.filename    = filename
+        self.ttl         = ttl
+        self.fingerprint = "%s:%s" % (CACHE_FORMAT, fingerprint)
+        self.log         = logger
+
+    def exists(self):
+        if not os.path.exists(self.filename):
+            return False
+        return True
+
+    def load(self):
+        """
+            Return the snapshot dict if there is a usable one on disk, otherwise return None.
+        """
+        if not self.exists():
+            return None
+
+        try:
+            with open(self.filename, "rb") as f:
+                snapshot = pickle.load(f)
+        except Exception as msg:
+            self.log.warn("Unable to read the inventory cache %s, %s" % (self.filename, msg))
+            return None
+
+        if snapshot.get('fingerprint', None) != self.fingerprint:
+            self.log.info("Inventory cache %s was built for a different config, ignoring it" % self.filename)
+            return None
+        age = time.time() - snapshot.get('created', 0)
+        if age > self.ttl:
+            self.log.info("Inventory cache %s has expired (%d seconds old)" % (self.filename, age))
+            return None
+        return snapshot
+
+    def save(self, snapshot):
+        """
+            Write the snapshot dict (stamped with the fingerprint and creation time) to the cache file.
+        """
+        snapshot = dict(snapshot, fingerprint=self.fingerprint, created=time.time())
+        cache_dir = os.path.dirname(self.filename)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        temp_filename = "%s.tmp" % self.filename
+        with open(temp_filename, "wb") as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_filename, self.filename)
+
+    def invalidate(self):
+        if self.exists():
+            os.remove(self.filename)
+
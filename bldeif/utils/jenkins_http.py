@@ -0,0 +1,179 @@
+#############################################################################################
+
+import time
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from bldeif.utils.json_stream import JsonArrayStream
+
+#############################################################################################
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT   = 60   # seconds
+STREAM_CHUNK_SIZE = 64 * 1024
+
+#############################################################################################
+
+class JenkinsHttpClient(object):
+    """
+        An instance of this class is the single conduit for the REST requests a
+        JenkinsConnection makes against a Jenkins server.
+        It holds a requests.Session whose connection pool keeps sockets to the Jenkins
+        server alive between requests (avoiding a TCP/TLS handshake per job), has the
+        credentials and proxy information set once, applies a per-request timeout
+        and keeps a count of the requests issued and the response bytes received.
+        When given an AdaptiveLimiter, every request waits for an in-flight slot from it and
+        a request answered with a 429/503 or timing out is retried after a backoff.
+        When given an HttpCache, a (non-streaming) GET of a url with a cached response is made
+        conditional on the cached ETag/Last-Modified and a 304 answer is served from the cache.
+        The instance can be shared by the worker threads of a JenkinsConnection.
+    """
+
+    def __init__(self, logger, auth=None, proxies=None, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, limiter=None, cache=None):
+        self.log       = logger
+        self.pool_size = pool_size
+        self.timeout   = timeout
+        self.limiter   = limiter
+        self.cache     = cache
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://',  adapter)
+        self.session.mount('https://', adapter)
+        self.session.auth = auth
+        if proxies:
+            self.session.proxies.update(proxies)
+
+        self._lock = threading.Lock()
+        self.requests_issued = 0
+        self.bytes_received  = 0
+
+    def get(self, url, **kwargs):
+        """
+            Issue a GET for the url using the pooled session and return the requests.Response.
+            Any keyword args are passed along to requests, a timeout is supplied if the caller didn't.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        streaming = kwargs.get('stream', False)
+        cached = None
+        if self.cache and not streaming:
+            cached = self.cache.lookup(url)
+            if cached:
+                kwargs['headers'] = dict(kwargs.get('headers') or {}, **cached.validators())
+        if self.limiter:
+            response = self._limitedGet(url, **kwargs)
+        else:
+            response = self.session.get(url, **kwargs)
+            if not streaming:  # a streaming caller accounts for the request itself
+                self.record(len(response.content))
+        if self.cache and not streaming:
+            response = self._applyCache(url, response, cached)
+        return response
+
+    def _applyCache(self, url, response, cached):
+        """
+            Turn a 304 answer to a conditional GET into the cached 200 response or
+            save a 200 response (along with its validators) for the next time the url is requested.
+        """
+        if response.status_code == 304 and cached:
+            self.cache.hit(cached)
+            response.status_code = 200
+            response.reason      = 'OK'
+            response._content    = cached.content  # what requests.Response.content hands back
+            if cached.content_type:
+                response.headers['Content-Type'] = cached.content_type
+        elif response.status_code == 200:
+            headers = response.headers
+            self.cache.store(url, headers.get('ETag', None), headers.get('Last-Modified', None),
+                             headers.get('Content-Type', None), response.content)
+        return response
+
+    def _limitedGet(self, url, **kwargs):
+        """
+            Issue the GET within an in-flight slot of the limiter, reporting the outcome to the limiter
+            and retrying (up to limiter.max_retries times) a request that is throttled or times out.
+            Once the retries are used up the last throttle response is returned (or the timeout raised).
+        """
+        streaming = kwargs.get('stream', False)
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, **kwargs)
+            except requests.exceptions.Timeout:
+                self.limiter.recordThrottle(timed_out=True)
+                if attempt >= self.limiter.max_retries:
+                    raise
+                response = None
+            finally:
+                self.limiter.release()
+
+            if response is not None and not self.limiter.isThrottleStatus(response.status_code):
+                self.limiter.recordSuccess(time.monotonic() - started)
+                if not streaming:
+                    self.record(len(response.content))
+                return response
+
+            retry_after = None
+            if response is not None:
+                self.limiter.recordThrottle()
+                if attempt >= self.limiter.max_retries:
+                    if not streaming:
+                        self.record(len(response.content))
+                    return response
+                retry_after = response.headers.get('Retry-After', None)
+                self.record(0 if streaming else len(response.content))
+                response.close()
+            else:
+                self.record(0)
+            delay = self.limiter.backoffDelay(attempt, retry_after)
+            self.log.debug("Jenkins request %s %s, retrying in %.1f seconds" % \
+                           (url, 'timed out' if response is None else 'throttled (%d)' % response.status_code, delay))
+            time.sleep(delay)
+            attempt += 1
+
+    def getJSON(self, url, **kwargs):
+        """
+            Issue a GET for the url and return the decoded JSON content of the response.
+        """
+        return self.get(url, **kwargs).json()
+
+    def streamJSONArray(self, url, key):
+        """
+            A generator yielding the items of the key array in the JSON object returned for the url,
+            each item as soon as its content has been received.  When the consumer stops early
+            (closing the generator) the response is closed without reading the rest of the content.
+        """
+        response = self.get(url, stream=True)
+        received = 0
+        try:
+            stream = JsonArrayStream(key)
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                received += len(chunk)
+                for item in stream.feed(chunk):
+                    yield item
+                if stream.done:
+                    break
+            stream.finish()
+        finally:
+            response.close()
+            self.record(received)
+
+    def record(self, received):
+        """
+            Account for a request (and the bytes received for it) in the traffic counters.
+            Also used by callers that issue requests by some other means (eg, the async engine).
+        """
+        with self._lock:
+            self.requests_issued += 1
+            self.bytes_received  += received
+
+    def statistics(self):
+        return "%d requests issued, %d bytes received" % (self.requests_issued, self.bytes_received)
+
+    def close(self):
+        self.session.close()
+
@@ -0,0 +1,67 @@
+#############################################################################################
+
+import re
+
+from bldeif.utils.eif_exception import ConfigurationError
+
+#############################################################################################
+
+# The include and exclude values of a View or Folder config item are comma separated lists of
+# patterns, eg:
+#      include: ^master-*,release
+#      exclude: ^feature-*, fumar, launch
+# A '*' in a pattern is taken to be '\.*' (as it always has been), each pattern is otherwise a
+# Python regex that is searched for (not matched) in a job name.
+
+PATTERN_SEPARATOR = re.compile(r',\s*')
+
+#############################################################################################
+
+class JobSelector(object):
+    """
+        An instance of this class holds the include and exclude patterns of a View or Folder
+        config item, each compiled once into a single alternation, and picks the qualifying
+        jobs out of a list of jobs in one pass.
+        A job qualifies if its name matches an include pattern (or there are no include patterns)
+        and does not match any exclude pattern.
+    """
+
+    def __init__(self, include=None, exclude=None):
+        self.include = self.compile(include, 'include')
+        self.exclude = self.compile(exclude, 'exclude')
+
+    @staticmethod
+    def forConfigItem(item):
+        """
+            Return a JobSelector for a View or Folder config item dict.
+        """
+        return JobSelector(item.get('include', None), item.get('exclude', None))
+
+    def compile(self, spec, label):
+        """
+            Return a compiled regex that matches any of the patterns in the comma separated spec,
+            or None if the spec has no patterns.  Empty patterns (eg, from a trailing comma) are ignored.
+        """
+        if not spec:
+            return None
+        patterns = [patt.replace('*', r'\.*') for patt in PATTERN_SEPARATOR.split(str(spec).strip()) if patt]
+        if not patterns:
+            return None
+        try:
+            return re.compile('|'.join('(?:%s)' % patt for patt in patterns))
+        except re.error as msg:
+            raise ConfigurationError("Invalid %s pattern '%s', %s" % (label, spec, msg))
+
+    def qualifies(self, job_name):
+        if self.include and not self.include.search(job_name):
+            return False
+        if self.exclude and self.exclude.search(job_name):
+            return False
+        return True
+
+    def select(self, jobs):
+        """
+            Return the jobs (in their original order) whose name qualifies.
+        """
+        return [job for job in jobs if self.qualifies(job.name)]
+
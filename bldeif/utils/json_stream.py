@@ -0,0 +1,182 @@
+#############################################################################################
+
+import re
+import json
+import codecs
+
+#############################################################################################
+
+# Jenkins answers a build history request with a JSON object like:
+#    {"_class":"hudson.model.FreeStyleProject","builds":[{...newest build...},{...},...,{...oldest build...}]}
+# The items of the "builds" array can be obtained one at a time as the response content arrives
+# rather than only once the whole (potentially very large) response has been read and parsed.
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+STRUCTURAL = re.compile(r'[\[\]{}"]')  # the characters that open or close a value
+STRING_END = re.compile(r'["\\]')      # within a string, its closing quote or an escape
+
+#############################################################################################
+
+class JsonArrayStream(object):
+    """
+        An incremental parser for the items of one array valued member (identified by key)
+        of a top level JSON object.  Content is supplied in arbitrarily sized pieces with feed,
+        which returns the array items that have been completed by that piece of content.
+        Other members of the object are parsed and discarded, nothing past the end of the
+        target array is looked at (the done attribute is True once the array is closed).
+    """
+
+    def __init__(self, key):
+        self.key     = key
+        self.decoder = json.JSONDecoder()
+        self.utf8    = codecs.getincrementaldecoder('utf-8')()
+        self.buffer  = ''
+        self.state   = 'object'
+        self.done    = False
+        self._resetScan()
+
+    def feed(self, content):
+        """
+            Take in the next piece of content (bytes or str) and return a list of the array items
+            that are now complete.
+        """
+        if isinstance(content, bytes):
+            content = self.utf8.decode(content)
+        self.buffer += content
+        items = []
+        pos = 0
+        while not self.done:
+            pos = WHITESPACE.match(self.buffer, pos).end()
+            if pos >= len(self.buffer):
+                break
+            consumed = self._advance(pos, items)
+            if consumed is None:  # the next value isn't all here yet
+                break
+            pos = consumed
+        self.buffer = self.buffer[pos:]
+        return items
+
+    def finish(self):
+        """
+            To be called once all the content has been fed, raises a ValueError if the target array
+            wasn't found or wasn't terminated.
+        """
+        if not self.done:
+            raise ValueError("JSON content ended before the end of the '%s' array" % self.key)
+
+    def _advance(self, pos, items):
+        char = self.buffer[pos]
+        if self.state == 'object':
+            self._expect(char, '{', pos)
+            self.state = 'key'
+            return pos + 1
+
+        if self.state in ('key', 'member_end'):
+            if char == '}':
+                raise ValueError("JSON object has no '%s' array" % self.key)
+            if self.state == 'member_end':
+                self._expect(char, ',', pos)
+                self.state = 'key'
+                return pos + 1
+            decoded = self._decode(pos)
+            if decoded is None:
+                return None
+            self.current_key, pos = decoded
+            self.state = 'colon'
+            return pos
+
+        if self.state == 'colon':
+            self._expect(char, ':', pos)
+            self.state = 'array_start' if self.current_key == self.key else 'skip_value'
+            return pos + 1
+
+        if self.state == 'skip_value':
+            decoded = self._decode(pos)
+            if decoded is None:
+                return None
+            self.state = 'member_end'
+            return decoded[1]
+
+        if self.state == 'array_start':
+            self._expect(char, '[', pos)
+            self.state = 'first_item'
+            return pos + 1
+
+        if self.state == 'item_end':
+            if char == ']':
+                self.done = True
+                return pos + 1
+            self._expect(char, ',', pos)
+            self.state = 'item'
+            return pos + 1
+
+        # self.state is either 'first_item' or 'item'
+        if char == ']' and self.state == 'first_item':
+            self.done = True
+            return pos + 1
+        decoded = self._decode(pos)
+        if decoded is None:
+            return None
+        item, pos = decoded
+        items.append(item)
+        self.state = 'item_end'
+        return pos
+
+    def _decode(self, pos):
+        """
+            Return the (value, end position) of the JSON value starting at pos or None if the value
+            is not yet complete.  A number running to the end of the buffer may have more digits to come,
+            as may one cut short ahead of its fraction or exponent (raw_decode takes '1.' or '1e' for a 1).
+            An object, array or string is only decoded once _valueEnd has found its end in the buffer.
+        """
+        if self.buffer[pos] in '{["' and self._valueEnd(pos) is None:
+            return None
+        try:
+            value, end = self.decoder.raw_decode(self.buffer, pos)
+        except ValueError:
+            if self.buffer[pos] in '{["':
+                raise
+            return None
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and \
+                (end == len(self.buffer) or self.buffer[end] in '.eE'):
+            return None
+        return value, end
+
+    def _valueEnd(self, pos):
+        """
+            Return the position just past the object, array or string starting at pos or None if its end
+            isn't in the buffer yet.  The offset, nesting depth and string state the scan got to are kept,
+            so the scan of a value arriving over many pieces of content resumes where it left off
+            (the value is at the start of the buffer by then) rather than going over it all again.
+        """
+        buffer = self.buffer
+        ix = pos + self.scanned
+        depth, in_string = self.depth, self.in_string
+        while True:
+            mo = (STRING_END if in_string else STRUCTURAL).search(buffer, ix)
+            if mo is None:
+                self.scanned, self.depth, self.in_string = max(ix, len(buffer)) - pos, depth, in_string
+                return None
+            char, ix = mo.group(), mo.end()
+            if char == '\\':
+                ix += 1  # skip the escaped character
+                continue
+            if char == '"':
+                in_string = not in_string
+            elif char in '[{':
+                depth += 1
+            else:
+                depth -= 1
+            if depth == 0 and not in_string:
+                self._resetScan()
+                return ix
+
+    def _resetScan(self):
+        self.scanned   = 0
+        self.depth     = 0
+        self.in_string = False
+
+    def _expect(self, char, expected, pos):
+        if char != expected:
+            raise ValueError("Expected '%s' but found '%s' in JSON content at offset %d of the buffer" % (expected, char, pos))
+
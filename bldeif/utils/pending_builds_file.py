@@ -0,0 +1,44 @@
+#############################################################################################
+
+import json
+
+from bldeif.utils.watermark_file import WatermarkFile
+
+#############################################################################################
+
+# Store the numbers of the builds that were still running when last seen, and so are yet
+# to be reflected in Agile Central, keyed by the job's fully qualified path.
+# The content is JSON, eg:
+#    { "jenkins.mydomain.com:8080/job/frozique/job/long-haul-pipeline" : [118, 119] }
+
+#############################################################################################
+
+class PendingBuildsFile(WatermarkFile):
+    """
+        An instance of this class is used to record the in-progress builds of each job in a file,
+        so that the next run can re-poll just those builds by number rather than relying on the
+        lookback window to rediscover them.  It is written the same way as a WatermarkFile.
+    """
+
+    def read(self):
+        """
+            Return a dict keyed by job fully qualified path with a sorted list of build numbers
+            for each job.  A missing, empty or unreadable file results in an empty dict.
+        """
+        if not self.exists():
+            return {}
+
+        try:
+            with open(self.filename, "r") as f:
+                content = f.read().strip()
+            if not content:
+                return {}
+            pending = json.loads(content)
+            return {job_path: sorted(int(number) for number in numbers)
+                    for job_path, numbers in pending.items() if numbers}
+        except Exception as msg:
+            prob   = "Could not read pending builds from %s, %s" % (self.filename, msg)
+            action = "builds still running as of the last run are left to the lookback window"
+            self.log.error("%s, %s" % (prob, action))
+            return {}
+
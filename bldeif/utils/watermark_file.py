@@ -0,0 +1,63 @@
+#############################################################################################
+
+import os
+import json
+
+#############################################################################################
+
+# Store the highest build number (and that build's timestamp) that has been reflected in
+# Agile Central for each job, keyed by the job's fully qualified path.
+# The content is JSON, eg:
+#    { "jenkins.mydomain.com:8080/job/frozique/job/australopithicus" : {"number": 42, "timestamp": 1498262523000} }
+
+#############################################################################################
+
+class WatermarkFile(object):
+    """
+        An instance of this class is used to record per-job build number high-water marks in a file.
+        Builds for a job whose number is at or below the job's mark are known to have been
+        reflected in Agile Central and need not be considered again.
+    """
+
+    def __init__(self, filename, logger):
+        self.filename = filename
+        self.log      = logger
+
+    def exists(self):
+        if not os.path.exists(self.filename):
+            return False
+        return True
+
+    def read(self):
+        """
+            Return a dict keyed by job fully qualified path with a dict of number and timestamp
+            for each job.  A missing, empty or unreadable file results in an empty dict.
+        """
+        if not self.exists():
+            return {}
+
+        try:
+            with open(self.filename, "r") as f:
+                content = f.read().strip()
+            if not content:
+                return {}
+            marks = json.loads(content)
+            return {job_path: {'number': int(mark['number']), 'timestamp': int(mark['timestamp'])}
+                    for job_path, mark in marks.items()}
+        except Exception as msg:
+            prob   = "Could not read build watermarks from %s, %s" % (self.filename, msg)
+            action = "all builds in the lookback window will be considered"
+            self.log.error("%s, %s" % (prob, action))
+            return {}
+
+    def write(self, marks):
+        """
+            Writes the marks dict to the file, the write is done to a temp file which then replaces
+            the target file so that a failure part way through doesn't leave a truncated file behind.
+        """
+        temp_filename = "%s.tmp" % self.filename
+        with open(temp_filename, "w") as f:
+            json.dump(marks, f, indent=1, sort_keys=True)
+            f.write("\n")
+        os.replace(temp_filename, self.filename)
+
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+# Profile the Jenkins inventory query for a range of MaxDepth values, reporting for each
+# the number of jobs, folders and views listed, the folders listed without their jobs
+# (being one level beyond the reach of that MaxDepth), the size of the response and the
+# configured Folders and Views not reached.  The profile ends with the smallest MaxDepth
+# that reaches every configured Folder and View (what MaxDepth : auto would settle on).
+#
+#   usage:  python profile_inventory.py config/<your_config>.yml [deepest_max_depth]
+#
+# The profile stops early once a MaxDepth reaches the bottom of the Jenkins job tree
+# (as any larger MaxDepth results in the same inventory).
+
+import sys
+import time
+
+from bldeif.utils.klog import ActivityLogger
+from bldeif.utils.konfabulus import Konfabulator
+from bldeif.jenkins_connection import JenkinsConnection, AUTO_MAX_DEPTH, INVENTORY_TIMEOUT
+
+############################################################################################
+
+def profileInventory(jenkins_config, logger, deepest=AUTO_MAX_DEPTH):
+    """
+        Return a list of (max_depth, jobs, folders, views, beyond_reach, response_bytes, elapsed, unreached)
+        for the MaxDepth values from 0 up to deepest.
+    """
+    jc = JenkinsConnection(jenkins_config, logger)
+    profile = []
+    try:
+        for max_depth in range(0, deepest + 1):
+            jc.maxDepth = max_depth + 2
+            started = time.perf_counter()
+            response = jc.http.get(jc.inventoryUrl(), timeout=INVENTORY_TIMEOUT)
+            elapsed = time.perf_counter() - started
+            if response.status_code != 200:
+                raise Exception("inventory query with MaxDepth %d was answered with status %d" % (max_depth, response.status_code))
+            inventory = jc.buildInventory(response.json())
+            beyond_reach = jc.foldersBeyondReach(inventory)
+            profile.append((max_depth, len(inventory.jobs), len(inventory.folders), len(inventory.views),
+                            len(beyond_reach), len(response.content), elapsed, jc.unreachedConfigItems(inventory)))
+            if not beyond_reach:
+                break
+    finally:
+        jc.disconnect()
+    return profile
+
+############################################################################################
+
+def main(args):
+    if not args:
+        print("usage: python profile_inventory.py config/<your_config>.yml [deepest_max_depth]")
+        sys.exit(1)
+    deepest = int(args[1]) if len(args) > 1 else AUTO_MAX_DEPTH
+    logger = ActivityLogger('log/profile_inventory.log')
+    jenkins_config = Konfabulator(args[0], logger).topLevel('Jenkins')
+
+    profile = profileInventory(jenkins_config, logger, deepest)
+    print("%8s  %8s  %8s  %8s  %12s  %14s  %8s  %10s" % \
+          ('MaxDepth', 'jobs', 'folders', 'views', 'beyond reach', 'response bytes', 'secs', 'unreached'))
+    for max_depth, jobs, folders, views, beyond_reach, response_bytes, elapsed, unreached in profile:
+        print("%8d  %8d  %8d  %8d  %12d  %14d  %8.3f  %10d" % \
+              (max_depth, jobs, folders, views, beyond_reach, response_bytes, elapsed, len(unreached)))
+
+    sufficient = [max_depth for max_depth, *rest, unreached in profile if not unreached]
+    if sufficient:
+        print("\nMaxDepth %d is the smallest that reaches every configured Folder and View" % sufficient[0])
+    else:
+        print("\nnot reached with MaxDepth %d: %s" % (profile[-1][0], ', '.join("'%s'" % name for name in profile[-1][-1])))
+
+############################################################################################
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,135 @@
+"""
+    Stand-ins for the tests that exercise JenkinsConnection methods without a config or a Jenkins server.
+"""
+
+import re
+import json
+import time
+
+from bldeif.utils.klog import ActivityLogger
+from bldeif.jenkins_connection import JenkinsConnection, JenkinsJob
+
+BASE_URL   = 'http://jenkado:8080'
+FOLDER_URL = BASE_URL + '/job/frozique'
+FREESTYLE  = 'hudson.model.FreeStyleProject'
+NOW_MILLIS = int(time.time() * 1000)
+
+############################################################################################
+
+def job_info(name):
+    return {'name': name, '_class': FREESTYLE}
+
+def jenkins_job(name, container=BASE_URL):
+    return JenkinsJob(job_info(name), container)
+
+def raw_builds(count, changesets=False):
+    """
+        The count builds of a job as Jenkins lists them, newest first and a minute apart,
+        the newest one built at NOW_MILLIS.
+    """
+    builds = [{'_class': 'hudson.model.FreeStyleBuild', 'number': number, 'id': str(number), 'result': 'SUCCESS',
+               'timestamp': NOW_MILLIS - (count - number) * 60000, 'duration': 1000, 'url': ''}
+              for number in range(count, 0, -1)]
+    if changesets:
+        for build in builds:
+            build['changeSet'] = {'kind': 'git', 'items': [{'commitId': 'c%d' % build['number'], 'timestamp': 0,
+                                                            'msg': 'DE%d' % build['number'], 'paths': []}]}
+    return builds
+
+############################################################################################
+
+class Response:
+    def __init__(self, content, status_code=200):
+        self.status_code = status_code
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+def json_response(payload):
+    return Response(json.dumps(payload).encode('utf-8'))
+
+class HttpStandIn:
+    """
+        Stands in for the JenkinsHttpClient of a connection, recording the urls requested
+        and answering each with the Response that respond(url) comes up with.
+    """
+    cache = None
+
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        return self.respond(url)
+
+    def getJSON(self, url, **kwargs):
+        return self.get(url, **kwargs).json()
+
+    def respond(self, url):
+        return Response(b'', 404)
+
+    def statistics(self):
+        return "%d requests" % len(self.urls)
+
+class BuildsStandIn(HttpStandIn):
+    """
+        Answers the builds[...]{start,end} requests for a job in the container and the
+        jobs[name,builds[...]{0,N}]{start,end} requests for the container, anything else (including
+        a job it doesn't have) with a 404.
+    """
+    def __init__(self, jobs, container_url=FOLDER_URL, changesets=False):
+        super().__init__()
+        self.jobs = jobs  # [(name, build count), ...]
+        self.container_url = container_url
+        self.changesets = changesets
+
+    def respond(self, url):
+        mo = re.match(r'%s/job/(\w+)/api/json\?tree=builds\[.*\]\{(\d+),(\d+)\}$' % self.container_url, url)
+        if mo and mo.group(1) in dict(self.jobs):
+            builds = raw_builds(dict(self.jobs)[mo.group(1)], self.changesets)
+            return json_response({'builds': builds[int(mo.group(2)):int(mo.group(3))]})
+        mo = re.match(r'%s/api/json\?tree=jobs\[name,builds\[.*\]\{0,(\d+)\}\]\{(\d+),(\d+)\}$' % self.container_url, url)
+        if not mo:
+            return super().respond(url)
+        page_size, start, end = (int(value) for value in mo.groups())
+        jobs = [{'name': name, 'builds': raw_builds(count, self.changesets)[:page_size]} for name, count in self.jobs[start:end]]
+        return json_response({'jobs': jobs})
+
+############################################################################################
+
+def bare_connection(**attributes):
+    """
+        A JenkinsConnection with no config or server behind it, having the attributes internalizeConfig
+        sets for a Jenkins config of defaults (no more than the build history retrieval needs),
+        with any of them replaced by the attributes given.
+    """
+    jc = JenkinsConnection.__new__(JenkinsConnection)
+    jc.log = ActivityLogger('log/connection_spec.log')
+    jc.base_url    = BASE_URL
+    jc.http        = HttpStandIn()
+    jc.debug       = False
+    jc.ac_project  = None
+    jc.jobs        = []
+    jc.folders     = []
+    jc.views       = []
+    jc.max_items   = 1000
+    jc.max_builds  = None
+    jc.concurrency = 1
+    jc.limiter     = None
+    jc.watermarks  = {}
+    jc.batch_size  = 50
+    jc.two_phase_fetch = False
+    jc.batched_fetch   = False
+    jc.feed_discovery  = False
+    jc.measure_build_fields = False
+    jc.cached_vetting  = None
+    jc.stream_build_history = False
+    jc.prefilter_idle_jobs  = True
+    jc.targeted_crawl  = False
+    jc.full_folder_path = False
+    jc.parse_workers = 0
+    jc.parse_pool    = None
+    for name, value in attributes.items():
+        setattr(jc, name, value)
+    return jc
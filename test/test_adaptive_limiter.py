@@ -0,0 +1,53 @@
+import threading
+
+from bldeif.utils.adaptive_limiter import AdaptiveLimiter
+
+def test_limit_grows_while_latency_stays_flat():
+    limiter = AdaptiveLimiter(8, initial_limit=1)
+    for _ in range(40):
+        limiter.recordSuccess(0.05)
+    assert int(limiter.limit) == 8
+    assert limiter.high_limit == 8
+    assert limiter.latency_backoffs == 0
+
+def test_limit_halves_on_throttle_and_timeout():
+    limiter = AdaptiveLimiter(8)
+    limiter.recordThrottle()
+    assert int(limiter.limit) == 4
+    limiter.recordThrottle(timed_out=True)
+    assert int(limiter.limit) == 2
+    limiter.recordThrottle()
+    limiter.recordThrottle()
+    assert int(limiter.limit) == 1  # never below min_limit
+    assert (limiter.throttled, limiter.timeouts, limiter.low_limit) == (3, 1, 1)
+
+def test_limit_backs_off_on_rising_latency():
+    limiter = AdaptiveLimiter(8)
+    for _ in range(10):
+        limiter.recordSuccess(0.05)
+    for _ in range(20):
+        limiter.recordSuccess(1.0)
+    assert limiter.latency_backoffs >= 1
+    assert int(limiter.limit) < 8
+
+def test_acquire_blocks_at_the_limit():
+    limiter = AdaptiveLimiter(2)
+    limiter.acquire()
+    limiter.acquire()
+    assert not limiter.tryAcquire()
+    waiter = threading.Thread(target=limiter.acquire)
+    waiter.start()
+    waiter.join(0.1)
+    assert waiter.is_alive()
+    limiter.release()
+    waiter.join(1)
+    assert not waiter.is_alive()
+    assert limiter.in_flight == 2
+
+def test_backoff_delay():
+    limiter = AdaptiveLimiter(4)
+    assert limiter.backoffDelay(0, '2') == 2.0
+    assert limiter.backoffDelay(0, '9999') == 30.0
+    assert 2.0 <= limiter.backoffDelay(3) <= 4.0
+    assert 0.25 <= limiter.backoffDelay(0, 'Wed, 21 Oct 2026 07:28:00 GMT') <= 0.5
+    assert limiter.retries == 4
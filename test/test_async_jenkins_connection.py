@@ -0,0 +1,127 @@
+import re
+import json
+import time
+import threading
+from urllib.parse import unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from bldeif.utils.klog import ActivityLogger
+from bldeif.utils.http_cache import HttpCache
+from bldeif.jenkins_connection import JenkinsConnection, BUILD_ATTRS
+from bldeif.async_jenkins_connection import AsyncJenkinsConnection, DEFAULT_MAX_IN_FLIGHT
+
+from connection_spec_helper import NOW_MILLIS, jenkins_job, raw_builds
+
+class JenkinsStandIn(BaseHTTPRequestHandler):
+    """
+        Answers the builds[...]{start,end} requests for the jobs of the server (delaying the answer
+        for a job by the seconds in server.delays), with an ETag that makes a repeated request a 304
+        and with a 429 for the first server.throttle_count requests for a job named busy.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        path = unquote(self.path)  # aiohttp quotes the brackets and braces of the tree parameter
+        self.server.requests.append((path, self.headers.get('If-None-Match', None)))
+        mo = re.match(r'/job/(\w+)/api/json\?tree=builds\[.*\]\{(\d+),(\d+)\}$', path)
+        if not mo or mo.group(1) not in self.server.jobs:
+            return self.answer(404)
+        name, start, end = mo.group(1), int(mo.group(2)), int(mo.group(3))
+        if name == 'busy' and self.server.throttle_count > 0:
+            self.server.throttle_count -= 1
+            return self.answer(429, headers={'Retry-After': '0'})
+        time.sleep(self.server.delays.get(name, 0))
+        etag = '"%s-%d"' % (name, start)
+        if self.headers.get('If-None-Match', None) == etag:
+            return self.answer(304, headers={'ETag': etag})
+        self.server.answered.append(name)
+        payload = json.dumps({'builds': raw_builds(self.server.jobs[name])[start:end]}).encode('utf-8')
+        self.answer(200, payload, {'ETag': etag, 'Content-Type': 'application/json'})
+
+    def answer(self, status, payload=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server(jobs, delays=None, throttle_count=0):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), JenkinsStandIn)
+    server.daemon_threads = True
+    server.jobs = dict(jobs)
+    server.delays = delays or {}
+    server.throttle_count = throttle_count
+    server.requests = []
+    server.answered = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def connection(server, **config):
+    config.update({'Server': '127.0.0.1', 'Port': server.server_address[1]})
+    jc = AsyncJenkinsConnection(config, ActivityLogger('log/async_jenkins_connection.log'))
+    jc.max_builds = 3
+    jc.watermarks = {}
+    return jc
+
+def fetches(jc, names):
+    jobs = [jenkins_job(name, jc.base_url) for name in names]
+    return [('All::Jenkins', job, 'Job', job.url + '/api/json?tree=builds[%s]' % BUILD_ATTRS, None) for job in jobs]
+
+def history_numbers(histories):
+    return [[build.number for build in history] for history in histories]
+
+REF_TIME = time.gmtime(NOW_MILLIS / 1000 - 3600)
+
+def test_default_concurrency_sizes_pool_and_limiter():
+    config = {'Server': '127.0.0.1', 'AdaptiveConcurrency': True}
+    jc = AsyncJenkinsConnection(dict(config), ActivityLogger('log/async_jenkins_connection.log'))
+    assert (jc.concurrency, jc.pool_size, jc.limiter.max_limit) == (DEFAULT_MAX_IN_FLIGHT,) * 3
+    jc = JenkinsConnection(dict(config), ActivityLogger('log/async_jenkins_connection.log'))
+    assert (jc.concurrency, jc.pool_size, jc.limiter.max_limit) == (1, 10, 1)
+
+def test_histories_in_config_order_across_pages():
+    server = start_server([('alpha', 2), ('beta', 7), ('gamma', 1)], delays={'alpha': 0.3, 'gamma': 0.1})
+    try:
+        jc = connection(server, Concurrency=4)
+        histories = jc._fetchBuildHistories(fetches(jc, ['alpha', 'beta', 'gamma']), REF_TIME)
+        assert history_numbers(histories) == [[1, 2], [1, 2, 3, 4, 5, 6, 7], [1]]
+        paths = [path for path, etag in server.requests]
+        assert server.answered[-1] == 'alpha'  # answered last, yet first in the results
+        assert [path[path.rindex('{'):] for path in paths if path.startswith('/job/beta/')] == ['{0,3}', '{3,6}', '{6,9}']
+    finally:
+        server.shutdown()
+
+def test_unchanged_pages_served_from_cache(tmp_path):
+    server = start_server([('alpha', 2), ('beta', 4)])
+    try:
+        jc = connection(server, Concurrency=4)
+        jc.http.cache = HttpCache(str(tmp_path), 1024 * 1024, jc.log)
+        first = jc._fetchBuildHistories(fetches(jc, ['alpha', 'beta']), REF_TIME)
+        assert all(etag is None for path, etag in server.requests)
+        del server.requests[:]
+
+        second = jc._fetchBuildHistories(fetches(jc, ['alpha', 'beta']), REF_TIME)
+        assert history_numbers(second) == history_numbers(first) == [[1, 2], [1, 2, 3, 4]]
+        assert len(server.requests) == 3 and all(etag is not None for path, etag in server.requests)
+        assert (jc.http.cache.hits, jc.http.cache.stored) == (3, 3)
+    finally:
+        server.shutdown()
+
+def test_throttled_requests_retried():
+    server = start_server([('alpha', 2), ('busy', 1)], throttle_count=2)
+    try:
+        jc = connection(server, Concurrency=4, AdaptiveConcurrency=True)
+        histories = jc._fetchBuildHistories(fetches(jc, ['alpha', 'busy']), REF_TIME)
+        assert history_numbers(histories) == [[1, 2], [1]]
+        assert (jc.limiter.throttled, jc.limiter.retries, jc.limiter.in_flight) == (2, 2, 0)
+        assert [path.split('/')[2] for path, etag in server.requests].count('busy') == 3
+    finally:
+        server.shutdown()
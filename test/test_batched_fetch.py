@@ -0,0 +1,57 @@
+import time
+
+from bldeif.jenkins_connection import BUILD_ATTRS, FOLDER_JOB_BUILDS_MINIMAL_ATTRS
+
+from connection_spec_helper import BASE_URL, FOLDER_URL, NOW_MILLIS, BuildsStandIn, bare_connection, jenkins_job, job_info
+
+FOLDER = 'com.cloudbees.hudson.plugins.folder.Folder'
+
+def connection(jobs, batch_size=2, max_builds=3):
+    jc = bare_connection(http=BuildsStandIn(jobs), batch_size=batch_size, max_builds=max_builds, two_phase_fetch=True)
+    jc.inventory = jc.buildInventory({'jobs': [{'name': 'frozique', '_class': FOLDER, 'views': [],
+                                                'jobs': [job_info(name) for name, count in jobs]}], 'views': []})
+    return jc
+
+def fetch(job_name):
+    job = jenkins_job(job_name, FOLDER_URL)
+    return ('frozique::Jenkins', job, 'Job', job.url + '/api/json?tree=builds[%s]' % FOLDER_JOB_BUILDS_MINIMAL_ATTRS, 'frozique')
+
+def test_batch_build_attrs_ask_for_both_changeset_names():
+    jc = connection([])
+    attrs = jc.batchBuildAttrs('%s/job/wombat/api/json?tree=builds[%s]' % (FOLDER_URL, BUILD_ATTRS))
+    assert 'changeSet[' in attrs and 'changeSets[' in attrs
+    assert attrs == jc.batchBuildAttrs('%s/job/wombat/api/json?tree=builds[%s]' % (FOLDER_URL, BUILD_ATTRS.replace('changeSet', 'changeSets')))
+    assert jc.batchBuildAttrs(fetch('wombat')[3]) == FOLDER_JOB_BUILDS_MINIMAL_ATTRS
+
+def test_container_builds_requested_batch_size_jobs_at_a_time():
+    jc = connection([('alpha', 2), ('beta', 0), ('gamma', 1), ('delta', 5), ('epsilon', 1)])
+    pages = jc.retrieveContainerBuilds(FOLDER_URL, FOLDER_JOB_BUILDS_MINIMAL_ATTRS)
+    assert [url[url.rindex('{'):] for url in jc.http.urls] == ['{0,2}', '{2,4}', '{4,6}']
+    assert sorted(pages) == ['alpha', 'beta', 'delta', 'epsilon', 'gamma']
+    assert [build['number'] for build in pages['delta']] == [5, 4, 3]
+    assert jc.retrieveContainerBuilds(BASE_URL + '/job/gone', FOLDER_JOB_BUILDS_MINIMAL_ATTRS) is None
+
+def test_batched_histories_split_per_job():
+    jc = connection([('alpha', 2), ('beta', 0), ('gamma', 1), ('delta', 5)])
+    ref_time = time.gmtime(NOW_MILLIS / 1000 - 3600)
+    histories = jc._fetchBatchedBuildHistories([fetch('alpha'), fetch('beta'), fetch('gamma'), fetch('delta')], ref_time)
+    assert [[build.number for build in history] for history in histories][:3] == [[1, 2], [], [1]]
+    assert len(jc.http.urls) == 3 + 2  # a full second batch calls for a third request, delta's history for two more
+
+    # delta has more builds than fit in a page, so its history is requested on its own
+    jc = connection([('alpha', 2), ('delta', 5)], batch_size=3)
+    histories = jc._fetchBatchedBuildHistories([fetch('alpha'), fetch('delta')], ref_time)
+    assert [[build.number for build in history] for history in histories] == [[1, 2], [1, 2, 3, 4, 5]]
+    assert [url[url.index('/api'):] for url in jc.http.urls[-2:]] == \
+           ['/api/json?tree=builds[%s]{0,3}' % FOLDER_JOB_BUILDS_MINIMAL_ATTRS, '/api/json?tree=builds[%s]{3,6}' % FOLDER_JOB_BUILDS_MINIMAL_ATTRS]
+
+def test_few_jobs_of_a_large_container_requested_individually():
+    jc = connection([('job%d' % number, 1) for number in range(100)], batch_size=10)
+    ref_time = time.gmtime(NOW_MILLIS / 1000 - 3600)
+    histories = jc._fetchBatchedBuildHistories([fetch('job7'), fetch('job42')], ref_time)
+    assert [[build.number for build in history] for history in histories] == [[1], [1]]
+    assert [url.split('/api/')[0] for url in jc.http.urls] == [FOLDER_URL + '/job/job7', FOLDER_URL + '/job/job42']
+
+    jc = connection([('job%d' % number, 1) for number in range(100)], batch_size=50)
+    jc._fetchBatchedBuildHistories([fetch('job%d' % number) for number in range(10)], ref_time)
+    assert len(jc.http.urls) == 3  # the 100 jobs of the container in batches of 50
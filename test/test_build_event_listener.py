@@ -0,0 +1,53 @@
+import json
+import urllib.request
+import urllib.error
+
+import pytest
+
+from bldeif.utils.klog import ActivityLogger
+from bldeif.utils.build_event_listener import BuildEvent, BuildEventListener
+
+def notification(job_url, number, phase):
+    return {'name': job_url.split('/')[-1], 'url': 'job/%s/' % job_url,
+            'build': {'full_url': 'http://jenkado:8080/job/%s/%d/' % (job_url, number),
+                      'number': number, 'phase': phase, 'status': 'SUCCESS',
+                      'url': 'job/%s/%d/' % (job_url, number)}}
+
+def post(listener, payload):
+    host, port = listener.address
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+    request = urllib.request.Request('http://%s:%d/' % (host, port), data=body,
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+
+def test_event_from_notification():
+    event = BuildEvent.fromNotification(notification('frozique/job/australopithicus', 42, 'COMPLETED'))
+    assert (event.job_url, event.number, event.status) == ('job/frozique/job/australopithicus', 42, 'SUCCESS')
+    assert BuildEvent.fromNotification(notification('frozique', 43, 'STARTED')) is None
+    with pytest.raises(ValueError):
+        BuildEvent.fromNotification({'name': 'frozique'})
+
+def test_listener_queues_and_coalesces_finished_builds():
+    listener = BuildEventListener(ActivityLogger('log/build_event_listener.log'), port=0)
+    listener.start()
+    try:
+        assert post(listener, notification('frozique/job/australopithicus', 42, 'STARTED'))   == 202
+        assert post(listener, notification('frozique/job/australopithicus', 42, 'COMPLETED')) == 202
+        assert post(listener, notification('frozique/job/australopithicus', 42, 'FINALIZED')) == 202
+        assert post(listener, notification('pipe%20dream', 7, 'FINALIZED')) == 202
+        assert post(listener, b'{not json') == 400
+        assert post(listener, {'build': {'number': 8}}) == 400
+
+        assert listener.queue.wait(timeout=1)
+        events = listener.queue.drain()
+        assert [(event.job_url, event.number) for event in events] == \
+               [('job/frozique/job/australopithicus', 42), ('job/pipe%20dream', 7)]
+        assert (listener.queue.received, listener.queue.coalesced) == (3, 1)
+        assert len(listener.queue) == 0
+        assert not listener.queue.wait(timeout=0.1)
+    finally:
+        listener.stop()
@@ -0,0 +1,67 @@
+import time
+import calendar
+
+from bldeif.utils.build_feed import BuildFeed
+
+from connection_spec_helper import BASE_URL, FOLDER_URL, HttpStandIn, Response, bare_connection, jenkins_job
+REF_TIME_MILLIS = calendar.timegm(time.strptime('2026-10-18T09:00:00Z', '%Y-%m-%dT%H:%M:%SZ')) * 1000
+
+def feed(*builds):
+    entries = ['<entry><title>%s #%d</title><link rel="alternate" type="text/html" href="%s/%s/%d/"/>'
+               '<published>%s</published><updated>%s</updated></entry>' % (job_url.split('/')[-1], number, BASE_URL, job_url, number, stamp, stamp)
+               for job_url, number, stamp in builds]
+    return ('<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom"><title>All all builds</title>%s</feed>'
+            % ''.join(entries)).encode('utf-8')
+
+FEED = feed(('job/frozique/job/australopithicus', 42, '2026-10-18T09:30:00Z'),
+            ('job/pipe%20dream', 7, '2026-10-18T09:00:00Z'),
+            ('job/frozique/job/australopithicus', 41, '2026-10-18T08:10:00Z'),
+            ('job/troglodyte', 3, '2026-10-18T07:00:00Z'))
+
+def test_feed_entries():
+    build_feed = BuildFeed(FEED)
+    assert [(job_url, number) for job_url, number, timestamp in build_feed.entries] == \
+           [('job/frozique/job/australopithicus', 42), ('job/pipe dream', 7), ('job/frozique/job/australopithicus', 41), ('job/troglodyte', 3)]
+    assert build_feed.entries[1][2] == REF_TIME_MILLIS
+
+def test_jobs_built_since():
+    build_feed = BuildFeed(FEED)
+    assert build_feed.reachesBack(REF_TIME_MILLIS)
+    assert build_feed.jobsBuiltSince(REF_TIME_MILLIS) == {'job/frozique/job/australopithicus', 'job/pipe dream'}
+    assert not build_feed.reachesBack(REF_TIME_MILLIS - 3 * 3600 * 1000)
+    assert not BuildFeed(feed()).reachesBack(REF_TIME_MILLIS)  # no builds, no proof of coverage
+
+def test_malformed_feed():
+    try:
+        BuildFeed(b'<html><body>Jenkins is starting up</body>')
+        assert False, 'expected a ValueError'
+    except ValueError:
+        pass
+
+class FeedStandIn(HttpStandIn):
+    def __init__(self, content):
+        super().__init__()
+        self.content = content
+
+    def respond(self, url):
+        assert url == BASE_URL + '/rssAll'
+        return Response(self.content)
+
+def connection(content):
+    return bare_connection(http=FeedStandIn(content))
+
+def test_fetches_narrowed_to_built_jobs():
+    jobs = [jenkins_job(name, container)
+            for name, container in [('australopithicus', FOLDER_URL), ('pipe dream', BASE_URL), ('troglodyte', BASE_URL)]]
+    fetches = [('All::Jenkins', job, 'Job', job.url + '/api/json?tree=builds[number]', None) for job in jobs]
+
+    active, quiet = connection(FEED).discoverBuiltJobs(fetches, REF_TIME_MILLIS)
+    assert [fetch[1].name for fetch in active] == ['australopithicus', 'pipe dream']
+    assert [fetch[1].name for fetch in quiet]  == ['troglodyte']
+
+    # the feed doesn't go back as far as the ref time, so some builds may be missing from it
+    active, quiet = connection(FEED).discoverBuiltJobs(fetches, REF_TIME_MILLIS - 3 * 3600 * 1000)
+    assert (len(active), len(quiet)) == (3, 0)
+
+    active, quiet = connection(feed()).discoverBuiltJobs(fetches, REF_TIME_MILLIS)
+    assert (len(active), len(quiet)) == (3, 0)
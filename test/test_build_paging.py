@@ -0,0 +1,31 @@
+import time
+import calendar
+
+from connection_spec_helper import BASE_URL, NOW_MILLIS, bare_connection
+
+BUILDS_URL = BASE_URL + '/job/wombat/api/json?tree=builds[number,id,timestamp,duration,result,url]'
+
+def connection(max_items=1000, max_builds=None):
+    return bare_connection(max_items=max_items, max_builds=max_builds)
+
+def page(newest, count, spacing_millis=60000):
+    return [{'number': newest - ix, 'id': str(newest - ix), 'timestamp': NOW_MILLIS - ix * spacing_millis}
+            for ix in range(count)]
+
+def test_page_size_and_range():
+    assert connection().buildPageSize() == 1000
+    assert connection(max_builds=20).buildPageSize() == 20
+    assert connection(max_items=10, max_builds=20).buildPageSize() == 10
+    assert connection(max_builds=20).buildPageUrl(BUILDS_URL, 0)  == BUILDS_URL + '{0,20}'
+    assert connection(max_builds=20).buildPageUrl(BUILDS_URL, 20) == BUILDS_URL + '{20,40}'
+    assert connection(max_items=50, max_builds=20).buildPageUrl(BUILDS_URL, 40) == BUILDS_URL + '{40,50}'
+
+def test_next_page_only_while_builds_are_of_interest():
+    jc = connection(max_builds=5)
+    ref_time = time.gmtime((NOW_MILLIS - 3600 * 1000) / 1000)  # an hour back
+    ref_time_millis = calendar.timegm(ref_time) * 1000
+    assert jc.needsNextPage(page(100, 5), 0, ref_time, ref_time_millis, 0)
+    assert not jc.needsNextPage(page(100, 3), 0, ref_time, ref_time_millis, 0)     # Jenkins has no more
+    assert not jc.needsNextPage(page(100, 5), 0, ref_time, ref_time_millis, 97)    # reached the watermark
+    assert not jc.needsNextPage(page(100, 5, spacing_millis=3600 * 1000), 0, ref_time, ref_time_millis, 0)
+    assert not connection(max_items=10, max_builds=5).needsNextPage(page(100, 5), 5, ref_time, ref_time_millis, 0)
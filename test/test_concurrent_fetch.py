@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from bldeif.jenkins_connection import FOLDER_JOB_BUILDS_MINIMAL_ATTRS
+
+from connection_spec_helper import FOLDER_URL, NOW_MILLIS, BuildsStandIn, bare_connection, jenkins_job
+
+class SlowStandIn(BuildsStandIn):
+    """
+        Answers for a job after the seconds given for it in delays, and with a 404 for a job it doesn't have.
+    """
+    def __init__(self, jobs, delays):
+        super().__init__(jobs)
+        self.delays = delays
+        self.answered = []
+
+    def respond(self, url):
+        name = url[len(FOLDER_URL + '/job/'):].split('/')[0]
+        time.sleep(self.delays.get(name, 0))
+        self.answered.append(name)
+        return super().respond(url)
+
+class RecordingLog:
+    def __init__(self):
+        self.errors = []
+
+    def debug(self, msg):
+        pass
+
+    def error(self, msg):
+        self.errors.append(msg)
+
+def fetches(names):
+    jobs = [jenkins_job(name, FOLDER_URL) for name in names]
+    return [('frozique::Jenkins', job, 'Job', job.url + '/api/json?tree=builds[%s]' % FOLDER_JOB_BUILDS_MINIMAL_ATTRS, 'frozique')
+            for job in jobs]
+
+REF_TIME = time.gmtime(NOW_MILLIS / 1000 - 3600)
+
+def test_histories_in_config_order():
+    jc = bare_connection(http=SlowStandIn([('alpha', 2), ('beta', 3), ('gamma', 1)], {'alpha': 0.2, 'beta': 0.1}), concurrency=3)
+    histories = jc._fetchBuildHistories(fetches(['alpha', 'beta', 'gamma']), REF_TIME)
+    assert jc.http.answered == ['gamma', 'beta', 'alpha']
+    assert [[build.number for build in history] for history in histories] == [[1, 2], [1, 2, 3], [1]]
+
+def test_failed_fetch_reported_while_the_others_run_their_course():
+    jc = bare_connection(http=SlowStandIn([('alpha', 2), ('gamma', 1), ('delta', 4)], {'alpha': 0.2, 'delta': 0.2}),
+                         concurrency=2, log=RecordingLog())
+    with pytest.raises(ValueError):
+        jc._fetchBuildHistories(fetches(['alpha', 'gone', 'gamma', 'missing', 'delta']), REF_TIME)
+    assert sorted(jc.http.answered) == ['alpha', 'delta', 'gamma', 'gone', 'missing']
+    assert [msg.split(' failed:')[0] for msg in jc.log.errors] == \
+           ['Build history retrieval for Job jenkado:8080/job/frozique/job/gone',
+            'Build history retrieval for Job jenkado:8080/job/frozique/job/missing']
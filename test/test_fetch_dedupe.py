@@ -0,0 +1,43 @@
+from bldeif.jenkins_connection import JenkinsView
+
+from connection_spec_helper import FOLDER_URL, HttpStandIn, bare_connection, jenkins_job, job_info, json_response, raw_builds
+
+def connection(watermarks):
+    return bare_connection(watermarks={path: {'number': number, 'timestamp': 0} for path, number in watermarks.items()})
+
+def test_job_fetched_once_for_all_config_items_covering_it():
+    wombat = jenkins_job('wombat', FOLDER_URL)
+    numbat = jenkins_job('numbat', FOLDER_URL)
+    view = JenkinsView({'name': 'marsupials', 'jobs': [job_info('wombat')]}, FOLDER_URL, base_url=FOLDER_URL, peers={'wombat': wombat})
+    view_wombat = view.jobs[0]
+    assert view_wombat.fully_qualified_path() != wombat.fully_qualified_path()
+
+    fetches = [('frozique::Jenkins', wombat, 'Job', 'w', 'frozique'),
+               ('frozique::Jenkins', numbat, 'Job', 'n', 'frozique'),
+               ('marsupials::Jenkins', view_wombat, 'View Job', 'vw', None)]
+
+    jc = connection({wombat.fully_qualified_path(): 12, view_wombat.fully_qualified_path(): 9})
+    distinct, sharers = jc.dedupeFetches(fetches)
+    assert [fetch[3] for fetch in distinct] == ['vw', 'n']  # the view job has the lower watermark
+    assert [[fetch[3] for fetch in sharing] for sharing in sharers] == [['vw', 'w'], ['n']]
+
+    jc = connection({})
+    distinct, sharers = jc.dedupeFetches(fetches)
+    assert [fetch[3] for fetch in distinct] == ['w', 'n']
+
+class BuildByNumberStandIn(HttpStandIn):
+    def respond(self, url):
+        return json_response(raw_builds(12)[0])
+
+def test_pending_build_fetched_once_for_all_config_items_covering_its_job():
+    wombat = jenkins_job('wombat', FOLDER_URL)
+    view = JenkinsView({'name': 'marsupials', 'jobs': [job_info('wombat')]}, FOLDER_URL, base_url=FOLDER_URL, peers={'wombat': wombat})
+    view_wombat = view.jobs[0]
+    jc = bare_connection(http=BuildByNumberStandIn(),
+                         folders=[{'Folder': 'frozique', 'AgileCentral_Project': 'Jenkins'}],
+                         views=[{'View': 'marsupials', 'AgileCentral_Project': 'Jenkins'}],
+                         vetted_folder_jobs={'frozique::Jenkins': [wombat]}, vetted_view_jobs={'marsupials::Jenkins': [view_wombat]})
+    builds = jc.getPendingBuilds({wombat.fully_qualified_path(): [12], view_wombat.fully_qualified_path(): [12]})
+    assert [url.split('/api/')[0] for url in jc.http.urls] == [FOLDER_URL + '/job/wombat/12']
+    assert [build.number for build in builds['frozique::Jenkins'][wombat]] == [12]
+    assert [build.number for build in builds['marsupials::Jenkins'][view_wombat]] == [12]
@@ -0,0 +1,36 @@
+import os
+import time
+
+from bldeif.utils.klog import ActivityLogger
+from bldeif.utils.http_cache import HttpCache
+
+def fresh_http_cache(tmp_path, max_bytes=1000, user='jenkins'):
+    return HttpCache(str(tmp_path / 'http_cache'), max_bytes, ActivityLogger('log/http_cache.log'), user=user)
+
+def test_response_round_trip(tmp_path):
+    cache = fresh_http_cache(tmp_path)
+    assert cache.lookup('http://jenkado:8080/job/frozique/api/json') is None
+    cache.store('http://jenkado:8080/job/frozique/api/json', '"abc"', None, 'application/json', b'{"builds": []}')
+    cached = HttpCache(cache.directory, 1000, cache.log, user='jenkins').lookup('http://jenkado:8080/job/frozique/api/json')
+    assert cached.content == b'{"builds": []}'
+    assert cached.validators() == {'If-None-Match': '"abc"'}
+    assert HttpCache(cache.directory, 1000, cache.log, user='other').lookup('http://jenkado:8080/job/frozique/api/json') is None
+
+def test_response_without_validators_is_not_stored(tmp_path):
+    cache = fresh_http_cache(tmp_path)
+    cache.store('http://jenkado:8080/api/json', None, None, 'application/json', b'{}')
+    assert cache.lookup('http://jenkado:8080/api/json') is None
+    assert (cache.misses, cache.stored) == (1, 0)
+
+def test_least_recently_used_are_evicted(tmp_path):
+    cache = fresh_http_cache(tmp_path, max_bytes=1000)
+    for name in ('alpha', 'beta', 'gamma'):
+        cache.store('http://jenkado:8080/job/%s/api/json' % name, None, 'Tue, 13 Oct 2026 10:00:00 GMT', None, b'x' * 300)
+        time.sleep(0.01)
+    cache.hit(cache.lookup('http://jenkado:8080/job/alpha/api/json'))
+    cache.store('http://jenkado:8080/job/delta/api/json', '"d"', None, None, b'x' * 300)
+    assert cache.lookup('http://jenkado:8080/job/beta/api/json') is None
+    assert cache.lookup('http://jenkado:8080/job/alpha/api/json') is not None
+    assert cache.evicted == 1
+    assert cache.size == 900
+    assert len([name for name in os.listdir(cache.directory) if name.endswith('.body')]) == 3
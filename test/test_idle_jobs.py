@@ -0,0 +1,40 @@
+import time
+
+from bldeif.jenkins_connection import JenkinsJob
+
+from connection_spec_helper import FOLDER_URL, NOW_MILLIS, BuildsStandIn, bare_connection, job_info
+
+REF_TIME_MILLIS = NOW_MILLIS - 3600 * 1000
+
+def job(name, last_build='absent'):
+    info = job_info(name)
+    if last_build != 'absent':
+        info['lastBuild'] = last_build
+    return JenkinsJob(info, FOLDER_URL)
+
+def test_idle_decision():
+    jc = bare_connection()
+    assert jc.isIdle(job('wombat', None), REF_TIME_MILLIS)  # never built
+    assert jc.isIdle(job('wombat', {'number': 8, 'timestamp': REF_TIME_MILLIS - 1}), REF_TIME_MILLIS)
+    assert not jc.isIdle(job('wombat', {'number': 8, 'timestamp': REF_TIME_MILLIS}), REF_TIME_MILLIS)
+    assert not jc.isIdle(job('wombat'), REF_TIME_MILLIS)  # lastBuild not asked for, nothing is known
+
+    # a build in progress is the lastBuild, timestamped when it started
+    building = job('wombat', {'number': 9, 'timestamp': NOW_MILLIS - 60000})
+    assert not jc.isIdle(building, REF_TIME_MILLIS)
+
+    jc.watermarks = {building.fully_qualified_path(): {'number': 9, 'timestamp': 0}}
+    assert jc.isIdle(building, REF_TIME_MILLIS)  # already reflected in Agile Central
+    assert not bare_connection(prefilter_idle_jobs=False).isIdle(job('wombat', None), REF_TIME_MILLIS)
+
+def test_idle_jobs_build_history_not_requested():
+    wombat = job('wombat', {'number': 3, 'timestamp': NOW_MILLIS})
+    numbat = job('numbat', {'number': 2, 'timestamp': REF_TIME_MILLIS - 60000})
+    dingo  = job('dingo',  None)
+    key = 'frozique::Jenkins'
+    jc = bare_connection(http=BuildsStandIn([('wombat', 3), ('numbat', 2), ('dingo', 0)]),
+                         folders=[{'Folder': 'frozique', 'AgileCentral_Project': 'Jenkins'}],
+                         vetted_folder_jobs={key: [wombat, numbat, dingo]})
+    builds = jc.getRecentBuilds(time.gmtime(REF_TIME_MILLIS / 1000))
+    assert [[build.number for build in builds[key][job]] for job in (wombat, numbat, dingo)] == [[1, 2, 3], [], []]
+    assert [url.split('/api/')[0] for url in jc.http.urls] == [wombat.url]
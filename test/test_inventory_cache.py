@@ -0,0 +1,109 @@
+import os
+import time
+
+from bldeif.utils.klog import ActivityLogger
+from bldeif.utils.inventory_cache import InventoryCache
+
+from connection_spec_helper import BASE_URL, FOLDER_URL, NOW_MILLIS, HttpStandIn, bare_connection, job_info, json_response
+
+def fresh_inventory_cache(tmp_path, ttl=600, fingerprint='abc123'):
+    return InventoryCache(str(tmp_path / 'jenkins_inventory.cache'), ttl, fingerprint, ActivityLogger('log/inventory_cache.log'))
+
+def test_missing_cache_yields_nothing(tmp_path):
+    cache = fresh_inventory_cache(tmp_path)
+    assert not cache.exists()
+    assert cache.load() is None
+
+def test_snapshot_round_trip(tmp_path):
+    cache = fresh_inventory_cache(tmp_path)
+    cache.save({'inventory' : ['frozique', 'troglodyte'], 'vetted_jobs' : ['frozique']})
+    snapshot = cache.load()
+    assert snapshot['inventory']   == ['frozique', 'troglodyte']
+    assert snapshot['vetted_jobs'] == ['frozique']
+    assert not os.path.exists('%s.tmp' % cache.filename)
+
+def test_snapshot_for_other_config_is_ignored(tmp_path):
+    cache = fresh_inventory_cache(tmp_path)
+    cache.save({'inventory' : ['frozique']})
+    other = InventoryCache(cache.filename, 600, 'def456', cache.log)
+    assert other.load() is None
+
+def test_expired_snapshot_is_ignored(tmp_path):
+    cache = fresh_inventory_cache(tmp_path, ttl=1)
+    cache.save({'inventory' : ['frozique']})
+    assert cache.load() is not None
+    time.sleep(1.1)
+    assert cache.load() is None
+
+def test_invalidate_removes_the_cache(tmp_path):
+    cache = fresh_inventory_cache(tmp_path)
+    cache.save({'inventory' : ['frozique']})
+    cache.invalidate()
+    assert not cache.exists()
+    assert cache.load() is None
+
+FOLDER = 'com.cloudbees.hudson.plugins.folder.Folder'
+
+class ActivityStandIn(HttpStandIn):
+    """
+        Answers the top level jobs request and the lastBuild requests for the top level, the frozique folder
+        and the marsupials view.
+    """
+    def __init__(self, folder_jobs):
+        super().__init__()
+        self.folder_jobs = folder_jobs  # [(name, lastBuild timestamp), ...]
+
+    def respond(self, url):
+        folder = {'name': 'frozique', '_class': FOLDER}
+        if url == BASE_URL + '/api/json?tree=jobs[name]':
+            return json_response({'jobs': [folder, job_info('kangaroo')]})
+        listings = {BASE_URL: [('kangaroo', NOW_MILLIS)], FOLDER_URL: self.folder_jobs,
+                    BASE_URL + '/view/marsupials': self.folder_jobs[:1]}
+        container_url, query = url.split('/api/json?')
+        assert query.startswith('tree=jobs[name,_class,')
+        jobs = [dict(job_info(name), lastBuild={'number': 5, 'timestamp': timestamp}) for name, timestamp in listings[container_url]]
+        return json_response({'jobs': jobs + [folder] if container_url == BASE_URL else jobs})
+
+def cached_connection(tmp_path, folder_jobs, prefilter_idle_jobs=True, jobs=()):
+    """
+        A connection whose inventory cache holds a snapshot made when the top level had job kangaroo,
+        the frozique folder had jobs wombat and numbat (none of them built then) and the marsupials view had wombat.
+    """
+    jc = bare_connection(jobs=[{'Job': name} for name in jobs], folders=[{'Folder': 'frozique'}], views=[{'View': 'marsupials'}],
+                         prefilter_idle_jobs=prefilter_idle_jobs)
+    never_built = lambda name: dict(job_info(name), lastBuild=None)
+    jc.inventory = jc.buildInventory({'jobs'  : [{'name': 'frozique', '_class': FOLDER, 'views': [],
+                                                  'jobs': [never_built('wombat'), never_built('numbat')]},
+                                                 never_built('kangaroo')],
+                                      'views' : [{'name': 'marsupials', '_class': 'hudson.model.ListView', 'jobs': [never_built('wombat')]}]})
+    jc.vetted_jobs, jc.vetted_view_jobs, jc.vetted_folder_jobs = [], {}, {}
+    jc.inventory_cache = InventoryCache(str(tmp_path / 'jenkins_inventory.cache'), 600, 'abc123', jc.log)
+    jc.saveInventoryCache()
+    jc.inventory = None
+    jc.http = ActivityStandIn(folder_jobs)
+    return jc
+
+def test_restored_inventory_gets_current_build_activity(tmp_path):
+    jc = cached_connection(tmp_path, [('wombat', NOW_MILLIS), ('numbat', NOW_MILLIS - 7200 * 1000)])
+    assert jc.restoreCachedInventory()
+    wombat, numbat = jc.inventory.getFolder('frozique').jobs
+    ref_time_millis = NOW_MILLIS - 3600 * 1000
+    assert not jc.isIdle(wombat, ref_time_millis) and jc.isIdle(numbat, ref_time_millis)
+    assert jc.inventory.getView('marsupials').jobs[0].last_build_timestamp == NOW_MILLIS
+
+    jc = cached_connection(tmp_path, [('wombat', NOW_MILLIS), ('numbat', NOW_MILLIS - 7200 * 1000)], prefilter_idle_jobs=False)
+    assert jc.restoreCachedInventory()
+    assert jc.inventory.getFolder('frozique').jobs[1].last_build_number is None
+    assert len(jc.http.urls) == 1  # only the top level jobs
+
+def test_new_job_in_configured_folder_invalidates_restore(tmp_path):
+    jc = cached_connection(tmp_path, [('wombat', NOW_MILLIS), ('numbat', NOW_MILLIS), ('dingo', NOW_MILLIS)])
+    assert not jc.restoreCachedInventory()
+    assert jc.inventory is None
+
+def test_configured_jobs_refreshed_beside_a_folder(tmp_path):
+    jc = cached_connection(tmp_path, [('wombat', NOW_MILLIS), ('numbat', NOW_MILLIS)], jobs=['kangaroo'])
+    assert jc.restoreCachedInventory()
+    kangaroo = [job for job in jc.inventory.jobs if job.name == 'kangaroo'][0]
+    assert kangaroo.last_build_timestamp == NOW_MILLIS
+    assert jc.inventory.getFolder('frozique').jobs[0].last_build_timestamp == NOW_MILLIS
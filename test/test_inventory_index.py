@@ -0,0 +1,75 @@
+from bldeif.jenkins_connection import JenkinsInventory, JenkinsJob, JenkinsJobsFolder, JenkinsView
+
+from connection_spec_helper import bare_connection
+
+BASE_URL = 'http://jenkado:8080'
+FREESTYLE = 'hudson.model.FreeStyleProject'
+
+def job_info(name):
+    return {'name': name, '_class': FREESTYLE}
+
+def make_inventory():
+    jobs = [JenkinsJob(job_info('troglodyte'), container=BASE_URL, base_url=BASE_URL)]
+
+    frozique_url = '%s/job/frozique' % BASE_URL
+    bontamy_url  = '%s/job/abacab/job/bontamy' % BASE_URL
+    folders = {'/frozique'       : JenkinsJobsFolder({'name': 'frozique', 'jobs': [job_info('australopithicus')]},
+                                                     BASE_URL, folder_url=frozique_url),
+               '/abacab'         : JenkinsJobsFolder({'name': 'abacab', 'jobs': [job_info('troglodyte')]},
+                                                     BASE_URL, folder_url='%s/job/abacab' % BASE_URL),
+               '/abacab/bontamy' : JenkinsJobsFolder({'name': 'bontamy', 'jobs': [job_info('corral')]},
+                                                     '%s/job/abacab' % BASE_URL, folder_url=bontamy_url),
+              }
+    views = {'/Prairie'                : JenkinsView({'name': 'Prairie', 'jobs': [job_info('bluestem')]}, base_url=BASE_URL),
+             '/abacab/bontamy/Cliffside': JenkinsView({'name': 'Cliffside', 'jobs': [job_info('corral')]},
+                                                      bontamy_url, base_url=bontamy_url),
+            }
+    return JenkinsInventory(BASE_URL, jobs, folders, views)
+
+def test_folder_lookup_by_path_suffix():
+    inventory = make_inventory()
+    assert inventory.getFolder('frozique').url == '%s/job/frozique' % BASE_URL
+    assert inventory.getFolder('/bontamy') is inventory.folders['/abacab/bontamy']
+    assert inventory.getFolder('/abacab/bontamy') is inventory.folders['/abacab/bontamy']
+    assert inventory.getFolder('/bacab') is None
+
+def test_view_lookup_by_path_suffix():
+    inventory = make_inventory()
+    assert inventory.getView('Prairie') is inventory.views['/Prairie']
+    assert inventory.getView('/bontamy/Cliffside') is inventory.views['/abacab/bontamy/Cliffside']
+    assert inventory.getView('/Meadow') is None
+
+def test_job_lookup_prefers_top_level_jobs():
+    inventory = make_inventory()
+    assert inventory.getJob('troglodyte') is inventory.jobs[0]
+    assert inventory.getJob('australopithicus').container == '%s/job/frozique' % BASE_URL
+    assert inventory.getJob('bluestem').url == '%s/view/Prairie/job/bluestem' % BASE_URL
+    assert inventory.getJob('sasquatch') is None
+
+def test_lookup_by_fully_qualified_path():
+    inventory = make_inventory()
+    assert inventory.getFolderByPath('abacab // bontamy') is inventory.folders['/abacab/bontamy']
+    assert inventory.getFolderByPath('bontamy') is None
+    assert inventory.getViewByPath('abacab // bontamy // Cliffside') is inventory.views['/abacab/bontamy/Cliffside']
+    assert sorted(inventory.getFullyQualifiedFolderMapping().keys()) == ['abacab', 'abacab // bontamy', 'frozique']
+
+def test_view_jobs_share_the_job_instances_of_their_container():
+    jc = bare_connection()
+    folder = 'com.cloudbees.hudson.plugins.folder.Folder'
+    listview = 'hudson.model.ListView'
+    # the views come ahead of the jobs of their container in the responses, as they may from Jenkins
+    jenkins_info = {'views' : [{'name': 'Prairie', '_class': listview, 'jobs': [job_info('troglodyte'), job_info('corral')]}],
+                    'jobs'  : [{'name': 'abacab', '_class': folder,
+                                'views': [{'name': 'Cliffside', '_class': listview, 'jobs': [job_info('corral')]}],
+                                'jobs' : [job_info('corral')]},
+                               job_info('troglodyte')]}
+    inventory = jc.buildInventory(jenkins_info)
+    corral = inventory.getFolder('abacab').jobs[0]
+    assert inventory.jobs.count(corral) == 1 and len(inventory.jobs) == 2
+    cliffside_corral = inventory.getView('/abacab/Cliffside').jobs[0]
+    assert cliffside_corral.job is corral
+    assert cliffside_corral.url == '%s/job/abacab/view/Cliffside/job/corral' % BASE_URL
+
+    prairie_troglodyte, prairie_corral = inventory.getView('Prairie').jobs
+    assert prairie_troglodyte.job is inventory.getJob('troglodyte')
+    assert isinstance(prairie_corral, JenkinsJob)  # not a top level job, so it has an instance of its own
@@ -0,0 +1,65 @@
+import time
+import calendar
+
+from bldeif.jenkins_connection import JenkinsBuild, CHANGESET_ATTRS
+
+COMMIT = {'commitId': 'a7f48eb99ac8064c65a1fde3239cb8094bac8709', 'timestamp': 1480550939000,
+          'msg': 'DE1000 wombats stink', 'date': '2016-11-30 19:08:59 -0500',
+          'paths': [{'editType': 'edit', 'file': 'foobar'}]}
+
+def raw_build(build_id='42', timestamp=1480550939000):
+    return {'id': build_id, 'number': '42', 'result': 'ABORTED',
+            '_class'    : 'hudson.model.FreeStyleBuild',
+            'timestamp' : timestamp,
+            'duration'  : 3723456, 'url': 'http://jenkado:8080/job/wombat/42/',
+            'actions'   : [{'remoteUrls': ['alpha/wombat/.git']}],
+            'changeSet' : {'kind': 'git', 'items': [COMMIT, COMMIT]}}
+
+def test_build_values():
+    build = JenkinsBuild('DownWithCoalaBears', raw_build())
+    assert build.number  == 42
+    assert build.result  == 'INCOMPLETE'
+    assert build.Id      == '1480550939000'
+    assert build.id_as_ts == time.gmtime(1480550939)
+    assert build.started  == '2016-12-01 00:08:59Z'
+    assert build.finished == '2016-12-01 01:11:02'
+    assert build.elapsed.strip() == '1:02:03.456'
+
+def test_changesets_are_digested_on_demand():
+    build = JenkinsBuild('DownWithCoalaBears', raw_build())
+    assert build._changeSets is None
+    assert build.vcs == 'git'
+    assert build.repository == 'wombat'
+    assert [cs.commitId for cs in build.changeSets] == [COMMIT['commitId']]
+
+def test_occurred_before_uses_raw_values():
+    ref_time = time.gmtime(1480550940)
+    ref_time_millis = calendar.timegm(ref_time) * 1000
+    assert JenkinsBuild.occurredBefore(raw_build(timestamp=1480550939999), ref_time, ref_time_millis)
+    assert not JenkinsBuild.occurredBefore(raw_build(timestamp=1480550940000), ref_time, ref_time_millis)
+    assert JenkinsBuild.occurredBefore(raw_build(build_id='2016-11-30_23-59-59'), ref_time, ref_time_millis)
+
+def test_incomplete_build_takes_on_details():
+    raw = raw_build()
+    details = {'actions': raw.pop('actions'), 'changeSet': raw.pop('changeSet')}
+    build = JenkinsBuild('DownWithCoalaBears', raw, complete=False)
+    assert not build.complete
+    assert build.changeSets == []
+    assert build.as_tuple_data()[0] == ('Number', 42)
+    build.absorbDetails(details)
+    assert build.complete
+    assert build.repository == 'wombat'
+    assert [cs.commitId for cs in build.changeSets] == [COMMIT['commitId']]
+
+def test_changeset_projection_has_what_the_model_reads():
+    projected = {'commitId': COMMIT['commitId'], 'timestamp': COMMIT['timestamp'], 'msg': COMMIT['msg'],
+                 'paths': [{'file': 'foobar'}]}
+    raw = raw_build()
+    raw['changeSet'] = {'kind': 'git', 'items': [projected]}
+    build = JenkinsBuild('DownWithCoalaBears', raw)
+    changeset = build.changeSets[0]
+    assert (changeset.commitId, changeset.timestamp, changeset.message, changeset.uri) == \
+           (COMMIT['commitId'], COMMIT['timestamp'], COMMIT['msg'], 'foobar')
+    for field in ('kind', 'revisions[module]', 'commitId', 'timestamp', 'msg', 'paths[file]'):
+        assert field in CHANGESET_ATTRS
+    assert '*' not in CHANGESET_ATTRS
@@ -0,0 +1,138 @@
+import threading
+import json
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+from bldeif.utils.klog import ActivityLogger
+from bldeif.utils.jenkins_http import JenkinsHttpClient
+from bldeif.utils.adaptive_limiter import AdaptiveLimiter
+from bldeif.utils.http_cache import HttpCache
+
+PAYLOAD = json.dumps({'_class': 'hudson.model.Hudson', 'jobs': []}).encode('utf-8')
+BUILDS  = [{'number': number, 'changeSet': {'items': [{'msg': 'x' * 2000}] * 10}} for number in range(500, 0, -1)]
+BUILDS_PAYLOAD = json.dumps({'_class': 'hudson.model.FreeStyleProject', 'builds': BUILDS}).encode('utf-8')
+
+class JenkinsStandIn(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path.startswith('/busy/') and self.server.throttle_count > 0:
+            self.server.throttle_count -= 1
+            self.send_response(429 if self.path.endswith('429') else 503)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.path.startswith('/etag/'):
+            self.server.etag_requests.append(self.headers.get('If-None-Match', None))
+            if self.headers.get('If-None-Match', None) == '"v1"':
+                self.send_response(304)
+                self.send_header('ETag', '"v1"')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+        payload = BUILDS_PAYLOAD if self.path.startswith('/job/') else PAYLOAD
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if self.path.startswith('/etag/'):
+            self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped reading
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server():
+    server = HTTPServer(('127.0.0.1', 0), JenkinsStandIn)
+    server.throttle_count = 0
+    server.etag_requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def test_client_counts_requests_and_bytes():
+    server = start_server()
+    url = "http://127.0.0.1:%d/api/json" % server.server_address[1]
+    client = JenkinsHttpClient(ActivityLogger('log/jenkins_http.log'), auth=('jenkins', 'rallydev'), timeout=5)
+    try:
+        assert client.getJSON(url)['_class'] == 'hudson.model.Hudson'
+        assert client.get(url).status_code == 200
+        assert client.requests_issued == 2
+        assert client.bytes_received  == 2 * len(PAYLOAD)
+        assert client.statistics() == "2 requests issued, %d bytes received" % (2 * len(PAYLOAD))
+    finally:
+        client.close()
+        server.shutdown()
+
+def test_client_session_setup():
+    proxies = {'http': 'http://proxy.example.com:3128'}
+    client = JenkinsHttpClient(ActivityLogger('log/jenkins_http.log'), auth=('jenkins', 'rallydev'),
+                               proxies=proxies, pool_size=16)
+    assert client.session.auth == ('jenkins', 'rallydev')
+    assert client.session.proxies['http'] == 'http://proxy.example.com:3128'
+    assert client.session.get_adapter('https://jenkins.example.com')._pool_maxsize == 16
+    client.close()
+
+def test_streaming_stops_reading_early():
+    server = start_server()
+    url = "http://127.0.0.1:%d/job/frozique/api/json" % server.server_address[1]
+    client = JenkinsHttpClient(ActivityLogger('log/jenkins_http.log'), timeout=5)
+    try:
+        numbers = []
+        builds = client.streamJSONArray(url, 'builds')
+        for build in builds:
+            numbers.append(build['number'])
+            if len(numbers) == 3:
+                break
+        builds.close()
+        assert numbers == [500, 499, 498]
+        assert client.requests_issued == 1
+        assert 0 < client.bytes_received < len(BUILDS_PAYLOAD) / 10
+
+        assert [build['number'] for build in client.streamJSONArray(url, 'builds')] == list(range(500, 0, -1))
+        assert client.requests_issued == 2
+    finally:
+        client.close()
+        server.shutdown()
+
+def test_throttled_requests_are_retried():
+    server = start_server()
+    base_url = "http://127.0.0.1:%d/busy" % server.server_address[1]
+    limiter = AdaptiveLimiter(4, max_retries=3)
+    client = JenkinsHttpClient(ActivityLogger('log/jenkins_http.log'), timeout=5, limiter=limiter)
+    try:
+        server.throttle_count = 2
+        assert client.getJSON(base_url + '/429')['_class'] == 'hudson.model.Hudson'
+        assert (limiter.throttled, limiter.retries) == (2, 2)
+        assert client.requests_issued == 3
+        assert int(limiter.limit) == 2  # halved twice from 4, then up by one for the success
+
+        server.throttle_count = 10
+        assert client.get(base_url + '/503').status_code == 503  # retries used up
+        assert (limiter.throttled, limiter.retries) == (6, 5)
+        assert limiter.in_flight == 0
+    finally:
+        client.close()
+        server.shutdown()
+
+def test_conditional_get_served_from_cache(tmp_path):
+    server = start_server()
+    url = "http://127.0.0.1:%d/etag/api/json" % server.server_address[1]
+    logger = ActivityLogger('log/jenkins_http.log')
+    cache_dir = str(tmp_path / 'jenkins_http_cache')
+    client = JenkinsHttpClient(logger, timeout=5, cache=HttpCache(cache_dir, 1024 * 1024, logger))
+    try:
+        assert client.getJSON(url)['_class'] == 'hudson.model.Hudson'
+        assert client.bytes_received == len(PAYLOAD)
+        # a later run (with a new client) revalidates the response rather than getting it again
+        client.close()
+        client = JenkinsHttpClient(logger, timeout=5, cache=HttpCache(cache_dir, 1024 * 1024, logger))
+        assert client.getJSON(url)['_class'] == 'hudson.model.Hudson'
+        assert server.etag_requests == [None, '"v1"']
+        assert client.bytes_received == 0
+        assert (client.cache.hits, client.cache.misses) == (1, 0)
+    finally:
+        client.close()
+        server.shutdown()
@@ -0,0 +1,32 @@
+import pytest
+
+from bldeif.utils.job_selector import JobSelector
+from bldeif.utils.eif_exception import ConfigurationError
+
+class Job:
+    def __init__(self, name):
+        self.name = name
+
+JOBS = [Job(name) for name in ['bluestem', 'stemwinder', 'fumarole', 'master-launch', 'feature-bonfire', 'Brazen wogs']]
+
+def selected(item):
+    return [job.name for job in JobSelector.forConfigItem(item).select(JOBS)]
+
+def test_no_patterns_selects_everything():
+    assert selected({'View': 'Prairie'}) == [job.name for job in JOBS]
+
+def test_include_and_exclude():
+    assert selected({'include': '^blue*,^stem,fumar'}) == ['bluestem', 'stemwinder', 'fumarole']
+    assert selected({'include': '^blue*,^stem,fumar', 'exclude': '^stem, fumar'}) == ['bluestem']
+
+def test_star_is_treated_as_dots():
+    assert selected({'include': 'Bra*wogs'}) == []
+    assert selected({'include': 'Bra*zen'}) == ['Brazen wogs']
+
+def test_empty_patterns_are_ignored():
+    assert selected({'exclude': 'launch,'}) == ['bluestem', 'stemwinder', 'fumarole', 'feature-bonfire', 'Brazen wogs']
+    assert selected({'include': None, 'exclude': ''}) == [job.name for job in JOBS]
+
+def test_invalid_pattern():
+    with pytest.raises(ConfigurationError):
+        JobSelector(include='^feature-(bonfire')
@@ -0,0 +1,71 @@
+import json
+import pytest
+
+from bldeif.utils.json_stream import JsonArrayStream
+
+BUILD_HISTORY = {'_class' : 'org.jenkinsci.plugins.workflow.job.WorkflowJob',
+                 'builds' : [{'number': 3, 'result': 'SUCCESS', 'changeSets': [{'kind': 'git', 'items': [{'msg': 'résumé'}]}]},
+                             {'number': 2, 'result': 'FAILURE', 'changeSets': []},
+                             {'number': 1, 'result': None,      'changeSets': []}],
+                 'nextBuildNumber' : 4}
+
+def feed_in_pieces(content, piece_size):
+    stream = JsonArrayStream('builds')
+    items = []
+    for ix in range(0, len(content), piece_size):
+        items.extend(stream.feed(content[ix:ix + piece_size]))
+    stream.finish()
+    return items
+
+def test_items_in_any_size_pieces():
+    content = json.dumps(BUILD_HISTORY, indent=1).encode('utf-8')
+    for piece_size in [1, 2, 7, 64, len(content)]:
+        assert feed_in_pieces(content, piece_size) == BUILD_HISTORY['builds']
+
+def test_items_are_returned_as_soon_as_complete():
+    content = json.dumps(BUILD_HISTORY)
+    stream = JsonArrayStream('builds')
+    second_build_end = content.index('}, {"number": 1')
+    items = stream.feed(content[:second_build_end + 1])
+    assert [item['number'] for item in items] == [3, 2]
+    assert not stream.done
+
+def test_numbers_split_at_any_offset():
+    content = b'{"builds": [1.5, 2e3, -3.25E-2, 40, 0.125e+1]}'
+    for piece_size in range(1, 8):
+        assert feed_in_pieces(content, piece_size) == [1.5, 2e3, -3.25E-2, 40, 0.125e+1]
+
+def test_empty_array():
+    assert feed_in_pieces(b'{"_class": "hudson.model.FreeStyleProject", "builds": []}', 5) == []
+
+def test_truncated_content():
+    with pytest.raises(ValueError):
+        feed_in_pieces(json.dumps(BUILD_HISTORY).encode('utf-8')[:-40], 16)
+
+def test_missing_array():
+    with pytest.raises(ValueError):
+        feed_in_pieces(b'{"_class": "hudson.model.FreeStyleProject", "jobs": []}', 5)
+
+class CountingDecoder(json.JSONDecoder):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def raw_decode(self, s, idx=0):
+        self.calls += 1
+        return super().raw_decode(s, idx)
+
+def test_large_item_decoded_once():
+    changes = [{'msg': 'fix {brace} and [bracket] in "quotes" \\ %d' % ix, 'paths': [{'file': 'src/%d.py' % ix}]} for ix in range(50000)]
+    build = {'number': 1, 'changeSet': {'items': changes}}
+    content = json.dumps({'_class': 'hudson.model.FreeStyleProject', 'builds': [build]}).encode('utf-8')
+    assert len(content) > 4 * 1024 * 1024
+
+    stream = JsonArrayStream('builds')
+    stream.decoder = CountingDecoder()
+    items = []
+    for ix in range(0, len(content), 64 * 1024):
+        items.extend(stream.feed(content[ix:ix + 64 * 1024]))
+    stream.finish()
+    assert items == [build]
+    assert stream.decoder.calls == 4  # "_class", its value, "builds" and the build, rather than once a piece
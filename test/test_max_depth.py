@@ -0,0 +1,72 @@
+import re
+
+from connection_spec_helper import HttpStandIn, json_response, bare_connection, job_info as job
+
+FOLDER    = 'com.cloudbees.hudson.plugins.folder.Folder'
+LISTVIEW  = 'hudson.model.ListView'
+
+def jenkins_info(max_depth):
+    """
+        What Jenkins answers the inventory query with for the max_depth: the jobs of a folder nested
+        deeper than max_depth aren't listed and one nested deeper than max_depth + 1 isn't listed at all.
+    """
+    def folder(name, level, items, views=()):
+        if level > max_depth + 1:
+            return {'_class': FOLDER}
+        if level > max_depth:
+            return {'name': name, '_class': FOLDER, 'jobs': [{'_class': item['_class']} for item in items], 'views': list(views)}
+        return {'name': name, '_class': FOLDER, 'jobs': items, 'views': list(views)}
+
+    inner = folder('inner', 2, [job('deep1'), job('deep2')], [{'name': 'iv', '_class': LISTVIEW, 'jobs': [job('deep1')]}])
+    return {'jobs': [job('A'), folder('frozique', 1, [job('australopithicus'), inner])], 'views': []}
+
+class InventoryStandIn(HttpStandIn):
+    def __init__(self):
+        super().__init__()
+        self.depths = []
+        self.timeouts = []
+
+    def get(self, url, **kwargs):
+        self.timeouts.append(kwargs.get('timeout', 'Timeout'))
+        return super().get(url, **kwargs)
+
+    def respond(self, url):
+        depth = int(re.search(r'\?depth=(\d+)&', url).group(1))
+        self.depths.append(depth)
+        return json_response(jenkins_info(depth - 2))
+
+def connection(folders=(), views=(), full_folder_path=False, max_depth='auto'):
+    jc = bare_connection(http=InventoryStandIn(), prefilter_idle_jobs=False, full_folder_path=full_folder_path,
+                         folders=[{'Folder': name} for name in folders], views=[{'View': name} for name in views])
+    jc.auto_depth = max_depth == 'auto'
+    jc.maxDepth = (jc.configuredItemsDepth() if jc.auto_depth else max_depth) + 2
+    return jc
+
+def test_depth_from_configured_items():
+    assert connection().configuredItemsDepth() == 0
+    assert connection(['frozique', 'frozique // inner'], ['frozique // inner // iv'], full_folder_path=True).configuredItemsDepth() == 2
+    assert connection(['frozique'], ['iv']).configuredItemsDepth() == 1  # only a lower bound without FullFolderPath
+
+def test_folder_beyond_reach_is_not_reached():
+    jc = connection(['frozique // inner'], full_folder_path=True, max_depth=1)
+    inventory = jc.buildInventory(jenkins_info(1))
+    assert inventory.getFolderByPath('frozique // inner') is not None  # listed, but without its jobs
+    assert jc.foldersBeyondReach(inventory) == ['/frozique/inner']
+    assert jc.unreachedConfigItems(inventory) == ['frozique // inner']
+
+    jc.maxDepth = 2 + 2
+    inventory = jc.buildInventory(jenkins_info(2))
+    assert jc.unreachedConfigItems(inventory) == [] and jc.foldersBeyondReach(inventory) == []
+
+def test_auto_depth_deepens_until_configured_items_are_reached():
+    jc = connection(['inner'], ['iv'])
+    inventory = jc.crawlInventory(jenkins_info(jc.maxDepth - 2))
+    assert jc.http.depths == [4]  # MaxDepth 2
+    assert jc.http.timeouts == [None]  # the Timeout value doesn't apply to the crawl
+    assert [job.name for job in inventory.getFolder('inner').jobs] == ['deep1', 'deep2']
+
+    # a folder that isn't in Jenkins doesn't send the crawl any deeper than the bottom of the job tree
+    jc = connection(['nonesuch'])
+    jc.crawlInventory(jenkins_info(jc.maxDepth - 2))
+    assert jc.http.depths == [4]
+    assert jc.unreachedConfigItems(jc.buildInventory(jenkins_info(2))) == ['nonesuch']
@@ -0,0 +1,51 @@
+import json
+import time
+import pickle
+
+from bldeif.jenkins_connection import parseBuildPage, FOLDER_JOB_BUILD_ATTRS
+
+from connection_spec_helper import FOLDER_URL, NOW_MILLIS, BuildsStandIn, bare_connection, jenkins_job, raw_builds
+
+def connection(job, parse_pool=None, watermark=0):
+    watermarks = {job.fully_qualified_path(): {'number': watermark, 'timestamp': 0}} if watermark else {}
+    return bare_connection(http=BuildsStandIn([(job.name, 10)], changesets=True), max_builds=4,
+                           parse_pool=parse_pool, watermarks=watermarks)
+
+def test_parse_build_page():
+    ref_time = time.gmtime(NOW_MILLIS / 1000 - 150)  # the 3 most recent builds are within the last 150 seconds
+    builds, page_length, last_beyond = parseBuildPage(json.dumps({'builds': raw_builds(5, changesets=True)}), 'wombat', 'frozique', ref_time, 0)
+    assert [build.number for build in builds] == [5, 4, 3]
+    assert (page_length, last_beyond) == (5, True)
+
+    builds, page_length, last_beyond = parseBuildPage(json.dumps({'builds': raw_builds(5, changesets=True)[:2]}), 'wombat', 'frozique', ref_time, 4)
+    assert [build.number for build in builds] == [5] and (page_length, last_beyond) == (2, True)
+
+    restored = pickle.loads(pickle.dumps(builds))[0]
+    assert (restored.number, restored.changeSets[0].commitId) == (5, 'c5')
+
+def parse_pool_connection(parse_workers, concurrency, stream_build_history=False):
+    return bare_connection(parse_workers=parse_workers, concurrency=concurrency, stream_build_history=stream_build_history)
+
+def test_parse_pool_only_when_it_can_pay_off():
+    assert parse_pool_connection(0, 4).startParsePool() is None
+    assert parse_pool_connection(2, 1).startParsePool() is None  # the lone fetching thread would just wait on it
+    assert parse_pool_connection(2, 4, stream_build_history=True).startParsePool() is None
+    pool = parse_pool_connection(2, 4).startParsePool()
+    try:
+        assert pool._mp_context.get_start_method() != 'fork'  # the fetching process has threads running
+    finally:
+        pool.shutdown()
+
+def test_parsed_build_history_matches_in_process_history():
+    job = jenkins_job('wombat', FOLDER_URL)
+    builds_url = job.url + '/api/json?tree=builds[%s]' % FOLDER_JOB_BUILD_ATTRS
+    ref_time = time.gmtime(NOW_MILLIS / 1000 - 7 * 60 - 30)
+    with parse_pool_connection(2, 4).startParsePool() as pool:
+        for watermark in (0, 6):
+            expected_jc, parsed_jc = connection(job, watermark=watermark), connection(job, pool, watermark)
+            expected = expected_jc.retrieveBuildHistory(builds_url, job, 'frozique', ref_time)
+            parsed   = parsed_jc.retrieveBuildHistory(builds_url, job, 'frozique', ref_time)
+            summary = lambda builds: [(build.number, build.name, build.vcs, [cs.commitId for cs in build.changeSets]) for build in builds]
+            assert summary(parsed) == summary(expected)
+            assert parsed_jc.http.urls == expected_jc.http.urls
+    assert [build.number for build in parsed] == [7, 8, 9, 10]
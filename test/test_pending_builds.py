@@ -0,0 +1,49 @@
+from bldeif.utils.klog import ActivityLogger
+from bldeif.utils.pending_builds_file import PendingBuildsFile
+from bldeif.bld_connector import BLDConnector
+
+JOB_PATH = 'jenkado:8080/job/frozique/job/long-haul'
+
+class Job:
+    def fully_qualified_path(self):
+        return JOB_PATH
+
+class Build:
+    def __init__(self, number, result='SUCCESS'):
+        self.number    = number
+        self.result    = result
+        self.timestamp = number * 1000
+
+def connector(pending):
+    bldc = BLDConnector.__new__(BLDConnector)  # no config or connections needed for the bookkeeping
+    bldc.log = ActivityLogger('log/pending_builds.log')
+    bldc.watermarks = {JOB_PATH: {'number': 10, 'timestamp': 10000}}
+    bldc.pending_builds = pending
+    return bldc
+
+def test_pending_builds_round_trip(tmp_path):
+    pbf = PendingBuildsFile(str(tmp_path / 'pending.file'), ActivityLogger('log/pending_builds.log'))
+    assert pbf.read() == {}
+    pbf.write({JOB_PATH: [119, 118], 'jenkado:8080/job/idle': []})
+    assert pbf.read() == {JOB_PATH: [118, 119]}
+
+def test_running_build_is_pending_and_does_not_hold_the_watermark():
+    job = Job()
+    builds = [Build(11), Build(12, result='None'), Build(13)]
+    unrecorded = [(job, build, 'Jenkins', 'frozique') for build in builds]
+    reflected = {(JOB_PATH, 11), (JOB_PATH, 13)}
+    bldc = connector({})
+    bldc.pending_builds = bldc._identifyPendingBuilds(unrecorded, reflected)
+    assert bldc.pending_builds == {JOB_PATH: [12]}
+    bldc._advanceWatermarks({'frozique::Jenkins': {job: builds}}, unrecorded, reflected)
+    assert bldc.watermarks[JOB_PATH]['number'] == 13
+
+def test_pending_build_below_the_watermark_is_reconsidered():
+    job = Job()
+    bldc = connector({JOB_PATH: [8, 9]})
+    pending_bld_builds = {'frozique::Jenkins': {job: [Build(8), Build(9, result='None')]}}
+    unrecorded = bldc._addPendingBuilds([], {}, pending_bld_builds)
+    assert [build.number for job, build, project, view in unrecorded] == [8, 9]
+    # 8 completed but went unreflected (eg, over the MaxBuilds cap), 9 is still running
+    assert bldc._identifyPendingBuilds(unrecorded, set()) == {JOB_PATH: [8, 9]}
+    assert bldc._identifyPendingBuilds(unrecorded, {(JOB_PATH, 8)}) == {JOB_PATH: [9]}
@@ -0,0 +1,45 @@
+from bldeif.utils.klog import ActivityLogger
+from bldeif.bld_connector_runner import BuildConnectorRunner
+
+class ConnectorStandIn:
+    def __init__(self):
+        self.disconnected = False
+
+    def disconnect(self):
+        self.disconnected = True
+
+def runner(sweep_outcome):
+    """
+        A runner whose sweep (_operateService) makes a new connector and then fails when
+        sweep_outcome is an exception, or makes no connector at all when sweep_outcome is None.
+    """
+    bcr = BuildConnectorRunner.__new__(BuildConnectorRunner)  # no config, lock or listener needed
+    bcr.log = ActivityLogger('log/reconcile.log')
+    bcr.connector = ConnectorStandIn()
+    bcr.made = []
+
+    def operateService(config_file_path):
+        bcr.connector = None
+        if sweep_outcome is None:
+            raise Exception('config file is not readable')
+        bcr.connector = ConnectorStandIn()
+        bcr.made.append(bcr.connector)
+        if isinstance(sweep_outcome, Exception):
+            raise sweep_outcome
+    bcr._operateService = operateService
+    return bcr
+
+def test_sweep_connector_replaces_the_previous_one():
+    bcr = runner('success')
+    previous = bcr.connector
+    bcr._reconcile('config/jenkado.yml')
+    assert bcr.connector is not previous and not bcr.connector.disconnected
+    assert previous.disconnected
+
+def test_failed_sweep_keeps_the_previous_connector():
+    for outcome in (Exception('Agile Central is unavailable'), None):
+        bcr = runner(outcome)
+        previous = bcr.connector
+        bcr._reconcile('config/jenkado.yml')
+        assert bcr.connector is previous and not previous.disconnected
+        assert all(made.disconnected for made in bcr.made)  # the connector of the failed sweep
@@ -0,0 +1,62 @@
+from connection_spec_helper import BASE_URL, FOLDER_URL, HttpStandIn, Response, bare_connection, job_info, json_response
+
+FOLDER   = 'com.cloudbees.hudson.plugins.folder.Folder'
+LISTVIEW = 'hudson.model.ListView'
+INNER_URL = FOLDER_URL + '/job/inner'
+
+def folder(name, items):
+    return {'name': name, '_class': FOLDER, 'jobs': items, 'views': []}
+
+# what Jenkins has, as the targeted requests get it
+CONTAINERS = {BASE_URL                 : {'jobs': [job_info('A'), {'name': 'frozique', '_class': FOLDER}]},
+              FOLDER_URL               : folder('frozique', [job_info('australopithicus'), {'name': 'inner', '_class': FOLDER}]),
+              INNER_URL                : folder('inner', [job_info('deep1'), job_info('deep2')]),
+              INNER_URL + '/job/deep1' : job_info('deep1'),
+              INNER_URL + '/view/iv'   : {'_class': LISTVIEW, 'jobs': [job_info('deep1')]},
+              BASE_URL  + '/view/Prairie' : {'_class': LISTVIEW, 'jobs': [job_info('A')]},
+             }
+
+# and as the full crawl gets it
+JENKINS_INFO = {'jobs'  : [job_info('A'), folder('frozique', [job_info('australopithicus'), folder('inner', [job_info('deep1')])])],
+                'views' : []}
+
+class TargetedStandIn(HttpStandIn):
+    def respond(self, url):
+        container_url, query = url.split('/api/json?')
+        if query.startswith('depth='):
+            return json_response(JENKINS_INFO)
+        if container_url not in CONTAINERS:
+            return Response(b'', 404)
+        return json_response(CONTAINERS[container_url])
+
+def connection(jobs=(), folders=(), views=(), full_folder_path=True):
+    return bare_connection(http=TargetedStandIn(), targeted_crawl=True, full_folder_path=full_folder_path,
+                           auto_depth=False, maxDepth=3, prefilter_idle_jobs=False,
+                           jobs=[{'Job': name} for name in jobs], folders=[{'Folder': name} for name in folders],
+                           views=[{'View': name} for name in views])
+
+def requested(jc):
+    return [url.split('/api/json?')[0] for url in jc.http.urls]
+
+def test_folders_and_views_resolved_at_depth():
+    jc = connection(['A'], ['frozique // inner'], ['frozique // inner // iv', 'Prairie'])
+    inventory = jc.crawlInventory()
+    assert requested(jc) == [BASE_URL, INNER_URL, INNER_URL + '/view/iv', BASE_URL + '/view/Prairie']
+    assert [job.name for job in inventory.getFolderByPath('frozique // inner').jobs] == ['deep1', 'deep2']
+    assert [job.url for job in inventory.getViewByPath('frozique // inner // iv').jobs] == [INNER_URL + '/view/iv/job/deep1']
+    assert inventory.getViewByPath('frozique // inner // iv').jobs[0].job is inventory.getFolderByPath('frozique // inner').jobs[0]
+    assert inventory.getFolderByPath('frozique') is not None  # in the skeleton, its jobs weren't asked for
+    assert [job.name for job in inventory.jobs] == ['A', 'deep1', 'deep2']
+
+def test_full_crawl_when_config_items_cannot_be_resolved():
+    for jc in (connection(folders=['frozique // nonesuch']),       # 404
+               connection(views=['frozique // nonesuch // iv']),   # 404
+               connection(['australopithicus']),                   # not a top level job
+               connection(folders=['frozique // inner // deep1'])):  # a job rather than a folder
+        inventory = jc.crawlInventory()
+        assert jc.http.urls[-1].startswith(BASE_URL + '/api/json?depth=3&')
+        assert [job.name for job in inventory.getFolder('inner').jobs] == ['deep1']
+
+    jc = connection(folders=['frozique // inner'], full_folder_path=False)
+    jc.crawlInventory()
+    assert len(jc.http.urls) == 1  # only the full crawl
@@ -0,0 +1,28 @@
+import os
+
+from bldeif.utils.klog import ActivityLogger
+from bldeif.utils.watermark_file import WatermarkFile
+
+def fresh_watermark_file(tmp_path):
+    return WatermarkFile(str(tmp_path / 'watermarks.file'), ActivityLogger('log/watermarks.log'))
+
+def test_missing_file_has_no_marks(tmp_path):
+    wmf = fresh_watermark_file(tmp_path)
+    assert not wmf.exists()
+    assert wmf.read() == {}
+
+def test_marks_round_trip(tmp_path):
+    wmf = fresh_watermark_file(tmp_path)
+    marks = {'jenkado:8080/job/frozique/job/australopithicus' : {'number': 42, 'timestamp': 1498262523000},
+             'jenkado:8080/view/Prairie/job/bluestem'         : {'number':  7, 'timestamp': 1498262599000}
+            }
+    wmf.write(marks)
+    assert wmf.exists()
+    assert wmf.read() == marks
+    assert not os.path.exists('%s.tmp' % wmf.filename)
+
+def test_garbled_file_is_treated_as_empty(tmp_path):
+    wmf = fresh_watermark_file(tmp_path)
+    with open(wmf.filename, 'w') as f:
+        f.write('{"jenkado:8080/job/troglodyte" : {"numb')
+    assert wmf.read() == {}
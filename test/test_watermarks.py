@@ -0,0 +1,59 @@
+import time
+
+from bldeif.utils.klog import ActivityLogger
+from bldeif.bld_connector import BLDConnector
+
+from connection_spec_helper import FOLDER_URL, NOW_MILLIS, BuildsStandIn, bare_connection, jenkins_job
+
+KEY = 'frozique::Jenkins'
+
+class Build:
+    def __init__(self, number):
+        self.number    = number
+        self.timestamp = number * 1000
+
+class AgileCentralBuild:
+    def __init__(self, number):
+        self.Number = str(number)
+
+def connector(watermarks):
+    bldc = BLDConnector.__new__(BLDConnector)  # no config or connections needed for the bookkeeping
+    bldc.log = ActivityLogger('log/watermarks.log')
+    bldc.watermarks = watermarks
+    bldc.pending_builds = {}
+    return bldc
+
+def test_build_history_requests_stop_at_the_watermark():
+    wombat = jenkins_job('wombat', FOLDER_URL)
+    jc = bare_connection(http=BuildsStandIn([('wombat', 20)]), max_builds=3,
+                         folders=[{'Folder': 'frozique', 'AgileCentral_Project': 'Jenkins'}],
+                         vetted_folder_jobs={KEY: [wombat]}, prefilter_idle_jobs=False,
+                         watermarks={wombat.fully_qualified_path(): {'number': 15, 'timestamp': 0}})
+    builds = jc.getRecentBuilds(time.gmtime(NOW_MILLIS / 1000 - 3600))
+    assert [build.number for build in builds[KEY][wombat]] == [16, 17, 18, 19, 20]
+    assert [url[url.rindex('{'):] for url in jc.http.urls] == ['{0,3}', '{3,6}']  # 15 came up in the second page
+
+def test_builds_at_or_below_the_watermark_taken_as_reflected():
+    wombat, numbat = jenkins_job('wombat', FOLDER_URL), jenkins_job('numbat', FOLDER_URL)
+    bldc = connector({wombat.fully_qualified_path(): {'number': 2, 'timestamp': 2000}})
+    agicen_builds = {'Jenkins': {numbat.fully_qualified_path(): [AgileCentralBuild(1)]}}
+    bld_builds = {KEY: {wombat: [Build(1), Build(2), Build(3)], numbat: [Build(1), Build(2)]}}
+    unrecorded = bldc._identifyUnrecordedBuilds(agicen_builds, bld_builds)
+    assert [(job.name, build.number) for job, build, project, view in unrecorded] == [('wombat', 3), ('numbat', 2)]
+    everything = bldc._identifyUnrecordedBuilds({}, bld_builds, heed_watermarks=False)
+    assert len(everything) == 5
+
+def test_unreflected_build_holds_the_watermark_below_it():
+    wombat, numbat = jenkins_job('wombat', FOLDER_URL), jenkins_job('numbat', FOLDER_URL)
+    bldc = connector({wombat.fully_qualified_path(): {'number': 2, 'timestamp': 2000}})
+    bld_builds = {KEY: {wombat: [Build(3), Build(4), Build(5), Build(6)], numbat: [Build(1), Build(2)]}}
+    # numbat 1 was already in Agile Central, wombat 5 failed to post (or was over the MaxBuilds cap)
+    unrecorded = [(job, build, 'Jenkins', 'frozique') for job, build in
+                  [(wombat, Build(3)), (wombat, Build(4)), (wombat, Build(5)), (wombat, Build(6)), (numbat, Build(2))]]
+    reflected = {(job.fully_qualified_path(), build.number) for job, build, project, view in unrecorded if build.number != 5}
+    bldc._advanceWatermarks(bld_builds, unrecorded, reflected)
+    assert bldc.watermarks[wombat.fully_qualified_path()] == {'number': 4, 'timestamp': 4000}
+    assert bldc.watermarks[numbat.fully_qualified_path()] == {'number': 2, 'timestamp': 2000}
+
+    bldc._advanceWatermarks({KEY: {wombat: [Build(5), Build(6)]}}, [], set())  # all reflected on the next run
+    assert bldc.watermarks[wombat.fully_qualified_path()]['number'] == 6